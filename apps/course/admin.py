@@ -1,4 +1,8 @@
-from django.contrib import admin
+import math
+
+from django.contrib import admin, messages
+from django.db import transaction
+from django.urls import reverse
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 
@@ -11,6 +15,7 @@ from apps.course.models import (
     LessonPart,
     MatchingPair,
     Question,
+    QuestionStats,
     Roadmap,
     Subject,
     Test,
@@ -19,7 +24,22 @@ from apps.course.models import (
     UserLesson,
     UserLessonPart,
     UserTest,
+    VideoUpload,
 )
+from apps.course.services.hls_progress import get_hls_progress
+from apps.course.tasks import regrade_questions
+
+
+def queue_regrade(model_admin, request, question_ids):
+    """Regrade the answers to questions in the background after key corrections"""
+    question_ids = sorted(set(question_ids))
+    transaction.on_commit(lambda: regrade_questions.delay(question_ids))
+    model_admin.message_user(
+        request,
+        f"Regrading of {len(question_ids)} questions has been queued, "
+        "the changed attempts are reported in the task result.",
+        messages.SUCCESS,
+    )
 
 
 @admin.register(Gallery)
@@ -111,7 +131,7 @@ class LessonPartAdmin(admin.ModelAdmin):
                 "bg_color": "#b0b0b0",
             },
             "processing": {
-                "percent": 10,  # Start at first interval
+                "percent": 0,  # Replaced by the reported progress
                 "base_color": "#0d6efd",  # Blue
                 "stripe_color": "#4d8bfd",
                 "bg_color": "#b0b0b0",
@@ -130,7 +150,16 @@ class LessonPartAdmin(admin.ModelAdmin):
             },
         }
         
-        config = status_config.get(status, status_config["pending"])
+        config = dict(status_config.get(status, status_config["pending"]))
+        label = ""
+        if status == "processing":
+            progress = get_hls_progress(obj.pk)
+            label = "Starting..."
+            if progress:
+                config["percent"] = progress["percent"]
+                label = f"{progress['percent']}%"
+                if progress["eta_seconds"] is not None:
+                    label += f", ETA {math.ceil(progress['eta_seconds'] / 60)} min"
         
         # Get unique ID for this instance
         obj_id = str(obj.pk) if obj.pk else "default"
@@ -186,6 +215,7 @@ class LessonPartAdmin(admin.ModelAdmin):
                 <div class="hls-progress-wrapper-{id}">
                     <div class="hls-progress-bar-{id}"></div>
                 </div>
+                <div class="hls-progress-label-{id}">{label}</div>
             </div>
             """,
             status=status,
@@ -195,62 +225,59 @@ class LessonPartAdmin(admin.ModelAdmin):
             base_color=config["base_color"],
             stripe_color=config["stripe_color"],
             bg_color=config["bg_color"],
+            label=label,
         )
         
-        # Add animation script for processing status
+        # Poll the real progress of the conversion while it runs
         if status == "processing":
+            progress_url = reverse(
+                "course:lesson-part-hls-progress", kwargs={"id": obj.pk}
+            )
             # Use string replacement for JavaScript to avoid format_html issues
-            animation_script = mark_safe(
+            polling_script = mark_safe(
                 """
                 <script>
                     (function() {
                         var progressBar = document.querySelector('.hls-progress-bar-""" + obj_id + """');
-                        var container = document.querySelector('.hls-progress-container[data-status="processing"]');
-                        
-                        if (progressBar && container) {
-                            // Progress intervals: 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60, 65, 70, 75, 80, 85, 90, 95
-                            var intervals = [10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60, 65, 70, 75, 80, 85, 90, 95];
-                            var currentIndex = 0;
-                            
-                            function updateProgress() {
-                                if (currentIndex < intervals.length) {
-                                    var percent = intervals[currentIndex];
-                                    progressBar.style.width = percent + '%';
-                                    
-                                    // Update border radius if needed
-                                    if (percent < 100) {
-                                        progressBar.style.borderRadius = '10px 0 0 10px';
-                                    } else {
-                                        progressBar.style.borderRadius = '10px';
+                        var label = document.querySelector('.hls-progress-label-""" + obj_id + """');
+
+                        function poll() {
+                            fetch('""" + progress_url + """', {credentials: 'same-origin'})
+                                .then(function(response) { return response.json(); })
+                                .then(function(data) {
+                                    if (data.hls_processing_status !== 'processing') {
+                                        location.reload();
+                                        return;
+                                    }
+                                    if (data.percent !== null && progressBar) {
+                                        progressBar.style.width = data.percent + '%';
                                     }
-                                    
-                                    currentIndex++;
-                                    
-                                    // Continue animation or refresh if at end
-                                    if (currentIndex < intervals.length) {
-                                        setTimeout(updateProgress, 2000); // 2 seconds per interval
-                                    } else {
-                                        // Check status and refresh after reaching 95%
-                                        setTimeout(function() {
-                                            if (container && container.getAttribute('data-status') === 'processing') {
-                                                location.reload();
-                                            }
-                                        }, 2000);
+                                    if (label) {
+                                        label.textContent = formatProgress(data);
                                     }
-                                }
+                                    setTimeout(poll, 5000);
+                                })
+                                .catch(function() { setTimeout(poll, 15000); });
+                        }
+
+                        function formatProgress(data) {
+                            if (data.percent === null) {
+                                return 'Starting...';
+                            }
+                            var text = data.percent.toFixed(1) + '%';
+                            if (data.eta_seconds !== null) {
+                                text += ', ETA ' + Math.ceil(data.eta_seconds / 60) + ' min';
                             }
-                            
-                            // Start from second interval (15%) since we start at 10%
-                            currentIndex = 1;
-                            // Start animation after a short delay
-                            setTimeout(updateProgress, 2000);
+                            return text;
                         }
+
+                        setTimeout(poll, 5000);
                     })();
                 </script>
                 """
             )
-            return mark_safe(str(progress_html) + str(animation_script))
-        
+            return mark_safe(str(progress_html) + str(polling_script))
+
         return progress_html
     
     hls_progress_bar.short_description = "HLS Processing Status"
@@ -272,13 +299,80 @@ class TestAdmin(admin.ModelAdmin):
     )
     search_fields = ("title", "slug")
     list_filter = ("is_active", "type")
+    actions = ("regrade_attempts",)
+
+    @admin.action(description="Regrade submitted attempts")
+    def regrade_attempts(self, request, queryset):
+        question_ids = Question.objects.filter(test__in=queryset).values_list(
+            "id", flat=True
+        )
+        queue_regrade(self, request, list(question_ids))
 
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
-    list_display = ("question_text", "test", "is_active")
+    list_display = (
+        "question_text",
+        "test",
+        "is_active",
+        "stats_attempts_count",
+        "stats_correct_percent",
+        "stats_average_answer_seconds",
+    )
+    list_select_related = ("test", "stats")
     search_fields = ("question_text",)
     list_filter = ("is_active", "test")
+    actions = ("regrade_answers",)
+    readonly_fields = (
+        "stats_attempts_count",
+        "stats_correct_percent",
+        "stats_average_answer_seconds",
+        "stats_choice_counts",
+    )
+
+    def _get_stats(self, obj):
+        try:
+            return obj.stats
+        except QuestionStats.DoesNotExist:
+            return None
+
+    def stats_attempts_count(self, obj):
+        stats = self._get_stats(obj)
+        return stats.attempts_count if stats else 0
+
+    stats_attempts_count.short_description = "Attempts"
+
+    def stats_correct_percent(self, obj):
+        stats = self._get_stats(obj)
+        return f"{stats.correct_percent}%" if stats else "-"
+
+    stats_correct_percent.short_description = "Correct %"
+
+    def stats_average_answer_seconds(self, obj):
+        stats = self._get_stats(obj)
+        if not stats or stats.average_answer_seconds is None:
+            return "-"
+        return f"{stats.average_answer_seconds}s"
+
+    stats_average_answer_seconds.short_description = "Avg. time to answer"
+
+    def stats_choice_counts(self, obj):
+        stats = self._get_stats(obj)
+        if not stats or not stats.choice_counts:
+            return "-"
+        labels = dict(obj.choices.values_list("id", "choice_label"))
+        return ", ".join(
+            f"{labels.get(int(choice_id), choice_id)}: {count}"
+            for choice_id, count in sorted(
+                stats.choice_counts.items(), key=lambda item: -item[1]
+            )
+        )
+
+    stats_choice_counts.short_description = "Choice selections"
+
+    @admin.action(description="Regrade submitted answers")
+    def regrade_answers(self, request, queryset):
+        queue_regrade(self, request, list(queryset.values_list("id", flat=True)))
 
 
 @admin.register(MatchingPair)
@@ -286,6 +380,12 @@ class MatchingPairAdmin(admin.ModelAdmin):
     list_display = ("left_item", "right_item", "question", "order")
     search_fields = ("left_item", "right_item", "question")
     list_filter = ("question", "order")
+    actions = ("regrade_answers",)
+
+    @admin.action(description="Regrade submitted answers to their questions")
+    def regrade_answers(self, request, queryset):
+        question_ids = queryset.values_list("question_id", flat=True)
+        queue_regrade(self, request, list(question_ids))
 
 
 @admin.register(AnswerChoice)
@@ -293,6 +393,12 @@ class AnswerChoiceAdmin(admin.ModelAdmin):
     list_display = ("choice_text", "choice_label", "question", "order")
     search_fields = ("choice_text", "choice_label", "question")
     list_filter = ("question", "order")
+    actions = ("regrade_answers",)
+
+    @admin.action(description="Regrade submitted answers to their questions")
+    def regrade_answers(self, request, queryset):
+        question_ids = queryset.values_list("question_id", flat=True)
+        queue_regrade(self, request, list(question_ids))
 
 
 # User Progress Tracking Admin Classes
@@ -463,3 +569,27 @@ class UserAnswerAdmin(admin.ModelAdmin):
         if obj:  # editing an existing object
             readonly.extend(["user_test", "question"])
         return readonly
+
+
+@admin.register(VideoUpload)
+class VideoUploadAdmin(admin.ModelAdmin):
+    list_display = (
+        "filename",
+        "lesson_part",
+        "uploaded_by",
+        "offset",
+        "size",
+        "status",
+    )
+    list_filter = ("status",)
+    search_fields = ("filename", "lesson_part__title")
+    list_select_related = ("lesson_part", "uploaded_by")
+    readonly_fields = (
+        "lesson_part",
+        "uploaded_by",
+        "filename",
+        "size",
+        "offset",
+        "checksum",
+        "status",
+    )
@@ -6,7 +6,6 @@ from apps.course.serializers import SubjectSerializer
 
 class CourseListSerializer(serializers.ModelSerializer):
     subject = SubjectSerializer()
-    lessons_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Course
@@ -24,6 +23,3 @@ class CourseListSerializer(serializers.ModelSerializer):
             "is_main_course",
             "lessons_count",
         )
-
-    def get_lessons_count(self, obj):
-        return obj.lessons.filter(is_active=True).count()
@@ -1,9 +1,11 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, generics
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 
 from apps.course.api_endpoints.course.CourseList.serializers import CourseListSerializer
 from apps.course.models import Course, UserCourse
+from apps.course.services.catalog import absolute_url, get_subject_courses
 
 
 class CourseListAPIView(generics.ListAPIView):
@@ -24,7 +26,57 @@ class CourseListAPIView(generics.ListAPIView):
             ).values_list("course_id", flat=True)
             queryset = queryset.exclude(id__in=user_course_ids)
 
-        return queryset.select_related("subject").prefetch_related("lessons")
+        return queryset.select_related("subject")
+
+    def list(self, request, *args, **kwargs):
+        """Serve courses from the cached catalog tree, filtering in memory"""
+        courses = get_subject_courses(self.kwargs.get("subject_id"))
+
+        # Exclude courses that the user is already enrolled in
+        if request.user.is_authenticated:
+            user_course_ids = set(
+                UserCourse.objects.filter(user=request.user).values_list(
+                    "course_id", flat=True
+                )
+            )
+            courses = [c for c in courses if c["id"] not in user_course_ids]
+
+        is_main_course = self._parse_boolean(request.query_params.get("is_main_course"))
+        if is_main_course is not None:
+            courses = [c for c in courses if c["is_main_course"] == is_main_course]
+
+        search_terms = filters.SearchFilter().get_search_terms(request)
+        if search_terms:
+            courses = [
+                c
+                for c in courses
+                if all(term.lower() in c["title"].lower() for term in search_terms)
+            ]
+
+        data = [self._to_representation(course) for course in courses]
+
+        page = self.paginate_queryset(data)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(data)
+
+    def _to_representation(self, course):
+        data = {field: course[field] for field in CourseListSerializer.Meta.fields}
+        data["cover"] = absolute_url(self.request, data["cover"])
+        data["subject"] = {
+            **data["subject"],
+            "icon": absolute_url(self.request, data["subject"]["icon"]),
+        }
+        return data
+
+    @staticmethod
+    def _parse_boolean(value):
+        # Same values django-filter's BooleanFilter accepts
+        if value in ("True", "true", "1"):
+            return True
+        if value in ("False", "false", "0"):
+            return False
+        return None
 
 
 __all__ = ["CourseListAPIView"]
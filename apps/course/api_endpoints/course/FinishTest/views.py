@@ -1,11 +1,11 @@
-from django.db import transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from apps.course.api_endpoints.course.FinishTest.serializers import FinishTestSerializer
-from apps.course.models import LessonPart, UserLessonPart, UserTest
+from apps.course.models import UserTest
+from apps.course.services.grading import finish_user_test
 
 
 class FinishTestAPIView(generics.UpdateAPIView):
@@ -25,53 +25,15 @@ class FinishTestAPIView(generics.UpdateAPIView):
             is_submitted=False,
         )
 
-        with transaction.atomic():
-            # Check all answers and submit the test
-            for user_answer in user_test.user_answers.all():
-                user_answer.check_correctness()
-                user_answer.save()
+        # Grade all answers, submit the test and complete its lesson part
+        if not finish_user_test(user_test):
+            return Response(
+                {"detail": "This test has already been submitted."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-            # Submit the test (this will calculate scores)
-            user_test.submit_test()
-
-            # Find related lesson part
-            lesson_part = LessonPart.objects.filter(
-                test=user_test.test, is_active=True
-            ).first()
-
-            if lesson_part:
-                user_lesson_part = UserLessonPart.objects.filter(
-                    user_lesson__user_course__user=user, lesson_part=lesson_part
-                ).first()
-
-                if user_lesson_part and not user_lesson_part.is_completed:
-                    # Always mark as completed and give partial awards on first attempt
-                    if user_test.attempt_number == 1:
-                        # Calculate percentage of correct answers
-                        if user_test.total_questions > 0:
-                            percentage = (
-                                user_test.correct_answers / user_test.total_questions
-                            )
-                        else:
-                            percentage = 0
-
-                        # Calculate partial coins and points based on performance
-                        partial_coins = int(lesson_part.award_coin * percentage)
-                        partial_points = int(lesson_part.award_point * percentage)
-
-                        # Mark as completed with partial awards
-                        user_lesson_part.mark_completed_with_partial_awards(
-                            coins=partial_coins, points=partial_points
-                        )
-                    else:
-                        # Subsequent attempts: mark completed but no awards
-                        user_lesson_part.mark_completed(give_awards=False)
-                elif user_lesson_part and user_lesson_part.is_completed:
-                    # User is retrying - no additional awards
-                    pass
-
-            serializer = self.get_serializer(user_test)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        serializer = self.get_serializer(user_test)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 __all__ = ["FinishTestAPIView"]
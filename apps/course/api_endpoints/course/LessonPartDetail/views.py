@@ -6,7 +6,8 @@ from rest_framework.permissions import IsAuthenticated
 from apps.course.api_endpoints.course.LessonPartDetail.serializers import (
     LessonPartDetailSerializer,
 )
-from apps.course.models import Lesson, LessonPart, UserCourse
+from apps.course.models import LessonPart, UserCourse
+from apps.course.services.access import is_free_lesson
 
 
 class LessonPartDetailAPIView(generics.RetrieveAPIView):
@@ -33,12 +34,11 @@ class LessonPartDetailAPIView(generics.RetrieveAPIView):
         """Check if user has access to this lesson part"""
         user = self.request.user
         lesson = lesson_part.lesson
-        course = lesson.course
 
         # Check if user has purchased the course (has UserCourse with is_free_trial=False)
         try:
             paid_user_course = UserCourse.objects.get(
-                user=user, course=course, is_free_trial=False
+                user=user, course_id=lesson.course_id, is_free_trial=False
             )
             # User has purchased the course, allow access to all lessons
             return
@@ -46,13 +46,8 @@ class LessonPartDetailAPIView(generics.RetrieveAPIView):
             # User hasn't purchased the course, check if it's a free lesson
             pass
 
-        # Get the first 3 lessons of the course ordered by order field
-        first_three_lessons = list(
-            Lesson.objects.filter(course=course, is_active=True).order_by("order")[:3]
-        )
-
-        # Check if current lesson is in the first 3
-        if lesson in first_three_lessons:
+        # Check if current lesson is one of the free trial lessons
+        if is_free_lesson(lesson):
             # This is a free lesson, allow access
             return
         else:
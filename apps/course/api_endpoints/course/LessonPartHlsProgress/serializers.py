@@ -0,0 +1,21 @@
+from rest_framework import serializers
+
+from apps.course.models import LessonPart
+from apps.course.services.hls_progress import get_hls_progress
+
+
+class LessonPartHlsProgressSerializer(serializers.ModelSerializer):
+    percent = serializers.FloatField(read_only=True, allow_null=True)
+    eta_seconds = serializers.IntegerField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = LessonPart
+        fields = ("id", "hls_processing_status", "percent", "eta_seconds")
+
+    def to_representation(self, instance):
+        progress = get_hls_progress(instance.id) or {}
+        instance.percent = progress.get("percent")
+        instance.eta_seconds = progress.get("eta_seconds")
+        if instance.hls_processing_status == "completed" and not progress:
+            instance.percent = 100.0
+        return super().to_representation(instance)
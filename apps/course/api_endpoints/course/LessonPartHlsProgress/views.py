@@ -0,0 +1,19 @@
+from rest_framework import generics
+from rest_framework.permissions import IsAdminUser
+
+from apps.course.api_endpoints.course.LessonPartHlsProgress.serializers import (
+    LessonPartHlsProgressSerializer,
+)
+from apps.course.models import LessonPart
+
+
+class LessonPartHlsProgressAPIView(generics.RetrieveAPIView):
+    """Progress of the HLS conversion of a lesson part video, for staff users"""
+
+    serializer_class = LessonPartHlsProgressSerializer
+    permission_classes = (IsAdminUser,)
+    lookup_field = "id"
+    queryset = LessonPart.objects.only("id", "hls_processing_status")
+
+
+__all__ = ["LessonPartHlsProgressAPIView"]
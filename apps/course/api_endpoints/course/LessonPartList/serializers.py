@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from apps.course.models import LessonPart, UserLessonPart, UserTest
+from apps.course.models import LessonPart
 
 
 class LessonPartListSerializer(serializers.ModelSerializer):
@@ -31,92 +31,9 @@ class LessonPartListSerializer(serializers.ModelSerializer):
         return obj.test.type if obj.test else None
 
     def get_user_test_id(self, obj):
-        """Get the user's test attempt ID if they have taken this test"""
-        if not obj.test:
-            return None
-
-        # Get the user from the request context
-        request = self.context.get("request")
-        if not request or not request.user.is_authenticated:
-            return None
-
-        # Get the most recent user test for this test
-        user_test = (
-            UserTest.objects.filter(user=request.user, test=obj.test)
-            .order_by("-start_date")
-            .first()
-        )
-
-        return user_test.id if user_test else None
+        """Get the user's most recent test attempt ID if they have taken this test"""
+        return self.context["lesson_progress"].get_user_test_id(obj)
 
     def get_is_locked(self, obj):
-        """
-        Determine if this lesson part is locked for the current user.
-        Logic:
-        - First lesson part (order=1) is always unlocked
-        - If current part is a test and user has attempted it, it's unlocked (can retry)
-        - Other lesson parts are locked until the previous lesson part is completed
-        - If previous part has a test and user attempted it (even if failed), unlock next part
-        """
-        # First lesson part is always unlocked
-        if obj.order == 1:
-            return False
-
-        # Get the user from the request context
-        request = self.context.get("request")
-        if not request or not request.user.is_authenticated:
-            return True
-
-        # If this part itself has a test and user has attempted it, it's unlocked
-        # This allows users to retry tests multiple times
-        if obj.test:
-            has_attempted_current_test = UserTest.objects.filter(
-                user=request.user,
-                test=obj.test,
-                is_submitted=True,
-            ).exists()
-
-            if has_attempted_current_test:
-                # User has attempted this test, so it's unlocked for retries
-                return False
-
-        # Get the previous lesson part (by order)
-        previous_part = (
-            LessonPart.objects.filter(
-                lesson=obj.lesson, is_active=True, order__lt=obj.order
-            )
-            .order_by("-order")
-            .first()
-        )
-
-        if not previous_part:
-            return False
-
-        # Check if user has completed the previous lesson part
-        previous_user_lesson_part = UserLessonPart.objects.filter(
-            user_lesson__user_course__user=request.user,
-            user_lesson__lesson=obj.lesson,
-            lesson_part=previous_part,
-            is_completed=True,
-        ).exists()
-
-        # If previous part is completed, unlock this part
-        if previous_user_lesson_part:
-            return False
-
-        # If previous part has a test, check if user has attempted it
-        # Even if they failed, they can move to the next part after attempting
-        if previous_part.test:
-            has_attempted_test = UserTest.objects.filter(
-                user=request.user,
-                test=previous_part.test,
-                is_submitted=True,
-            ).exists()
-
-            # If user attempted the test, unlock next part
-            # This means the previous part is considered "completed" for unlocking purposes
-            if has_attempted_test:
-                return False
-
-        # Otherwise, keep it locked
-        return True
+        """Determine if this lesson part is locked for the current user"""
+        return self.context["lesson_progress"].is_locked(obj)
@@ -5,7 +5,8 @@ from rest_framework.permissions import IsAuthenticated
 from apps.course.api_endpoints.course.LessonPartList.serializers import (
     LessonPartListSerializer,
 )
-from apps.course.models import Lesson, LessonPart, UserLessonPart
+from apps.course.models import Lesson, LessonPart
+from apps.course.services.lesson_progress import LessonProgressSnapshot
 
 
 class LessonPartListAPIView(generics.ListAPIView):
@@ -15,34 +16,28 @@ class LessonPartListAPIView(generics.ListAPIView):
     search_fields = ("title",)
     lookup_field = "lesson_id"
 
-    def get_queryset(self):
-        lesson_id = self.kwargs.get(self.lookup_field)
-        lesson = get_object_or_404(Lesson, id=lesson_id, is_active=True)
+    def get_lesson(self):
+        if not hasattr(self, "_lesson"):
+            lesson_id = self.kwargs.get(self.lookup_field)
+            self._lesson = get_object_or_404(Lesson, id=lesson_id, is_active=True)
+        return self._lesson
 
-        queryset = (
-            LessonPart.objects.filter(lesson=lesson, is_active=True)
+    def get_queryset(self):
+        return (
+            LessonPart.objects.filter(lesson=self.get_lesson(), is_active=True)
             .select_related("test")
-            .prefetch_related("test__user_tests")
             .order_by("order")
         )
 
-        # If user is authenticated, prefetch user progress data for efficient locking logic
-        if self.request.user.is_authenticated:
-            from django.db.models import Prefetch
-
-            # Prefetch user lesson parts for this specific lesson and user
-            user_lesson_parts_prefetch = Prefetch(
-                "user_lesson_parts",
-                queryset=UserLessonPart.objects.filter(
-                    user_lesson__user_course__user=self.request.user,
-                    user_lesson__lesson=lesson,
-                ).select_related("user_lesson"),
-                to_attr="filtered_user_lesson_parts",
-            )
-
-            queryset = queryset.prefetch_related(user_lesson_parts_prefetch)
-
-        return queryset
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if getattr(self, "swagger_fake_view", False):
+            return context
+        # Load the user's progress through the lesson once for all parts
+        context["lesson_progress"] = LessonProgressSnapshot(
+            self.request.user, self.get_lesson()
+        )
+        return context
 
 
 __all__ = ["LessonPartListAPIView"]
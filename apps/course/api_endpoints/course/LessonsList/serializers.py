@@ -1,11 +1,11 @@
 from rest_framework import serializers
 
 from apps.course.models import Lesson, UserCourse, UserLesson
-from apps.users.models import GroupMember, GroupMemberGrade
+from apps.course.services.access import is_free_lesson
 
 
 class LessonsListSerializer(serializers.ModelSerializer):
-    # parts_count is now provided by the queryset annotation
+    # parts_count is a denormalized column maintained by signals
     parts_count = serializers.IntegerField(read_only=True)
     is_user_lesson_created = serializers.SerializerMethodField()
     progress_percent = serializers.SerializerMethodField()
@@ -113,7 +113,7 @@ class LessonsListSerializer(serializers.ModelSerializer):
             return None
 
     def get_slug(self, obj):
-        """Return slug only for first 3 lessons if user hasn't bought the course"""
+        """Return slug only for free trial lessons if user hasn't bought the course"""
         request = self.context.get("request")
         if not request or not request.user.is_authenticated:
             return None
@@ -124,22 +124,10 @@ class LessonsListSerializer(serializers.ModelSerializer):
             # User has purchased the course, return the actual slug
             return obj.slug
 
-        # User hasn't purchased the course, check if this is one of the first 3 lessons
-        course_id = self.context.get("course_id")
-        if not course_id:
-            return None
-
-        # Get the first 3 lessons of the course ordered by id
-        first_three_lessons = Lesson.objects.filter(
-            course_id=course_id,
-            is_active=True
-        ).order_by('id')[:3]
-
-        # Check if current lesson is in the first 3
-        if obj in first_three_lessons:
+        # User hasn't purchased the course, check if this is a free trial lesson
+        if is_free_lesson(obj):
             return obj.slug
-        else:
-            return None
+        return None
 
     def get_status(self, obj):
         """Return status based on lesson completion for group members"""
@@ -147,66 +135,9 @@ class LessonsListSerializer(serializers.ModelSerializer):
         if not request or not request.user.is_authenticated:
             return None
 
-        course_id = self.context.get("course_id")
-        if not course_id:
-            return None
-
-        # Check if user is a group member for this course
-        group_member = self.context.get("group_member")
-        if not group_member:
+        # Statuses are computed for the whole course at once in the view
+        lesson_statuses = self.context.get("lesson_statuses")
+        if not lesson_statuses:
             return None
 
-        # For group members, check lesson status based on completion
-        return self._check_lesson_status_for_group_member(obj, group_member, course_id)
-
-    def _check_lesson_status_for_group_member(self, lesson, group_member, course_id):
-        """Check lesson status for group member based on completion pattern"""
-        # First lesson is always open
-        if lesson.order == 1:
-            return "open"
-        
-        # Get all lessons ordered by their order
-        all_lessons = Lesson.objects.filter(
-            course_id=course_id,
-            is_active=True
-        ).order_by('order')
-        
-        # Find the current lesson's position
-        current_position = lesson.order
-        
-        # Check completed lessons (lessons with passing grades)
-        completed_lessons = []
-        for check_lesson in all_lessons:
-            if check_lesson.order < current_position:
-                try:
-                    grade = GroupMemberGrade.objects.get(
-                        group_member=group_member,
-                        lesson=check_lesson
-                    )
-                    
-                    # Check if both theoretical and practical grades meet passing requirements
-                    theoretical_passed = grade.theoretical_ball >= check_lesson.theoretical_pass_ball
-                    practical_passed = grade.practical_ball >= check_lesson.practical_pass_ball
-                    
-                    if theoretical_passed and practical_passed:
-                        completed_lessons.append(check_lesson.order)
-                        
-                except GroupMemberGrade.DoesNotExist:
-                    pass
-        
-        # Determine status based on completion pattern
-        if not completed_lessons:
-            # No lessons completed yet
-            if current_position <= 3:
-                return "lock"  # First 3 lessons are "lock" by default
-            else:
-                return "loock"  # Beyond first 3 are "loock"
-        else:
-            # Some lessons are completed
-            max_completed = max(completed_lessons)
-            
-            # If current lesson is within the next 2 lessons after the last completed lesson
-            if current_position <= max_completed + 2:
-                return "lock"
-            else:
-                return "loock"
+        return lesson_statuses.get(obj.id)
@@ -1,12 +1,15 @@
-from django.db.models import Count, Prefetch, Q
-from django.shortcuts import get_object_or_404
+from django.db.models import Prefetch
+from django.http import Http404
 from rest_framework import filters, generics
 from rest_framework.permissions import IsAuthenticated
 
 from apps.course.api_endpoints.course.LessonsList.serializers import (
     LessonsListSerializer,
 )
-from apps.course.models import Course, Lesson, UserCourse, UserLesson
+from apps.course.models import Lesson, UserCourse, UserLesson
+from apps.course.services.access import get_free_lesson_ids
+from apps.course.services.catalog import get_course_node
+from apps.course.services.lesson_gates import get_lesson_statuses
 from apps.users.models import GroupMember
 
 
@@ -19,13 +22,13 @@ class LessonsListAPIView(generics.ListAPIView):
 
     def get_queryset(self):
         course_id = self.kwargs.get(self.lookup_field)
-        course = get_object_or_404(Course, id=course_id, is_active=True)
+        # Active courses are looked up in the cached catalog tree
+        if get_course_node(course_id) is None:
+            raise Http404
 
-        # Base queryset with parts count annotation
-        queryset = (
-            Lesson.objects.filter(course=course, is_active=True)
-            .annotate(parts_count=Count("parts", filter=Q(parts__is_active=True)))
-            .order_by("order")
+        # parts_count is a stored counter on Lesson
+        queryset = Lesson.objects.filter(course_id=course_id, is_active=True).order_by(
+            "order"
         )
 
         # Prefetch user lessons for the current user and course if authenticated
@@ -40,20 +43,20 @@ class LessonsListAPIView(generics.ListAPIView):
             )
             queryset = queryset.prefetch_related(user_lessons_prefetch)
 
-            # Limit to first 3 lessons if user is on free trial
+            # Limit to the free trial lessons if user is on free trial
             try:
                 user_course = UserCourse.objects.get(
                     user=self.request.user, course_id=course_id
                 )
                 if user_course.is_free_trial:
-                    queryset = queryset[:3]
+                    queryset = queryset.filter(id__in=get_free_lesson_ids(course_id))
             except UserCourse.DoesNotExist:
                 pass
 
         return queryset
 
     def get_serializer_context(self):
-        """Add course_id, user_course, and group_member to serializer context"""
+        """Add course_id, user_course, group_member and lesson_statuses to context"""
         context = super().get_serializer_context()
         course_id = self.kwargs.get(self.lookup_field)
         context["course_id"] = course_id
@@ -74,11 +77,16 @@ class LessonsListAPIView(generics.ListAPIView):
                     user=self.request.user, group__course_id=course_id, is_active=True
                 )
                 context["group_member"] = group_member
+                context["lesson_statuses"] = get_lesson_statuses(
+                    group_member, course_id
+                )
             except GroupMember.DoesNotExist:
                 context["group_member"] = None
+                context["lesson_statuses"] = None
         else:
             context["user_course"] = None
             context["group_member"] = None
+            context["lesson_statuses"] = None
 
         return context
 
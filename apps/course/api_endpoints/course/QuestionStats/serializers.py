@@ -0,0 +1,24 @@
+from rest_framework import serializers
+
+from apps.course.models import QuestionStats
+
+
+class QuestionStatsSerializer(serializers.ModelSerializer):
+    question_id = serializers.IntegerField(read_only=True)
+    question_order = serializers.IntegerField(source="question.order", read_only=True)
+    correct_percent = serializers.FloatField(read_only=True)
+    average_answer_seconds = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = QuestionStats
+        fields = (
+            "question_id",
+            "question_order",
+            "attempts_count",
+            "answered_count",
+            "correct_count",
+            "correct_percent",
+            "average_answer_seconds",
+            "choice_counts",
+            "updated_at",
+        )
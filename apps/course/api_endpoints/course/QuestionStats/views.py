@@ -0,0 +1,24 @@
+from rest_framework import generics
+from rest_framework.permissions import IsAdminUser
+
+from apps.course.api_endpoints.course.QuestionStats.serializers import (
+    QuestionStatsSerializer,
+)
+from apps.course.models import QuestionStats
+
+
+class QuestionStatsListAPIView(generics.ListAPIView):
+    """Item statistics of the questions of a test, for staff users"""
+
+    serializer_class = QuestionStatsSerializer
+    permission_classes = (IsAdminUser,)
+
+    def get_queryset(self):
+        return (
+            QuestionStats.objects.filter(question__test_id=self.kwargs.get("test_id"))
+            .select_related("question")
+            .order_by("question__order", "question_id")
+        )
+
+
+__all__ = ["QuestionStatsListAPIView"]
@@ -1,25 +1,21 @@
-from django.shortcuts import get_object_or_404
+from django.http import Http404
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.course.models import Roadmap, Subject
-
-from .serializers import RoadmapSerializer
+from apps.course.services.catalog import absolute_url, get_subject_roadmap
 
 
 class RoadmapAPIView(APIView):
     permission_classes = (AllowAny,)
 
     def get(self, request, subject_id, *args, **kwargs):
-        # First verify the subject exists
-        subject = get_object_or_404(Subject, id=subject_id, is_active=True)
-
-        # Get the roadmap for this subject
-        roadmap = get_object_or_404(Roadmap, subject=subject, is_active=True)
+        # Roadmap of an active subject, served from the cached catalog tree
+        roadmap = get_subject_roadmap(subject_id)
+        if roadmap is None:
+            raise Http404
 
-        serializer = RoadmapSerializer(roadmap, context={"request": request})
-        return Response(serializer.data)
+        return Response({**roadmap, "image": absolute_url(request, roadmap["image"])})
 
 
 __all__ = ["RoadmapAPIView"]
@@ -1,10 +1,12 @@
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
 from apps.course.api_endpoints.course.SubjectList.serializers import (
     SubjectListSerializer,
 )
 from apps.course.models import Subject
+from apps.course.services.catalog import absolute_url, get_active_subjects
 
 
 class SubjectListAPIView(generics.ListAPIView):
@@ -12,5 +14,17 @@ class SubjectListAPIView(generics.ListAPIView):
     serializer_class = SubjectListSerializer
     permission_classes = (IsAuthenticated,)
 
+    def list(self, request, *args, **kwargs):
+        # Subjects are served from the cached catalog tree
+        subjects = [
+            {**subject, "icon": absolute_url(request, subject["icon"])}
+            for subject in get_active_subjects()
+        ]
+
+        page = self.paginate_queryset(subjects)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(subjects)
+
 
 __all__ = ["SubjectListAPIView"]
@@ -1,6 +1,16 @@
 from rest_framework import serializers
 
+from apps.course.choices import TestType
 from apps.course.models import UserAnswer
+from apps.course.services.answer_drafts import drafts_enabled, save_answer_drafts
+from apps.course.services.answer_keys import get_answer_key
+from apps.course.services.answer_sheets import save_user_answers
+from apps.course.services.matching import (
+    expand_matching_answer,
+    get_matching_entry,
+    get_shuffle_seed,
+    normalize_matching_answer,
+)
 
 
 class SubmitAnswerSerializer(serializers.ModelSerializer):
@@ -17,13 +27,47 @@ class SubmitAnswerSerializer(serializers.ModelSerializer):
 
     def validate_selected_choice(self, value):
         """Validate that selected choice belongs to the question"""
-        if value and hasattr(self.instance, "question"):
-            if value.question != self.instance.question:
+        if value and self.instance is not None:
+            if value.question_id != self.instance.question_id:
                 raise serializers.ValidationError(
                     "Selected choice must belong to the question"
                 )
         return value
 
+    def validate_matching_answer(self, value):
+        """Convert the matching answer to pair ids of the question"""
+        if value is None or self.instance is None:
+            return value
+
+        user_test = self.instance.user_test
+        if user_test.test.type != TestType.MATCHING:
+            return value
+
+        entry = get_matching_entry(
+            get_answer_key(user_test.test_id), self.instance.question_id
+        )
+        matching_answer = normalize_matching_answer(
+            entry, value, seed=get_shuffle_seed(self.instance)
+        )
+        if matching_answer is None:
+            raise serializers.ValidationError(
+                "Matching answer must use the items of the question"
+            )
+        return matching_answer
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        user_test = instance.user_test
+        if data.get("matching_answer") and user_test.test.type == TestType.MATCHING:
+            # Pair ids would reveal the correct matches, answer with item texts
+            entry = get_matching_entry(
+                get_answer_key(user_test.test_id), instance.question_id
+            )
+            data["matching_answer"] = expand_matching_answer(
+                entry, data["matching_answer"]
+            )
+        return data
+
     def update(self, instance, validated_data):
         """Update user answer without checking correctness"""
         # Don't auto-check correctness during answer updates
@@ -38,7 +82,19 @@ class SubmitAnswerSerializer(serializers.ModelSerializer):
         # Set answered_at timestamp when user actually provides an answer
         instance.answered_at = timezone.now()
 
-        # Save without checking correctness
-        instance.save(skip_correctness_check=True)
+        if drafts_enabled():
+            # Buffer the answer in Redis, it is written to the database on finish
+            save_answer_drafts(
+                instance.user_test,
+                [instance],
+                [*validated_data.keys(), "answered_at"],
+            )
+        else:
+            # Save to the attempt's answer sheet without checking correctness
+            save_user_answers(
+                instance.user_test,
+                [instance],
+                [*validated_data.keys(), "answered_at"],
+            )
 
         return instance
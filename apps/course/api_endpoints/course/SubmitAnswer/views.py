@@ -1,3 +1,4 @@
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
@@ -5,7 +6,8 @@ from rest_framework.permissions import IsAuthenticated
 from apps.course.api_endpoints.course.SubmitAnswer.serializers import (
     SubmitAnswerSerializer,
 )
-from apps.course.models import UserAnswer, UserTest
+from apps.course.models import UserTest
+from apps.course.services.answer_sheets import get_user_answer
 
 
 class SubmitAnswerAPIView(generics.UpdateAPIView):
@@ -19,15 +21,17 @@ class SubmitAnswerAPIView(generics.UpdateAPIView):
 
         # Get the active user test
         user_test = get_object_or_404(
-            UserTest,
+            UserTest.objects.select_related("test"),
             test_id=test_id,
             user=user,
             is_in_progress=True,
             is_submitted=False,
         )
 
-        # Get the user answer
-        user_answer = get_object_or_404(UserAnswer, id=answer_id, user_test=user_test)
+        # Get the user answer, from the answer sheet or the attempt's answer rows
+        user_answer = get_user_answer(user_test, answer_id)
+        if user_answer is None:
+            raise Http404
 
         return user_answer
 
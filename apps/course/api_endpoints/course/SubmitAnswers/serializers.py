@@ -0,0 +1,123 @@
+from django.utils import timezone
+from rest_framework import serializers
+
+from apps.course.choices import TestType
+from apps.course.models import AnswerChoice
+from apps.course.services.answer_drafts import drafts_enabled, save_answer_drafts
+from apps.course.services.answer_keys import get_answer_key
+from apps.course.services.answer_sheets import get_user_answers, save_user_answers
+from apps.course.services.matching import (
+    get_matching_entry,
+    get_shuffle_seed,
+    normalize_matching_answer,
+)
+
+ANSWER_FIELDS = (
+    "selected_choice",
+    "boolean_answer",
+    "text_answer",
+    "matching_answer",
+    "book_answer",
+)
+
+
+class SubmitAnswerItemSerializer(serializers.Serializer):
+    answer_id = serializers.IntegerField()
+    selected_choice = serializers.IntegerField(required=False, allow_null=True)
+    boolean_answer = serializers.BooleanField(required=False, allow_null=True)
+    text_answer = serializers.CharField(
+        required=False, allow_null=True, allow_blank=True
+    )
+    matching_answer = serializers.JSONField(required=False, allow_null=True)
+    book_answer = serializers.JSONField(required=False, allow_null=True)
+
+
+class SubmitAnswersSerializer(serializers.Serializer):
+    answers = SubmitAnswerItemSerializer(many=True, allow_empty=False)
+
+    def validate_answers(self, value):
+        """Validate that every answer and selected choice belongs to the attempt"""
+        user_test = self.context["user_test"]
+
+        answer_ids = [item["answer_id"] for item in value]
+        if len(answer_ids) != len(set(answer_ids)):
+            raise serializers.ValidationError("Each answer can only be submitted once")
+
+        user_answers = {
+            user_answer.id: user_answer
+            for user_answer in get_user_answers(user_test, answer_ids)
+        }
+        missing_ids = set(answer_ids) - set(user_answers)
+        if missing_ids:
+            raise serializers.ValidationError(
+                f"Answers not found in this test: {sorted(missing_ids)}"
+            )
+
+        # Validate that selected choices belong to the questions in one query
+        choice_ids = {item.get("selected_choice") for item in value} - {None}
+        choice_questions = dict(
+            AnswerChoice.objects.filter(id__in=choice_ids).values_list(
+                "id", "question_id"
+            )
+        )
+        for item in value:
+            choice_id = item.get("selected_choice")
+            if choice_id is None:
+                continue
+            if (
+                choice_questions.get(choice_id)
+                != user_answers[item["answer_id"]].question_id
+            ):
+                raise serializers.ValidationError(
+                    "Selected choice must belong to the question"
+                )
+
+        # Matching answers are stored by pair id
+        if user_test.test.type == TestType.MATCHING:
+            answer_key = get_answer_key(user_test.test_id)
+            for item in value:
+                if item.get("matching_answer") is None:
+                    continue
+                user_answer = user_answers[item["answer_id"]]
+                item["matching_answer"] = normalize_matching_answer(
+                    get_matching_entry(answer_key, user_answer.question_id),
+                    item["matching_answer"],
+                    seed=get_shuffle_seed(user_answer),
+                )
+                if item["matching_answer"] is None:
+                    raise serializers.ValidationError(
+                        "Matching answer must use the items of the question"
+                    )
+
+        self.context["user_answers"] = user_answers
+        return value
+
+    def save(self):
+        """Update all answers without checking correctness in one bulk_update"""
+        # Correctness is checked for all answers when the test is submitted
+        user_answers = self.context["user_answers"]
+        answered_at = timezone.now()
+        fields = {"answered_at"}
+
+        for item in self.validated_data["answers"]:
+            user_answer = user_answers[item["answer_id"]]
+            for attr in ANSWER_FIELDS:
+                if attr in item:
+                    # selected_choice is validated as a raw id
+                    setattr(
+                        user_answer,
+                        "selected_choice_id" if attr == "selected_choice" else attr,
+                        item[attr],
+                    )
+                    fields.add(attr)
+            user_answer.answered_at = answered_at
+
+        updated_answers = [
+            user_answers[item["answer_id"]] for item in self.validated_data["answers"]
+        ]
+        if drafts_enabled():
+            # Buffer the answers in Redis, they are written to the database on finish
+            save_answer_drafts(self.context["user_test"], updated_answers, fields)
+        else:
+            save_user_answers(self.context["user_test"], updated_answers, fields)
+        return updated_answers
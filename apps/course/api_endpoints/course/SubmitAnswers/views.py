@@ -0,0 +1,46 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.course.api_endpoints.course.SubmitAnswer.serializers import (
+    SubmitAnswerSerializer,
+)
+from apps.course.api_endpoints.course.SubmitAnswers.serializers import (
+    SubmitAnswersSerializer,
+)
+from apps.course.models import UserTest
+
+
+class SubmitAnswersAPIView(generics.GenericAPIView):
+    """Save several answers of an active test in one request"""
+
+    serializer_class = SubmitAnswersSerializer
+    permission_classes = (IsAuthenticated,)
+
+    def patch(self, request, *args, **kwargs):
+        test_id = kwargs.get("test_id")
+
+        # Get the active user test
+        user_test = get_object_or_404(
+            UserTest.objects.select_related("test"),
+            test_id=test_id,
+            user=request.user,
+            is_in_progress=True,
+            is_submitted=False,
+        )
+
+        serializer = self.get_serializer(
+            data=request.data,
+            context={**self.get_serializer_context(), "user_test": user_test},
+        )
+        serializer.is_valid(raise_exception=True)
+        user_answers = serializer.save()
+
+        return Response(
+            {"answers": SubmitAnswerSerializer(user_answers, many=True).data},
+            status=status.HTTP_200_OK,
+        )
+
+
+__all__ = ["SubmitAnswersAPIView"]
@@ -1,13 +1,20 @@
 from rest_framework import serializers
 
-from apps.course.api_endpoints.course.TestDetail.serializers import QuestionSerializer
 from apps.course.models import UserAnswer
+from apps.course.services.answer_drafts import apply_answer_draft
+from apps.course.services.matching import (
+    expand_matching_answer,
+    get_matching_entry,
+    get_shuffle_seed,
+)
+from apps.course.services.question_payloads import personalize_question_payload
 
 
 class TestQuestionsSerializer(serializers.ModelSerializer):
     question_data = serializers.SerializerMethodField()
     test_type = serializers.SerializerMethodField()
     user_answer_id = serializers.SerializerMethodField()
+    user_answer = serializers.SerializerMethodField()
 
     class Meta:
         model = UserAnswer
@@ -16,18 +23,43 @@ class TestQuestionsSerializer(serializers.ModelSerializer):
             "question_data",
             "test_type",
             "user_answer_id",
+            "user_answer",
         )
 
     def get_question_data(self, obj):
-        """Return question with proper test type context"""
-        context = self.context.copy()
-        context["test_type"] = obj.user_test.test.type
-        return QuestionSerializer(obj.question, context=context).data
+        """Return the shared question payload with the per-user layer applied"""
+        return personalize_question_payload(
+            self.context["question_payloads"][obj.question_id],
+            request=self.context.get("request"),
+            seed=get_shuffle_seed(obj),
+        )
 
     def get_test_type(self, obj):
         """Return the test type"""
-        return obj.user_test.test.type
+        return self.context["test_type"]
 
     def get_user_answer_id(self, obj):
         """Return the user answer ID for easy reference"""
         return obj.id
+
+    def get_user_answer(self, obj):
+        """Return the answer saved so far, including answers buffered as drafts"""
+        draft = self.context.get("answer_drafts", {}).get(obj.id)
+        if draft:
+            apply_answer_draft(obj, draft)
+
+        matching_answer = obj.matching_answer
+        if matching_answer and "answer_key" in self.context:
+            # Matching answers are stored by pair id, show them as item texts
+            matching_answer = expand_matching_answer(
+                get_matching_entry(self.context["answer_key"], obj.question_id),
+                matching_answer,
+            )
+        return {
+            "selected_choice": obj.selected_choice_id,
+            "boolean_answer": obj.boolean_answer,
+            "text_answer": obj.text_answer,
+            "matching_answer": matching_answer,
+            "book_answer": obj.book_answer,
+            "answered_at": obj.answered_at,
+        }
@@ -1,12 +1,17 @@
-from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
 from apps.course.api_endpoints.course.TestQuestions.serializers import (
     TestQuestionsSerializer,
 )
-from apps.course.models import AnswerChoice, MatchingPair, UserAnswer, UserTest
+from apps.course.choices import TestType
+from apps.course.models import UserAnswer, UserTest
+from apps.course.services.answer_drafts import drafts_enabled, get_answer_drafts
+from apps.course.services.answer_keys import get_answer_key
+from apps.course.services.answer_sheets import get_user_answers, uses_answer_sheet
+from apps.course.services.question_payloads import get_question_payloads
 
 
 class TestQuestionsAPIView(generics.ListAPIView):
@@ -18,41 +23,47 @@ class TestQuestionsAPIView(generics.ListAPIView):
         user = self.request.user
 
         # Get the active user test
-        user_test = get_object_or_404(
-            UserTest,
+        self.user_test = get_object_or_404(
+            UserTest.objects.select_related("test"),
             test_id=test_id,
             user=user,
             is_in_progress=True,
             is_submitted=False,
         )
 
-        # Get the test type for optimization
-        test_type = user_test.test.type
-
-        # Build optimized queryset based on test type
-        queryset = UserAnswer.objects.filter(user_test=user_test)
-
-        if test_type == "matching":
-            queryset = queryset.select_related(
-                "question", "question__test"
-            ).prefetch_related(
-                Prefetch(
-                    "question__matching_pairs",
-                    queryset=MatchingPair.objects.order_by("order"),
-                )
-            )
-        elif test_type == "regular_test":
-            queryset = queryset.select_related(
-                "question", "question__test"
-            ).prefetch_related(
-                Prefetch(
-                    "question__choices", queryset=AnswerChoice.objects.order_by("order")
-                )
-            )
-        else:
-            queryset = queryset.select_related("question", "question__test")
-
-        return queryset.order_by("question__order")
+        if uses_answer_sheet(self.user_test):
+            return get_user_answers(self.user_test)
+        # Question content comes from the shared payload cache
+        return UserAnswer.objects.filter(user_test=self.user_test).order_by(
+            "question__order"
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        user_answers = list(page if page is not None else queryset)
+
+        test = self.user_test.test
+        context = self.get_serializer_context()
+        context["test_type"] = test.type
+        context["question_payloads"] = get_question_payloads(
+            test.id, test.type, [answer.question_id for answer in user_answers]
+        )
+        if test.type == TestType.MATCHING:
+            context["answer_key"] = get_answer_key(test.id)
+        serializer = self.get_serializer(user_answers, many=True, context=context)
+
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if drafts_enabled() and hasattr(self, "user_test"):
+            # Resumed sessions see answers that are still buffered in Redis
+            context["answer_drafts"] = get_answer_drafts(self.user_test.id)
+        return context
 
 
 __all__ = ["TestQuestionsAPIView"]
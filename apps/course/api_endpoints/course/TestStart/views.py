@@ -1,5 +1,3 @@
-import random
-
 from django.db import transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, status
@@ -9,14 +7,17 @@ from rest_framework.response import Response
 from apps.course.api_endpoints.course.TestStart.serializers import TestStartSerializer
 from apps.course.models import (
     LessonPart,
-    Question,
     Test,
-    UserAnswer,
     UserCourse,
     UserLesson,
     UserLessonPart,
     UserTest,
 )
+from apps.course.services.access import is_free_lesson
+from apps.course.services.answer_sheets import new_answer_sheet
+from apps.course.services.grading import finish_user_test
+from apps.course.services.question_pool import sample_question_ids
+from apps.course.services.test_expiry import get_expires_at
 
 
 class TestStartAPIView(generics.CreateAPIView):
@@ -36,6 +37,11 @@ class TestStartAPIView(generics.CreateAPIView):
                 user=user, test=test, is_in_progress=True, is_submitted=False
             ).first()
 
+            if existing_test and existing_test.is_expired:
+                # Submit the overdue session the sweeper hasn't reached yet
+                finish_user_test(existing_test)
+                existing_test = None
+
             if existing_test:
                 # Return existing test session
                 serializer = self.get_serializer(existing_test)
@@ -57,21 +63,16 @@ class TestStartAPIView(generics.CreateAPIView):
                 attempt_number=attempt_number,
                 is_in_progress=True,
                 is_submitted=False,
+                expires_at=get_expires_at(test),
+                # Sampled questions, answers are added to the sheet as they come
+                answer_sheet=new_answer_sheet(sample_question_ids(test)),
             )
 
             # Find related lesson part and create/update UserLessonPart
             lesson_part = LessonPart.objects.filter(test=test, is_active=True).first()
             if lesson_part:
-                from apps.course.models import Lesson
-
-                # Check if this lesson is in the first 3 free lessons
-                first_three_lessons = list(
-                    Lesson.objects.filter(
-                        course=lesson_part.lesson.course, is_active=True
-                    ).order_by("order")[:3]
-                )
-
-                is_free_lesson = lesson_part.lesson in first_three_lessons
+                # Check if this lesson is one of the free trial lessons
+                is_free = is_free_lesson(lesson_part.lesson)
 
                 # Get or create UserCourse
                 # First try to get a paid UserCourse
@@ -81,7 +82,7 @@ class TestStartAPIView(generics.CreateAPIView):
 
                 if not user_course:
                     # User hasn't paid, check if it's a free lesson
-                    if is_free_lesson:
+                    if is_free:
                         # Create or get free trial UserCourse
                         user_course, created = UserCourse.objects.get_or_create(
                             user=user,
@@ -110,42 +111,8 @@ class TestStartAPIView(generics.CreateAPIView):
                 )
                 # Don't mark as completed yet - will be done in finish test API
 
-            # Generate random questions for the test
-            self._generate_user_answers(user_test, test)
-
             serializer = self.get_serializer(user_test)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-    def _generate_user_answers(self, user_test, test):
-        """Generate UserAnswer objects with random questions for the test"""
-        # Get all questions for this test with test relationship preloaded
-        all_questions = Question.objects.filter(
-            test=test, is_active=True
-        ).select_related("test").order_by("order")
-
-        questions_count = test.questions_count
-        total_available = all_questions.count()
-
-        # If we have fewer questions than requested, use all available
-        if total_available <= questions_count:
-            selected_questions = list(all_questions)
-        else:
-            # Randomly select questions
-            selected_questions = random.sample(list(all_questions), questions_count)
-
-        # Create UserAnswer objects for selected questions
-        user_answers = []
-        for question in selected_questions:
-            user_answer = UserAnswer(
-                user_test=user_test,
-                question=question,
-                # Don't set any answers yet - just create empty answer objects
-                is_correct=False,
-            )
-            user_answers.append(user_answer)
-
-        # Bulk create all user answers
-        UserAnswer.objects.bulk_create(user_answers)
-
 
 __all__ = ["TestStartAPIView"]
@@ -9,7 +9,7 @@ class UserCoursesListSerializer(serializers.ModelSerializer):
     """Serializer for UserCourse model in list view"""
 
     course = CourseSerializer()
-    completed_lessons_count = serializers.SerializerMethodField()
+    completed_lessons_count = serializers.IntegerField(read_only=True)
     is_group_member = serializers.SerializerMethodField()
 
     class Meta:
@@ -27,10 +27,6 @@ class UserCoursesListSerializer(serializers.ModelSerializer):
             "is_group_member",
         )
 
-    def get_completed_lessons_count(self, obj):
-        """Get the count of completed lessons for this user course"""
-        return obj.user_lessons.filter(is_completed=True).count()
-
     def get_is_group_member(self, obj):
         """Check if the user is a group member"""
         return GroupMember.objects.filter(
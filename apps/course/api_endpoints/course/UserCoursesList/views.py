@@ -26,10 +26,8 @@ class UserCoursesListAPIView(generics.ListAPIView):
     ordering = ("-start_date",)  # Default ordering by most recently started
 
     def get_queryset(self):
-        return (
-            UserCourse.objects.filter(user=self.request.user)
-            .select_related("course")
-            .prefetch_related("course__lessons", "user_lessons")
+        return UserCourse.objects.filter(user=self.request.user).select_related(
+            "course"
         )
 
 
@@ -2,6 +2,7 @@ from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
 
 from apps.course.models import Lesson, UserCourse, UserLesson
+from apps.course.services.access import is_free_lesson
 
 
 class UserLessonCreateSerializer(serializers.ModelSerializer):
@@ -48,14 +49,9 @@ class UserLessonCreateSerializer(serializers.ModelSerializer):
             try:
                 lesson = Lesson.objects.get(id=lesson_id)
 
-                # If user_course_id is not provided, check if lesson is in first 3 free lessons
+                # If user_course_id is not provided, check if lesson is a free lesson
                 if not user_course_id:
-                    # Get first 3 lessons of the course
-                    first_three_lessons = Lesson.objects.filter(
-                        course=lesson.course, is_active=True
-                    ).order_by("order")[:3]
-
-                    if lesson not in first_three_lessons:
+                    if not is_free_lesson(lesson):
                         raise serializers.ValidationError(
                             "This lesson is not available for free trial. Please purchase the course to access it."
                         )
@@ -3,6 +3,7 @@ from rest_framework import serializers
 
 from apps.course.choices import LessonPartType
 from apps.course.models import LessonPart, UserLesson, UserLessonPart
+from apps.course.services.access import is_free_lesson
 
 
 class UserLessonPartCreateSerializer(serializers.ModelSerializer):
@@ -72,14 +73,7 @@ class UserLessonPartCreateSerializer(serializers.ModelSerializer):
 
                 # Check if this is a free trial and validate lesson access
                 if user_lesson.user_course.is_free_trial:
-                    # Get first 3 lessons of the course
-                    first_three_lessons = list(
-                        user_lesson.lesson.course.lessons.filter(
-                            is_active=True
-                        ).order_by("order")[:3]
-                    )
-
-                    if user_lesson.lesson not in first_three_lessons:
+                    if not is_free_lesson(user_lesson.lesson):
                         raise serializers.ValidationError(
                             "This lesson is not available for free trial. Please purchase the course to access it."
                         )
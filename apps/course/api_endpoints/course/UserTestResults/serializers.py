@@ -1,12 +1,8 @@
 from rest_framework import serializers
 
-from apps.course.models import (
-    AnswerChoice,
-    MatchingPair,
-    Question,
-    UserAnswer,
-    UserTest,
-)
+from apps.course.models import AnswerChoice, MatchingPair, Question, UserTest
+from apps.course.services.answer_keys import get_book_question_list
+from apps.course.services.matching import expand_matching_answer
 
 
 class AnswerChoiceResultSerializer(serializers.ModelSerializer):
@@ -28,21 +24,10 @@ class AnswerChoiceResultSerializer(serializers.ModelSerializer):
 
     def get_is_user_selected(self, obj):
         """Check if this choice was selected by the user"""
-        user_test = self.context.get("user_test")
-        question = self.context.get("question")
-
-        if not user_test or not question:
-            return False
-
-        try:
-            user_answer = UserAnswer.objects.get(user_test=user_test, question=question)
-            return (
-                user_answer.selected_choice_id == obj.id
-                if user_answer.selected_choice
-                else False
-            )
-        except UserAnswer.DoesNotExist:
+        user_answer = self.context.get("user_answer")
+        if not user_answer or not user_answer.selected_choice_id:
             return False
+        return user_answer.selected_choice_id == obj.id
 
 
 class MatchingPairResultSerializer(serializers.ModelSerializer):
@@ -62,46 +47,30 @@ class MatchingPairResultSerializer(serializers.ModelSerializer):
             "order",
         )
 
+    def _get_matched_pair_id(self, obj):
+        user_answer = self.context.get("user_answer")
+        if user_answer and user_answer.matching_answer:
+            # matching_answer is a dict like {left_pair_id: right_pair_id}
+            return user_answer.matching_answer.get(str(obj.id))
+        return None
+
     def get_user_matched_right_item(self, obj):
         """Get the right item that user matched with this left item"""
-        user_test = self.context.get("user_test")
-        question = self.context.get("question")
-
-        if not user_test or not question:
-            return None
-
-        try:
-            user_answer = UserAnswer.objects.get(user_test=user_test, question=question)
-            if user_answer.matching_answer:
-                # matching_answer is a dict like {left_item: right_item}
-                return user_answer.matching_answer.get(obj.left_item)
-            return None
-        except UserAnswer.DoesNotExist:
-            return None
+        matched_pair = self.context["pairs"].get(self._get_matched_pair_id(obj))
+        return matched_pair.right_item if matched_pair else None
 
     def get_is_correct_match(self, obj):
         """Check if user's match for this pair is correct"""
-        user_test = self.context.get("user_test")
-        question = self.context.get("question")
-
-        if not user_test or not question:
-            return False
-
-        try:
-            user_answer = UserAnswer.objects.get(user_test=user_test, question=question)
-            if user_answer.matching_answer:
-                user_matched = user_answer.matching_answer.get(obj.left_item)
-                return user_matched == obj.right_item
-            return False
-        except UserAnswer.DoesNotExist:
-            return False
+        matched_pair = self.context["pairs"].get(self._get_matched_pair_id(obj))
+        # Pairs sharing a right item text are interchangeable
+        return bool(matched_pair) and matched_pair.right_item == obj.right_item
 
 
 class BookQuestionResultSerializer(serializers.Serializer):
     """Serializer for individual book test question results"""
 
     question_number = serializers.IntegerField()
-    expected_answer = serializers.CharField()
+    expected_answer = serializers.CharField(allow_null=True)
     user_answer = serializers.CharField(allow_null=True)
     is_correct = serializers.BooleanField()
 
@@ -144,174 +113,138 @@ class QuestionResultSerializer(serializers.ModelSerializer):
             "user_boolean_answer",
         )
 
+    def _get_test_type(self):
+        return self.context["user_test"].test.type
+
+    def _get_user_answer(self, obj):
+        """Return the user's answer to a question from the preloaded answers"""
+        return self.context.get("user_answers", {}).get(obj.id)
+
     def get_question_type(self, obj):
         """Get the question type based on test type"""
-        test_type = obj.test.type
+        test_type = self._get_test_type()
         if test_type == "regular_test":
             return obj.regular_question_type
         return test_type
 
     def get_user_answer_status(self, obj):
         """Get user's answer status for this question"""
-        user_test = self.context.get("user_test")
-        if not user_test:
-            return "not_answered"
-
-        try:
-            user_answer = UserAnswer.objects.get(user_test=user_test, question=obj)
-            return "correct" if user_answer.is_correct else "incorrect"
-        except UserAnswer.DoesNotExist:
+        user_answer = self._get_user_answer(obj)
+        if not user_answer:
             return "not_answered"
+        return "correct" if user_answer.is_correct else "incorrect"
 
     def get_choices(self, obj):
         """Get all answer choices with information about correctness and user selection (for regular tests)"""
-        if obj.test.type != "regular_test":
+        if self._get_test_type() != "regular_test":
             return None
 
-        choices = obj.choices.all().order_by("order")
+        # Choices are prefetched in order
         return AnswerChoiceResultSerializer(
-            choices,
+            obj.choices.all(),
             many=True,
-            context={
-                "user_test": self.context.get("user_test"),
-                "question": obj,
-            },
+            context={"user_answer": self._get_user_answer(obj)},
         ).data
 
     def get_user_selected_choice_id(self, obj):
         """Get the ID of the choice selected by the user (for regular tests)"""
-        if obj.test.type != "regular_test":
+        if self._get_test_type() != "regular_test":
             return None
 
-        user_test = self.context.get("user_test")
-        if not user_test:
-            return None
-
-        try:
-            user_answer = UserAnswer.objects.get(user_test=user_test, question=obj)
-            return (
-                user_answer.selected_choice_id if user_answer.selected_choice else None
-            )
-        except UserAnswer.DoesNotExist:
+        user_answer = self._get_user_answer(obj)
+        if not user_answer:
             return None
+        return user_answer.selected_choice_id
 
     def get_matching_pairs(self, obj):
         """Get all matching pairs with user's answers (for matching tests)"""
-        if obj.test.type != "matching":
+        if self._get_test_type() != "matching":
             return None
 
-        pairs = obj.matching_pairs.all().order_by("order")
+        # Pairs are prefetched in order
+        pairs = obj.matching_pairs.all()
         return MatchingPairResultSerializer(
             pairs,
             many=True,
             context={
-                "user_test": self.context.get("user_test"),
-                "question": obj,
+                "user_answer": self._get_user_answer(obj),
+                "pairs": {pair.id: pair for pair in pairs},
             },
         ).data
 
     def get_user_matching_answer(self, obj):
-        """Get user's matching answer as a dictionary (for matching tests)"""
-        if obj.test.type != "matching":
-            return None
-
-        user_test = self.context.get("user_test")
-        if not user_test:
+        """Get user's matching answer as {left_item: right_item} (for matching tests)"""
+        if self._get_test_type() != "matching":
             return None
 
-        try:
-            user_answer = UserAnswer.objects.get(user_test=user_test, question=obj)
-            return user_answer.matching_answer
-        except UserAnswer.DoesNotExist:
+        user_answer = self._get_user_answer(obj)
+        if not user_answer:
             return None
+        entry = {
+            "pairs": [
+                (pair.id, pair.left_item, pair.right_item)
+                for pair in obj.matching_pairs.all()
+            ]
+        }
+        return expand_matching_answer(entry, user_answer.matching_answer)
 
     def get_book_questions_data(self, obj):
         """Get book test questions with user's answers (for book tests)"""
-        if obj.test.type != "book_test":
+        if self._get_test_type() != "book_test":
             return None
 
-        user_test = self.context.get("user_test")
         if not obj.book_questions:
             return None
 
         # Get user's answers
+        user_answer = self._get_user_answer(obj)
         user_answers = []
-        try:
-            user_answer = UserAnswer.objects.get(user_test=user_test, question=obj)
-            user_answers = user_answer.book_answer if user_answer.book_answer else []
-        except UserAnswer.DoesNotExist:
-            pass
+        if user_answer and user_answer.book_answer:
+            user_answers = user_answer.book_answer
 
-        # Parse book questions structure
+        # The answer key keeps the positions of book_questions
+        questions_list = get_book_question_list(obj.book_questions) or []
         book_questions_list = []
-        if isinstance(obj.book_questions, list) and len(obj.book_questions) > 0:
-            book_data = obj.book_questions[0]
-            if isinstance(book_data, dict) and "questions" in book_data:
-                questions_list = book_data["questions"]
-
-                for i, book_question in enumerate(questions_list):
-                    question_number = book_question.get("question_number", i + 1)
-                    expected_answer = book_question.get("expected_answer", "")
-                    user_answer_value = (
-                        user_answers[i] if i < len(user_answers) else None
-                    )
-                    is_correct = (
-                        user_answer_value == expected_answer
-                        if user_answer_value
-                        else False
-                    )
-
-                    book_questions_list.append(
-                        {
-                            "question_number": question_number,
-                            "expected_answer": expected_answer,
-                            "user_answer": user_answer_value,
-                            "is_correct": is_correct,
-                        }
-                    )
-            else:
-                # Fallback for old structure
-                for i, book_question in enumerate(obj.book_questions):
-                    question_number = book_question.get("question_number", i + 1)
-                    expected_answer = book_question.get("expected_answer", "")
-                    user_answer_value = (
-                        user_answers[i] if i < len(user_answers) else None
-                    )
-                    is_correct = (
-                        user_answer_value == expected_answer
-                        if user_answer_value
-                        else False
-                    )
-
-                    book_questions_list.append(
-                        {
-                            "question_number": question_number,
-                            "expected_answer": expected_answer,
-                            "user_answer": user_answer_value,
-                            "is_correct": is_correct,
-                        }
-                    )
+        for i, expected_answer in enumerate(obj.book_answer_key):
+            question_number = i + 1
+            if i < len(questions_list) and isinstance(questions_list[i], dict):
+                question_number = questions_list[i].get(
+                    "question_number", question_number
+                )
+            user_answer_value = user_answers[i] if i < len(user_answers) else None
+            is_correct = (
+                user_answer_value == expected_answer if user_answer_value else False
+            )
+
+            book_questions_list.append(
+                {
+                    "question_number": question_number,
+                    "expected_answer": expected_answer,
+                    "user_answer": user_answer_value,
+                    "is_correct": is_correct,
+                }
+            )
 
         return book_questions_list
 
     def get_user_boolean_answer(self, obj):
         """Get user's boolean answer (for true/false tests)"""
-        if obj.test.type != "true_false":
+        if self._get_test_type() != "true_false":
             return None
 
-        user_test = self.context.get("user_test")
-        if not user_test:
-            return None
-
-        try:
-            user_answer = UserAnswer.objects.get(user_test=user_test, question=obj)
-            return user_answer.boolean_answer
-        except UserAnswer.DoesNotExist:
+        user_answer = self._get_user_answer(obj)
+        if not user_answer:
             return None
+        return user_answer.boolean_answer
 
 
 class UserTestResultsSerializer(serializers.ModelSerializer):
-    """Serializer for user test results with detailed information"""
+    """
+    Serializer for user test results with detailed information.
+
+    Expects "questions", "user_answers" ({question_id: UserAnswer}) and
+    "lesson_part" in its context, see services.test_results.
+    """
 
     total_questions = serializers.SerializerMethodField()
     attempts_count = serializers.SerializerMethodField()
@@ -343,31 +276,23 @@ class UserTestResultsSerializer(serializers.ModelSerializer):
         )
 
     def get_total_questions(self, obj):
-        """Get total number of questions in the test"""
-        return obj.test.questions.filter(is_active=True).count()
+        """Get the number of active questions the attempt was given"""
+        return len(self.context["questions"])
 
     def get_attempts_count(self, obj):
         """Get total number of attempts by this user for this test"""
-        return UserTest.objects.filter(user=obj.user, test=obj.test).count()
+        return UserTest.objects.filter(user_id=obj.user_id, test_id=obj.test_id).count()
 
     def get_award_coins(self, obj):
         """Get coins awarded for this test (from related lesson part)"""
-        # Find the lesson part that contains this test
-        from apps.course.models import LessonPart
-
-        lesson_part = LessonPart.objects.filter(test=obj.test, is_active=True).first()
-
+        lesson_part = self.context.get("lesson_part")
         if lesson_part:
             return lesson_part.award_coin
         return 0
 
     def get_award_points(self, obj):
         """Get points awarded for this test (from related lesson part)"""
-        # Find the lesson part that contains this test
-        from apps.course.models import LessonPart
-
-        lesson_part = LessonPart.objects.filter(test=obj.test, is_active=True).first()
-
+        lesson_part = self.context.get("lesson_part")
         if lesson_part:
             return lesson_part.award_point
         return 0
@@ -380,7 +305,11 @@ class UserTestResultsSerializer(serializers.ModelSerializer):
 
     def get_questions(self, obj):
         """Get all questions with user's answer status"""
-        questions = obj.test.questions.filter(is_active=True).order_by("order")
         return QuestionResultSerializer(
-            questions, many=True, context={"user_test": obj}
+            self.context["questions"],
+            many=True,
+            context={
+                "user_test": obj,
+                "user_answers": self.context["user_answers"],
+            },
         ).data
@@ -1,11 +1,17 @@
 from django.shortcuts import get_object_or_404
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
 from apps.course.api_endpoints.course.UserTestResults.serializers import (
     UserTestResultsSerializer,
 )
 from apps.course.models import UserTest
+from apps.course.services.test_results import (
+    absolutize_result_urls,
+    build_result_snapshot,
+    store_result_snapshot,
+)
 
 
 class UserTestResultsAPIView(generics.RetrieveAPIView):
@@ -24,15 +30,27 @@ class UserTestResultsAPIView(generics.RetrieveAPIView):
 
         # Get the user test, ensuring it belongs to the authenticated user
         return get_object_or_404(
-            UserTest.objects.select_related("test", "user").prefetch_related(
-                "test__questions__choices",  # Prefetch choices for regular test questions
-                "test__questions__matching_pairs",  # Prefetch matching pairs for matching questions
-                "user_answers__selected_choice",  # Prefetch selected choices in user answers
-                "user_answers__question",  # Prefetch questions in user answers
-            ),
+            UserTest.objects.select_related("test"),
             id=user_test_id,
             user=user,
         )
 
+    def retrieve(self, request, *args, **kwargs):
+        user_test = self.get_object()
+
+        if user_test.result_snapshot is not None:
+            data = dict(user_test.result_snapshot)
+            # Later attempts change the count, so it is not part of the snapshot
+            data["attempts_count"] = UserTest.objects.filter(
+                user_id=user_test.user_id, test_id=user_test.test_id
+            ).count()
+        elif user_test.is_submitted:
+            data = store_result_snapshot(user_test)
+        else:
+            # Attempts in progress are built on the fly and not stored
+            data = build_result_snapshot(user_test)
+        # Snapshots keep relative file urls, they are served absolute
+        return Response(absolutize_result_urls(data, request))
+
 
 __all__ = ["UserTestResultsAPIView"]
@@ -0,0 +1,83 @@
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.course.api_endpoints.course.VideoUploadCreate.serializers import (
+    VideoUploadSerializer,
+)
+from apps.course.choices import VideoUploadStatus
+from apps.course.models import VideoUpload
+from apps.course.services.video_uploads import append_chunk, parse_content_range
+from apps.course.tasks import complete_video_upload
+
+
+class VideoUploadChunkAPIView(APIView):
+    """
+    Resumable upload of a lesson part video, for staff users.
+
+    GET returns the offset to resume from. PATCH appends the raw request body
+    at "Content-Range: bytes <first>-<last>/<size>", where first must be the
+    current offset. The response carries the new offset, also in the
+    Upload-Offset header. After the last chunk the upload is "verifying" until
+    a background task has checked the checksum and attached the video; poll
+    GET until it is "completed" or "failed".
+    """
+
+    permission_classes = (IsAdminUser,)
+    serializer_class = VideoUploadSerializer
+
+    def get_object(self, for_update=False):
+        uploads = VideoUpload.objects.filter(uploaded_by=self.request.user)
+        if for_update:
+            # Chunks of one upload are written one at a time
+            uploads = uploads.select_for_update()
+        return get_object_or_404(uploads, id=self.kwargs.get("id"))
+
+    def get_response(self, upload, status_code=status.HTTP_200_OK):
+        response = Response(self.serializer_class(upload).data, status=status_code)
+        response["Upload-Offset"] = str(upload.offset)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        return self.get_response(self.get_object())
+
+    def patch(self, request, *args, **kwargs):
+        upload = self.get_object(for_update=True)
+        if upload.status != VideoUploadStatus.UPLOADING:
+            raise ValidationError(
+                {"upload": "The upload is not in progress"}, code="closed"
+            )
+
+        content_range = parse_content_range(request.headers.get("Content-Range"))
+        if not content_range or content_range[2] != upload.size:
+            raise ValidationError(
+                {"content_range": f"Expected bytes <first>-<last>/{upload.size}"},
+                code="invalid",
+            )
+        first, last, _ = content_range
+        length = last - first + 1
+        if request.headers.get("Content-Length") != str(length):
+            raise ValidationError(
+                {"content_length": "Content-Length must match Content-Range"},
+                code="invalid",
+            )
+        if first != upload.offset:
+            # Lost responses of earlier chunks: resume from the stored offset
+            return self.get_response(upload, status.HTTP_409_CONFLICT)
+
+        append_chunk(upload, request.stream, length)
+        update_fields = ["offset", "updated_at"]
+        if upload.offset == upload.size:
+            # Hashing a large file takes too long for the request
+            upload.status = VideoUploadStatus.VERIFYING
+            update_fields.append("status")
+            transaction.on_commit(lambda: complete_video_upload.delay(upload.id))
+        upload.save(update_fields=update_fields)
+        return self.get_response(upload)
+
+
+__all__ = ["VideoUploadChunkAPIView"]
@@ -0,0 +1,27 @@
+from rest_framework import serializers
+
+from apps.course.models import VideoUpload
+
+
+class VideoUploadSerializer(serializers.ModelSerializer):
+    checksum = serializers.RegexField(
+        r"^[0-9a-fA-F]{64}$",
+        required=False,
+        allow_blank=True,
+        write_only=True,
+        help_text="Hex SHA-256 of the whole file, verified when the upload completes",
+    )
+    size = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = VideoUpload
+        fields = (
+            "id",
+            "lesson_part",
+            "filename",
+            "size",
+            "offset",
+            "checksum",
+            "status",
+        )
+        read_only_fields = ("id", "lesson_part", "offset", "status")
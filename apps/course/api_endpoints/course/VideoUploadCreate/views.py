@@ -0,0 +1,27 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import generics
+from rest_framework.permissions import IsAdminUser
+
+from apps.course.api_endpoints.course.VideoUploadCreate.serializers import (
+    VideoUploadSerializer,
+)
+from apps.course.models import LessonPart
+
+
+class VideoUploadCreateAPIView(generics.CreateAPIView):
+    """
+    Start a resumable upload of a lesson part video, for staff users.
+
+    The file is then sent to the returned upload with PATCH requests, see
+    VideoUploadChunkAPIView.
+    """
+
+    serializer_class = VideoUploadSerializer
+    permission_classes = (IsAdminUser,)
+
+    def perform_create(self, serializer):
+        lesson_part = get_object_or_404(LessonPart, id=self.kwargs.get("id"))
+        serializer.save(lesson_part=lesson_part, uploaded_by=self.request.user)
+
+
+__all__ = ["VideoUploadCreateAPIView"]
@@ -1,11 +1,14 @@
 from .CourseList.views import *  # noqa
 from .FinishTest.views import *  # noqa
 from .LessonPartDetail.views import *  # noqa
+from .LessonPartHlsProgress.views import *  # noqa
 from .LessonPartList.views import *  # noqa
 from .LessonsList.views import *  # noqa
+from .QuestionStats.views import *  # noqa
 from .Roadmap.views import *  # noqa
 from .SubjectList.views import *  # noqa
 from .SubmitAnswer.views import *  # noqa
+from .SubmitAnswers.views import *  # noqa
 from .TestDetail.views import *  # noqa
 from .TestQuestions.views import *  # noqa
 from .TestStart.views import *  # noqa
@@ -13,3 +16,5 @@ from .UserCoursesList.views import *  # noqa
 from .UserLessonCreate.views import *  # noqa
 from .UserLessonPartCreate.views import *  # noqa
 from .UserTestResults.views import *  # noqa  # noqa
+from .VideoUploadChunk.views import *  # noqa
+from .VideoUploadCreate.views import *  # noqa
@@ -20,3 +20,10 @@ class QuestionType(models.TextChoices):
     TEXT_CHOICE = "text_choice", _("Text Choice")  # A, B, C, D options
     IMAGE_CHOICE = "image_choice", _("Image Choice")  # Image options
     VIDEO_CHOICE = "video_choice", _("Video Choice")  # Video with A, B, C, D options
+
+
+class VideoUploadStatus(models.TextChoices):
+    UPLOADING = "uploading", _("Uploading")
+    VERIFYING = "verifying", _("Verifying")
+    COMPLETED = "completed", _("Completed")
+    FAILED = "failed", _("Failed")
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+
+from apps.course.models import LessonPart
+from apps.course.services.hls import is_ladder_url, remove_legacy_output
+from apps.course.tasks import convert_video_to_hls
+
+
+class Command(BaseCommand):
+    help = "Re-encode lesson videos converted before the HLS rendition ladder"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lesson-part",
+            type=int,
+            nargs="*",
+            dest="lesson_part_ids",
+            help="Only re-encode these lesson parts",
+        )
+        parser.add_argument(
+            "--remove-legacy",
+            action="store_true",
+            help=(
+                "Instead of re-encoding, delete the single rendition output of "
+                "lesson parts that already play from the ladder"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        lesson_parts = LessonPart.objects.exclude(video="").exclude(video__isnull=True)
+        if options["lesson_part_ids"]:
+            lesson_parts = lesson_parts.filter(id__in=options["lesson_part_ids"])
+
+        if options["remove_legacy"]:
+            removed = 0
+            for lesson_part_id, hls_video_url in lesson_parts.values_list(
+                "id", "hls_video_url"
+            ):
+                if is_ladder_url(hls_video_url):
+                    removed += remove_legacy_output(lesson_part_id)
+            self.stdout.write(self.style.SUCCESS(f"Removed {removed} legacy files"))
+            return
+
+        queued = 0
+        for lesson_part_id, hls_video_url in lesson_parts.values_list(
+            "id", "hls_video_url"
+        ):
+            if is_ladder_url(hls_video_url):
+                continue
+            # Videos that already play keep their output until the ladder is ready
+            convert_video_to_hls.delay(lesson_part_id, backfill=bool(hls_video_url))
+            queued += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Queued HLS re-encoding of {queued} lesson parts")
+        )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from apps.course.models import File, Gallery, LessonPart
+from apps.course.services.media_hashes import (
+    fill_missing_hashes,
+    merge_duplicate_files,
+    remove_unused_hls_outputs,
+)
+
+MEDIA_FIELDS = [(Gallery, "image"), (File, "file"), (LessonPart, "video")]
+
+
+class Command(BaseCommand):
+    help = "Hash media uploaded before deduplication and delete duplicate copies"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--remove-unused-hls",
+            action="store_true",
+            help="Also delete HLS outputs of videos no lesson part uses any more",
+        )
+
+    def handle(self, *args, **options):
+        for model, field_name in MEDIA_FIELDS:
+            label = model._meta.verbose_name_plural
+            filled = fill_missing_hashes(model, field_name)
+            deleted = merge_duplicate_files(model, field_name)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{label}: hashed {filled} files, deleted {deleted} duplicates"
+                )
+            )
+
+        if options["remove_unused_hls"]:
+            removed = remove_unused_hls_outputs()
+            self.stdout.write(self.style.SUCCESS(f"Removed {removed} HLS outputs"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from apps.course.services.answer_sheets import materialize_submitted_answer_sheets
+
+
+class Command(BaseCommand):
+    help = "Create UserAnswer rows from the answer sheets of submitted attempts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--test",
+            type=int,
+            nargs="*",
+            dest="test_ids",
+            help="Only materialize attempts of these tests",
+        )
+
+    def handle(self, *args, **options):
+        written = materialize_submitted_answer_sheets(test_ids=options["test_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Materialized {written} user answers"))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.course.services.catalog import bump_catalog_version
+from apps.course.services.counters import (
+    refresh_course_lessons_count,
+    refresh_lesson_parts_count,
+)
+
+
+class Command(BaseCommand):
+    help = "Rebuild denormalized active lesson and part counters"
+
+    def handle(self, *args, **options):
+        lessons_updated = refresh_lesson_parts_count()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt parts_count for {lessons_updated} lessons")
+        )
+
+        courses_updated = refresh_course_lessons_count()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt lessons_count for {courses_updated} courses")
+        )
+
+        # Cached catalog payloads carry the counters
+        bump_catalog_version()
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.course.services.counters import refresh_user_progress_counters
+
+
+class Command(BaseCommand):
+    help = "Recount completed parts and lessons of user lessons and courses"
+
+    def handle(self, *args, **options):
+        lessons_updated, courses_updated = refresh_user_progress_counters()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt progress of {lessons_updated} user lessons "
+                f"and {courses_updated} user courses"
+            )
+        )
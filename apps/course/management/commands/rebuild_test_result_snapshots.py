@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from apps.course.services.test_results import rebuild_result_snapshots
+
+
+class Command(BaseCommand):
+    help = "Build result snapshots of submitted test attempts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rebuild every snapshot instead of only the missing ones",
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_result_snapshots(missing_only=not options["all"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Built result snapshots of {rebuilt} user tests")
+        )
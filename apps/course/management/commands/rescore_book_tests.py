@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from apps.course.choices import TestType
+from apps.course.models import Test
+from apps.course.services.regrading import regrade_test
+
+
+class Command(BaseCommand):
+    help = "Rescore submitted book test attempts against the current answer keys"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--test",
+            type=int,
+            nargs="*",
+            dest="test_ids",
+            help="Only rescore these tests",
+        )
+
+    def handle(self, *args, **options):
+        tests = Test.objects.filter(type=TestType.BOOK_TEST)
+        if options["test_ids"]:
+            tests = tests.filter(id__in=options["test_ids"])
+
+        for test_id in tests.values_list("id", flat=True):
+            report = regrade_test(test_id)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Test {test_id}: rescored {report['answers_updated']} answers "
+                    f"and {len(report['user_tests'])} user tests"
+                )
+            )
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.3 on 2026-10-17 10:21
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Course = apps.get_model("course", "Course")
+    Lesson = apps.get_model("course", "Lesson")
+    LessonPart = apps.get_model("course", "LessonPart")
+
+    def active_count(model, parent_field):
+        return Coalesce(
+            Subquery(
+                model.objects.filter(**{parent_field: OuterRef("pk")}, is_active=True)
+                .order_by()
+                .values(parent_field)
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            0,
+        )
+
+    Lesson.objects.update(parts_count=active_count(LessonPart, "lesson"))
+    Course.objects.update(lessons_count=active_count(Lesson, "course"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("course", "0030_alter_answerchoice_choice_text_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="lessons_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Lessons Count"
+            ),
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="parts_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Parts Count"
+            ),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
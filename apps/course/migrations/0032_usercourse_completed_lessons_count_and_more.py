@@ -0,0 +1,56 @@
+# Generated by Django 5.2.3 on 2026-10-17 10:26
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    UserCourse = apps.get_model("course", "UserCourse")
+    UserLesson = apps.get_model("course", "UserLesson")
+    UserLessonPart = apps.get_model("course", "UserLessonPart")
+
+    def completed_count(model, parent_field):
+        return Coalesce(
+            Subquery(
+                model.objects.filter(
+                    **{parent_field: OuterRef("pk")}, is_completed=True
+                )
+                .order_by()
+                .values(parent_field)
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            0,
+        )
+
+    UserLesson.objects.update(
+        completed_parts_count=completed_count(UserLessonPart, "user_lesson")
+    )
+    UserCourse.objects.update(
+        completed_lessons_count=completed_count(UserLesson, "user_course")
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("course", "0031_course_lessons_count_lesson_parts_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="usercourse",
+            name="completed_lessons_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Completed Lessons Count"
+            ),
+        ),
+        migrations.AddField(
+            model_name="userlesson",
+            name="completed_parts_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Completed Parts Count"
+            ),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.3 on 2026-10-17 10:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("course", "0032_usercourse_completed_lessons_count_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="test",
+            name="question_strata",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                help_text="Optional sampling by question order ranges, e.g. [{'from_order': 1, 'to_order': 50, 'count': 5}]. If empty, questions_count questions are drawn from all questions.",
+                verbose_name="Question Strata",
+            ),
+        ),
+    ]
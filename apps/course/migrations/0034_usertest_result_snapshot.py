@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-17 10:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("course", "0033_test_question_strata"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="usertest",
+            name="result_snapshot",
+            field=models.JSONField(
+                blank=True, editable=False, null=True, verbose_name="Result Snapshot"
+            ),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.3 on 2026-10-17 10:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("course", "0034_usertest_result_snapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuestionStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+                ),
+                (
+                    "attempts_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Attempts Count"
+                    ),
+                ),
+                (
+                    "answered_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Answered Count"
+                    ),
+                ),
+                (
+                    "correct_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Correct Count"
+                    ),
+                ),
+                (
+                    "choice_counts",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="Choice Counts"
+                    ),
+                ),
+                (
+                    "total_answer_seconds",
+                    models.FloatField(default=0, verbose_name="Total Answer Seconds"),
+                ),
+                (
+                    "question",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stats",
+                        to="course.question",
+                        verbose_name="Question",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Question Stats",
+                "verbose_name_plural": "Question Stats",
+            },
+        ),
+    ]
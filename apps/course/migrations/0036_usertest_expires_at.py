@@ -0,0 +1,56 @@
+# Generated by Django 5.2.3 on 2026-10-17 10:41
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def populate_expires_at(apps, schema_editor):
+    UserTest = apps.get_model("course", "UserTest")
+
+    in_progress = UserTest.objects.filter(is_in_progress=True)
+    durations = (
+        in_progress.filter(test__test_duration__isnull=False)
+        .values_list("test__test_duration", flat=True)
+        .distinct()
+    )
+    for duration in durations:
+        in_progress.filter(test__test_duration=duration).update(
+            expires_at=F("start_date") + timedelta(minutes=duration)
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("course", "0035_questionstats"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="usertest",
+            name="expires_at",
+            field=models.DateTimeField(
+                blank=True, editable=False, null=True, verbose_name="Expires At"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="usertest",
+            index=models.Index(
+                condition=models.Q(("is_in_progress", True)),
+                fields=["expires_at"],
+                name="usertest_expiry_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="usertest",
+            index=models.Index(
+                condition=models.Q(("is_in_progress", True)),
+                fields=["user", "test"],
+                name="usertest_in_progress_idx",
+            ),
+        ),
+        migrations.RunPython(populate_expires_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+from django.db import migrations
+
+CHUNK_SIZE = 500
+
+
+def convert_matching_answers(apps, convert):
+    UserAnswer = apps.get_model("course", "UserAnswer")
+    MatchingPair = apps.get_model("course", "MatchingPair")
+
+    answers = UserAnswer.objects.filter(matching_answer__isnull=False).order_by("pk")
+    last_pk = 0
+    while True:
+        chunk = list(answers.filter(pk__gt=last_pk)[:CHUNK_SIZE])
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+
+        pairs = {}
+        for pair in MatchingPair.objects.filter(
+            question_id__in={answer.question_id for answer in chunk}
+        ).order_by("order", "id"):
+            pairs.setdefault(pair.question_id, []).append(pair)
+
+        changed = []
+        for answer in chunk:
+            if not isinstance(answer.matching_answer, dict):
+                continue
+            matching_answer = convert(pairs.get(answer.question_id, []), answer)
+            if matching_answer != answer.matching_answer:
+                answer.matching_answer = matching_answer
+                changed.append(answer)
+        UserAnswer.objects.bulk_update(changed, ["matching_answer"])
+
+
+def is_pair_ids(matching_answer):
+    return all(
+        isinstance(left_id, str) and left_id.isdigit() and isinstance(right_id, int)
+        for left_id, right_id in matching_answer.items()
+    )
+
+
+def texts_to_pair_ids(pairs, answer):
+    if is_pair_ids(answer.matching_answer):
+        return answer.matching_answer
+
+    left_pairs = {pair.left_item: pair for pair in pairs}
+    right_ids = {}
+    for pair in pairs:
+        right_ids.setdefault(pair.right_item, pair.id)
+
+    # Items that are no longer part of the question are dropped
+    matching_answer = {}
+    for left_item, right_item in answer.matching_answer.items():
+        left_pair = left_pairs.get(left_item)
+        if not left_pair or right_item not in right_ids:
+            continue
+        if right_item == left_pair.right_item:
+            matching_answer[str(left_pair.id)] = left_pair.id
+        else:
+            matching_answer[str(left_pair.id)] = right_ids[right_item]
+    return matching_answer
+
+
+def pair_ids_to_texts(pairs, answer):
+    if not is_pair_ids(answer.matching_answer):
+        return answer.matching_answer
+
+    pairs = {pair.id: pair for pair in pairs}
+    return {
+        pairs[int(left_id)].left_item: pairs[right_id].right_item
+        for left_id, right_id in answer.matching_answer.items()
+        if int(left_id) in pairs and right_id in pairs
+    }
+
+
+def forwards(apps, schema_editor):
+    convert_matching_answers(apps, texts_to_pair_ids)
+
+
+def backwards(apps, schema_editor):
+    convert_matching_answers(apps, pair_ids_to_texts)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("course", "0036_usertest_expires_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
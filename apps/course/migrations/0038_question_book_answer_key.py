@@ -0,0 +1,57 @@
+# Generated by Django 5.2.3 on 2026-10-17 10:45
+
+from django.db import migrations, models
+
+CHUNK_SIZE = 500
+
+
+def flatten_book_questions(book_questions):
+    if not book_questions or not isinstance(book_questions, list):
+        return []
+
+    book_data = book_questions[0]
+    if isinstance(book_data, dict) and "questions" in book_data:
+        questions_list = book_data["questions"]
+    else:
+        questions_list = book_questions
+    if not isinstance(questions_list, list):
+        return []
+    return [
+        question.get("expected_answer") if isinstance(question, dict) else None
+        for question in questions_list
+    ]
+
+
+def populate_book_answer_key(apps, schema_editor):
+    Question = apps.get_model("course", "Question")
+
+    questions = Question.objects.exclude(book_questions__isnull=True).order_by("pk")
+    last_pk = 0
+    while True:
+        chunk = list(
+            questions.filter(pk__gt=last_pk).only("pk", "book_questions")[:CHUNK_SIZE]
+        )
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+
+        for question in chunk:
+            question.book_answer_key = flatten_book_questions(question.book_questions)
+        Question.objects.bulk_update(chunk, ["book_answer_key"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("course", "0037_matching_answer_pair_ids"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="question",
+            name="book_answer_key",
+            field=models.JSONField(
+                blank=True, default=list, editable=False, verbose_name="Book Answer Key"
+            ),
+        ),
+        migrations.RunPython(populate_book_answer_key, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-17 10:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("course", "0038_question_book_answer_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="usertest",
+            name="answer_sheet",
+            field=models.JSONField(
+                blank=True, editable=False, null=True, verbose_name="Answer Sheet"
+            ),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.3 on 2026-10-17 11:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("course", "0039_usertest_answer_sheet"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VideoUpload",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+                ),
+                ("filename", models.CharField(max_length=255, verbose_name="Filename")),
+                ("size", models.PositiveBigIntegerField(verbose_name="Size")),
+                (
+                    "offset",
+                    models.PositiveBigIntegerField(default=0, verbose_name="Offset"),
+                ),
+                (
+                    "checksum",
+                    models.CharField(
+                        blank=True, max_length=64, verbose_name="Checksum"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("uploading", "Uploading"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="uploading",
+                        max_length=20,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "lesson_part",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="video_uploads",
+                        to="course.lessonpart",
+                        verbose_name="Lesson Part",
+                    ),
+                ),
+                (
+                    "uploaded_by",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="video_uploads",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Uploaded By",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Video Upload",
+                "verbose_name_plural": "Video Uploads",
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.3 on 2026-10-17 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("course", "0040_videoupload"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="file",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                max_length=64,
+                verbose_name="Content Hash",
+            ),
+        ),
+        migrations.AddField(
+            model_name="gallery",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                max_length=64,
+                verbose_name="Content Hash",
+            ),
+        ),
+        migrations.AddField(
+            model_name="lessonpart",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                max_length=64,
+                verbose_name="Content Hash",
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-17 11:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("course", "0041_content_hash"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="videoupload",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("uploading", "Uploading"),
+                    ("verifying", "Verifying"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="uploading",
+                max_length=20,
+                verbose_name="Status",
+            ),
+        ),
+    ]
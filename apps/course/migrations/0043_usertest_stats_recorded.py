@@ -0,0 +1,26 @@
+# Generated by Django 5.2.3 on 2026-10-17 11:31
+
+from django.db import migrations, models
+
+
+def mark_submitted_attempts(apps, schema_editor):
+    # Submitted attempts are already counted in QuestionStats
+    UserTest = apps.get_model("course", "UserTest")
+    UserTest.objects.filter(is_submitted=True).update(stats_recorded=True)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("course", "0042_videoupload_verifying_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="usertest",
+            name="stats_recorded",
+            field=models.BooleanField(
+                default=False, editable=False, verbose_name="Stats Recorded"
+            ),
+        ),
+        migrations.RunPython(mark_submitted_attempts, migrations.RunPython.noop),
+    ]
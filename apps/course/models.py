@@ -1,19 +1,46 @@
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Least, NullIf
 from django.utils import timezone
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 from tinymce.models import HTMLField
 
 from apps.common.models import BaseModel
-from apps.course.choices import LessonPartType, QuestionType, TestType
+from apps.course.choices import (
+    LessonPartType,
+    QuestionType,
+    TestType,
+    VideoUploadStatus,
+)
+from apps.users.models import BalanceEntry
 
 User = get_user_model()
 
 
+def progress_percent_expression(completed, total, empty=100.0):
+    """
+    SQL expression for completed / total as a percentage, capped at 100.
+    `empty` is used when there is nothing to complete (total == 0).
+    """
+    return Coalesce(
+        Least(
+            Value(100.0),
+            completed * Value(100.0) / NullIf(total, Value(0)),
+        ),
+        Value(empty),
+        output_field=models.FloatField(),
+    )
+
+
 class Gallery(BaseModel):
     image = models.ImageField(_("Image"), upload_to="galleries/", null=True, blank=True)
+    # SHA-256 of the file, identical uploads share one stored file
+    content_hash = models.CharField(
+        _("Content Hash"), max_length=64, blank=True, db_index=True, editable=False
+    )
 
     def __str__(self):
         return self.image.name
@@ -25,6 +52,10 @@ class Gallery(BaseModel):
 
 class File(BaseModel):
     file = models.FileField(_("File"), upload_to="files/", null=True, blank=True)
+    # SHA-256 of the file, identical uploads share one stored file
+    content_hash = models.CharField(
+        _("Content Hash"), max_length=64, blank=True, db_index=True, editable=False
+    )
 
     def __str__(self):
         return self.file.name
@@ -96,6 +127,11 @@ class Course(BaseModel):
         _("Is Can Pay With Referral"), default=False
     )
 
+    # Denormalized counter, maintained by signals
+    lessons_count = models.PositiveIntegerField(
+        _("Lessons Count"), default=0, editable=False
+    )
+
     class Meta:
         verbose_name = _("Course")
         verbose_name_plural = _("Courses")
@@ -120,6 +156,11 @@ class Lesson(BaseModel):
     practical_pass_ball = models.IntegerField(_("Practical Pass Ball"), default=0)
     is_active = models.BooleanField(_("Is Active"), default=True)
 
+    # Denormalized counter, maintained by signals
+    parts_count = models.PositiveIntegerField(
+        _("Parts Count"), default=0, editable=False
+    )
+
     def __str__(self):
         return self.title
 
@@ -146,6 +187,14 @@ class Test(BaseModel):
         default=10,
         help_text="Number of random questions to show to user",
     )
+    question_strata = models.JSONField(
+        _("Question Strata"),
+        default=list,
+        blank=True,
+        help_text="Optional sampling by question order ranges, e.g. "
+        "[{'from_order': 1, 'to_order': 50, 'count': 5}]. "
+        "If empty, questions_count questions are drawn from all questions.",
+    )
     attached_files = models.ManyToManyField(
         "course.File", related_name="tests", blank=True
     )
@@ -154,6 +203,31 @@ class Test(BaseModel):
     def __str__(self):
         return self.title
 
+    def clean(self):
+        """Validate the question sampling strata"""
+
+        def is_int(value):
+            # bool is an int subclass but not a valid count or order
+            return isinstance(value, int) and not isinstance(value, bool)
+
+        if not isinstance(self.question_strata, list) or not all(
+            isinstance(stratum, dict)
+            and is_int(stratum.get("count"))
+            and stratum["count"] > 0
+            for stratum in self.question_strata
+        ):
+            raise ValidationError(
+                _("Question strata must be a list of objects with a positive count")
+            )
+        if not all(
+            stratum.get(key) is None or is_int(stratum[key])
+            for stratum in self.question_strata
+            for key in ("from_order", "to_order")
+        ):
+            raise ValidationError(
+                _("Question strata orders must be whole numbers or empty")
+            )
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
@@ -185,6 +259,11 @@ class LessonPart(BaseModel):
     video = models.FileField(
         _("Video"), upload_to="lesson_videos/", null=True, blank=True
     )
+    # SHA-256 of the file, identical videos share one stored file
+    # and one HLS output
+    content_hash = models.CharField(
+        _("Content Hash"), max_length=64, blank=True, db_index=True, editable=False
+    )
     hls_video_url = models.URLField(
         _("HLS Video URL"), null=True, blank=True, editable=False
     )
@@ -247,6 +326,10 @@ class Question(BaseModel):
         default=list,
         help_text="JSON array of book test questions with their answers. Example: [{'questions_count': 10, 'questions': [{'expected_answer': 'A', 'question_number': 1}, {'expected_answer': 'B', 'question_number': 2}]}]",
     )
+    # Flat list of the expected answers of book_questions, filled on save
+    book_answer_key = models.JSONField(
+        _("Book Answer Key"), default=list, blank=True, editable=False
+    )
 
     # Regular test question fields
     regular_question_type = models.CharField(
@@ -267,6 +350,31 @@ class Question(BaseModel):
     def __str__(self):
         return f"{self.id} :{self.test.title} - {self.question_text[:50]}..."
 
+    def clean(self):
+        """Validate the layout of book_questions"""
+        book_questions = self.book_questions
+        if not book_questions:
+            return
+        if isinstance(book_questions, list) and isinstance(book_questions[0], dict):
+            if "questions" in book_questions[0]:
+                book_questions = book_questions[0]["questions"]
+        if not isinstance(book_questions, list) or not all(
+            isinstance(question, dict) for question in book_questions
+        ):
+            raise ValidationError(
+                _("Book questions must be a list of objects with an expected_answer")
+            )
+
+    def save(self, *args, **kwargs):
+        """Normalize the book test answer key of book_questions"""
+        from apps.course.services.answer_keys import get_book_expected_answers
+
+        self.book_answer_key = get_book_expected_answers(self.book_questions) or []
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "book_questions" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "book_answer_key"}
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name = _("Question")
         verbose_name_plural = _("Questions")
@@ -366,6 +474,10 @@ class UserCourse(BaseModel):
     # Additional tracking fields
     coins_earned = models.IntegerField(_("Coins Earned"), default=0)
     points_earned = models.IntegerField(_("Points Earned"), default=0)
+    # Maintained incrementally by UserLesson.record_part_completed
+    completed_lessons_count = models.PositiveIntegerField(
+        _("Completed Lessons Count"), default=0, editable=False
+    )
 
     class Meta:
         verbose_name = _("User Course")
@@ -381,53 +493,25 @@ class UserCourse(BaseModel):
         if self.progress_percent < 0 or self.progress_percent > 100:
             raise ValidationError(_("Progress percentage must be between 0 and 100"))
 
-    def update_progress(self):
-        """Calculate and update course progress based on completed lessons"""
-        total_lessons = self.course.lessons.filter(is_active=True).count()
-        if total_lessons == 0:
-            self.progress_percent = 0
-        else:
-            completed_lessons = self.user_lessons.filter(is_completed=True).count()
-            self.progress_percent = round((completed_lessons / total_lessons) * 100, 2)
-
-        # Mark course as completed if 100% progress
-        if self.progress_percent >= 100 and not self.is_completed:
-            self.is_completed = True
-            self.finish_date = timezone.now()
-
-        self.save()
-        return self.progress_percent
-
-    def sync_user_balance(self):
-        """Sync user's actual coin and point balance with course earnings"""
-        # Calculate total earned from all completed lesson parts
-        total_coins = 0
-        total_points = 0
-
-        for user_lesson in self.user_lessons.filter(is_completed=True):
-            for user_lesson_part in user_lesson.user_lesson_parts.filter(
-                    is_completed=True
-            ):
-                total_coins += user_lesson_part.lesson_part.award_coin
-                total_points += user_lesson_part.lesson_part.award_point
-
-        # Update the user's balance
-        current_user_coins = self.user.coin
-        current_user_points = self.user.point
-
-        # Calculate difference and update
-        coin_diff = total_coins - current_user_coins
-        point_diff = total_points - current_user_points
-
-        if coin_diff != 0:
-            self.user.add_coins(coin_diff)
-        if point_diff != 0:
-            self.user.add_points(point_diff)
-
-        # Update course totals
-        self.coins_earned = total_coins
-        self.points_earned = total_points
-        self.save(update_fields=["coins_earned", "points_earned"])
+    def record_lesson_completed(self):
+        """Count one more completed lesson and update progress from the counters"""
+        total_lessons = Subquery(
+            Course.objects.filter(pk=OuterRef("course_id")).values("lessons_count")[:1]
+        )
+        # SET expressions see the old row, hence the explicit + 1
+        UserCourse.objects.filter(pk=self.pk).update(
+            completed_lessons_count=F("completed_lessons_count") + 1,
+            progress_percent=progress_percent_expression(
+                F("completed_lessons_count") + 1, total_lessons, empty=0.0
+            ),
+        )
+        # Only the update that reaches the total marks the course completed
+        UserCourse.objects.filter(
+            pk=self.pk,
+            is_completed=False,
+            course__lessons_count__gt=0,
+            completed_lessons_count__gte=F("course__lessons_count"),
+        ).update(is_completed=True, finish_date=timezone.now())
 
     def get_next_lesson(self):
         """Get the next uncompleted lesson in the course"""
@@ -479,6 +563,10 @@ class UserLesson(BaseModel):
     progress_percent = models.DecimalField(
         _("Progress Percentage"), max_digits=5, decimal_places=2, default=0.00
     )
+    # Maintained incrementally by UserLessonPart.mark_completed
+    completed_parts_count = models.PositiveIntegerField(
+        _("Completed Parts Count"), default=0, editable=False
+    )
 
     class Meta:
         verbose_name = _("User Lesson")
@@ -496,25 +584,27 @@ class UserLesson(BaseModel):
                 _("Lesson must belong to the same course as user course")
             )
 
-    def update_progress(self):
-        """Calculate and update lesson progress based on completed parts"""
-        total_parts = self.lesson.parts.filter(is_active=True).count()
-        if total_parts == 0:
-            self.progress_percent = 100  # No parts means lesson is complete
-        else:
-            completed_parts = self.user_lesson_parts.filter(is_completed=True).count()
-            self.progress_percent = round((completed_parts / total_parts) * 100, 2)
-
-        # Mark lesson as completed if 100% progress
-        if self.progress_percent >= 100 and not self.is_completed:
-            self.is_completed = True
-            self.completion_date = timezone.now()
-
-            # Update course progress
-            self.user_course.update_progress()
+    def record_part_completed(self):
+        """Count one more completed part and update progress from the counters"""
+        total_parts = Subquery(
+            Lesson.objects.filter(pk=OuterRef("lesson_id")).values("parts_count")[:1]
+        )
+        # SET expressions see the old row, hence the explicit + 1
+        UserLesson.objects.filter(pk=self.pk).update(
+            completed_parts_count=F("completed_parts_count") + 1,
+            progress_percent=progress_percent_expression(
+                F("completed_parts_count") + 1, total_parts
+            ),
+        )
+        # Only the update that reaches the total marks the lesson completed
+        lesson_completed = UserLesson.objects.filter(
+            pk=self.pk,
+            is_completed=False,
+            completed_parts_count__gte=F("lesson__parts_count"),
+        ).update(is_completed=True, completion_date=timezone.now())
 
-        self.save()
-        return self.progress_percent
+        if lesson_completed:
+            self.user_course.record_lesson_completed()
 
     def get_next_part(self):
         """Get the next uncompleted lesson part"""
@@ -570,36 +660,67 @@ class UserLessonPart(BaseModel):
                 _("Lesson part must belong to the same lesson as user lesson")
             )
 
-    def mark_completed(self, give_awards=True):
+    def _complete(self, awards=None, reason=None):
         """
-        Mark this lesson part as completed and update related progress.
+        Mark this lesson part as completed exactly once and count it towards the
+        lesson and course progress.
 
         Args:
-            give_awards (bool): If True and awards haven't been given yet, award coins/points.
-                               If False, mark as completed but don't give awards.
+            awards (tuple): (coins, points) to award if not given yet, or None
+            reason (str): BalanceEntry reason recorded for the awards
         """
-        if not self.is_completed:
-            self.is_completed = True
-            self.completion_date = timezone.now()
+        give_awards = awards is not None and not self.awards_given
+        completion_date = timezone.now()
+        update_fields = {"is_completed": True, "completion_date": completion_date}
+        if give_awards:
+            update_fields["awards_given"] = True
+
+        # Guarded update so concurrent completions are only counted once
+        if not UserLessonPart.objects.filter(pk=self.pk, is_completed=False).update(
+            **update_fields
+        ):
+            return
+
+        self.is_completed = True
+        self.completion_date = completion_date
+
+        if give_awards:
+            coins, points = awards
+            user_course = self.user_lesson.user_course
+            UserCourse.objects.filter(pk=user_course.pk).update(
+                coins_earned=F("coins_earned") + coins,
+                points_earned=F("points_earned") + points,
+            )
 
-            # Award coins and points only if requested and not already given
-            if give_awards and not self.awards_given:
-                user_course = self.user_lesson.user_course
-                user_course.coins_earned += self.lesson_part.award_coin
-                user_course.points_earned += self.lesson_part.award_point
-                user_course.save()
+            # Update user's actual coin and point balance
+            user_course.user.change_balance(
+                coins=coins,
+                points=points,
+                reason=reason,
+                object_id=self.lesson_part_id,
+            )
 
-                # Update user's actual coin and point balance (always, even if 0)
-                user = user_course.user
-                user.add_coins(self.lesson_part.award_coin)
-                user.add_points(self.lesson_part.award_point)
+            self.awards_given = True
 
-                self.awards_given = True
+        # Update lesson progress
+        self.user_lesson.record_part_completed()
 
-            self.save()
+    def mark_completed(self, give_awards=True):
+        """
+        Mark this lesson part as completed and update related progress.
 
-            # Update lesson progress
-            self.user_lesson.update_progress()
+        Args:
+            give_awards (bool): If True and awards haven't been given yet, award coins/points.
+                               If False, mark as completed but don't give awards.
+        """
+        if not self.is_completed:
+            if give_awards:
+                self._complete(
+                    (self.lesson_part.award_coin, self.lesson_part.award_point),
+                    reason=BalanceEntry.Reason.LESSON_PART,
+                )
+            else:
+                self._complete()
 
     def mark_completed_with_partial_awards(self, coins, points):
         """
@@ -611,27 +732,7 @@ class UserLessonPart(BaseModel):
             points (int): Partial points to award based on percentage of correct answers
         """
         if not self.is_completed:
-            self.is_completed = True
-            self.completion_date = timezone.now()
-
-            # Award partial coins and points only if not already given
-            if not self.awards_given:
-                user_course = self.user_lesson.user_course
-                user_course.coins_earned += coins
-                user_course.points_earned += points
-                user_course.save()
-
-                # Update user's actual coin and point balance
-                user = user_course.user
-                user.add_coins(coins)
-                user.add_points(points)
-
-                self.awards_given = True
-
-            self.save()
-
-            # Update lesson progress
-            self.user_lesson.update_progress()
+            self._complete((coins, points), reason=BalanceEntry.Reason.TEST)
 
 
 class UserTest(BaseModel):
@@ -651,6 +752,10 @@ class UserTest(BaseModel):
     )
     start_date = models.DateTimeField(_("Start Date"), auto_now_add=True)
     finish_date = models.DateTimeField(_("Finish Date"), null=True, blank=True)
+    # start_date + test duration, overdue attempts are submitted automatically
+    expires_at = models.DateTimeField(
+        _("Expires At"), null=True, blank=True, editable=False
+    )
     is_passed = models.BooleanField(_("Is Passed"), default=False)
 
     # Score tracking
@@ -664,16 +769,48 @@ class UserTest(BaseModel):
     is_submitted = models.BooleanField(_("Is Submitted"), default=False)
     is_in_progress = models.BooleanField(_("Is In Progress"), default=True)
 
+    # Sampled question ids and answers of the attempt, see services.answer_sheets.
+    # Attempts started before answer sheets existed keep one UserAnswer per question
+    answer_sheet = models.JSONField(
+        _("Answer Sheet"), null=True, blank=True, editable=False
+    )
+
+    # Results as served by the results endpoint, built once on submission
+    result_snapshot = models.JSONField(
+        _("Result Snapshot"), null=True, blank=True, editable=False
+    )
+    # Set once the attempt is counted in QuestionStats, see services.question_stats
+    stats_recorded = models.BooleanField(
+        _("Stats Recorded"), default=False, editable=False
+    )
+
     class Meta:
         verbose_name = _("User Test")
         verbose_name_plural = _("User Tests")
         ordering = ["-start_date"]
+        indexes = [
+            # Only attempts in progress are indexed, submitted ones are never swept
+            models.Index(
+                fields=["expires_at"],
+                name="usertest_expiry_idx",
+                condition=models.Q(is_in_progress=True),
+            ),
+            models.Index(
+                fields=["user", "test"],
+                name="usertest_in_progress_idx",
+                condition=models.Q(is_in_progress=True),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.test.title} - Attempt {self.attempt_number}"
 
+    @property
+    def is_expired(self):
+        return bool(self.expires_at and self.expires_at <= timezone.now())
+
     def calculate_score(self):
-        """Calculate test score based on user answers"""
+        """Calculate test score from the answer counts and set is_passed (not saved)"""
         if self.total_questions == 0:
             score_percent = 0
         else:
@@ -683,25 +820,15 @@ class UserTest(BaseModel):
 
         # Determine if test is passed (assuming 70% is passing)
         self.is_passed = score_percent >= 70
-
-        self.save()
         return score_percent
 
-    def submit_test(self):
+    def submit_test(self, answer_key=None):
         """Submit the test and calculate final results"""
-        if not self.is_submitted:
-            self.is_submitted = True
-            self.is_in_progress = False
-            self.finish_date = timezone.now()
-
-            # Count correct answers
-            self.correct_answers = self.user_answers.filter(is_correct=True).count()
-            self.total_questions = self.user_answers.count()
+        from apps.course.services.grading import grade_user_test
 
-            # Calculate final score
-            self.calculate_score()
-
-            self.save()
+        if not self.is_submitted:
+            return grade_user_test(self, answer_key)
+        return False
 
 
 class UserAnswer(BaseModel):
@@ -777,80 +904,101 @@ class UserAnswer(BaseModel):
 
     def save(self, *args, **kwargs):
         """Auto-check correctness when saving"""
+        if getattr(self, "from_answer_sheet", False):
+            raise ValueError(
+                "Answers of answer sheets are saved with save_user_answers"
+            )
         skip_check = kwargs.pop("skip_correctness_check", False)
         if not skip_check:
             self.check_correctness()
         super().save(*args, **kwargs)
 
-    def check_correctness(self):
-        """Check if the answer is correct based on question type"""
-        if self.question.test.type == TestType.TRUE_FALSE:
-            self.is_correct = self.boolean_answer == self.question.correct_answer
+    def check_correctness(self, answer_key=None):
+        """
+        Check if the answer is correct based on question type, using the
+        compiled answer key of the test (fetched from cache if not given)
+        """
+        from apps.course.services.answer_keys import get_answer_key, grade_answer
 
-        elif self.question.test.type == TestType.REGULAR_TEST:
-            if self.selected_choice:
-                self.is_correct = self.selected_choice.is_correct
-            else:
-                self.is_correct = False
-
-        elif self.question.test.type == TestType.MATCHING:
-            # For matching questions, check if all pairs are correctly matched
-            if self.matching_answer and self.question.matching_pairs.exists():
-                correct_pairs = {
-                    pair.left_item: pair.right_item
-                    for pair in self.question.matching_pairs.all()
-                }
-                self.is_correct = self.matching_answer == correct_pairs
-            else:
-                self.is_correct = False
-
-        elif self.question.test.type == TestType.BOOK_TEST:
-            # For book test, check against book_questions field
-            if self.book_answer and self.question.book_questions:
-                # Handle new book_questions structure
-                if (
-                        isinstance(self.question.book_questions, list)
-                        and len(self.question.book_questions) > 0
-                ):
-                    # New structure: [{'questions_count': 10, 'questions': [...]}]
-                    book_data = self.question.book_questions[0]
-                    if isinstance(book_data, dict) and "questions" in book_data:
-                        questions_list = book_data["questions"]
-                        correct_count = 0
-                        total_questions = len(questions_list)
-
-                        for i, book_question in enumerate(questions_list):
-                            if i < len(self.book_answer):
-                                user_answer = self.book_answer[i]
-                                expected_answer = book_question.get("expected_answer")
-                                if user_answer == expected_answer:
-                                    correct_count += 1
-
-                        # Consider correct if at least 70% of book questions are correct
-                        self.is_correct = (
-                            (correct_count / total_questions) >= 0.7
-                            if total_questions > 0
-                            else False
-                        )
-                    else:
-                        # Fallback for old structure: direct array of questions
-                        correct_count = 0
-                        total_questions = len(self.question.book_questions)
-
-                        for i, book_question in enumerate(self.question.book_questions):
-                            if i < len(self.book_answer):
-                                user_answer = self.book_answer[i]
-                                expected_answer = book_question.get("expected_answer")
-                                if user_answer == expected_answer:
-                                    correct_count += 1
-
-                        # Consider correct if at least 70% of book questions are correct
-                        self.is_correct = (
-                            (correct_count / total_questions) >= 0.7
-                            if total_questions > 0
-                            else False
-                        )
-                else:
-                    self.is_correct = False
-            else:
-                self.is_correct = False
+        if answer_key is None:
+            answer_key = get_answer_key(self.user_test.test_id)
+        self.is_correct = grade_answer(answer_key, self)
+
+
+class QuestionStats(BaseModel):
+    """
+    Item statistics of a question over submitted test attempts, updated
+    incrementally when an attempt is submitted
+    """
+
+    question = models.OneToOneField(
+        "course.Question",
+        on_delete=models.CASCADE,
+        related_name="stats",
+        verbose_name=_("Question"),
+    )
+    attempts_count = models.PositiveIntegerField(_("Attempts Count"), default=0)
+    answered_count = models.PositiveIntegerField(_("Answered Count"), default=0)
+    correct_count = models.PositiveIntegerField(_("Correct Count"), default=0)
+    # {choice_id: number of times the choice was selected}
+    choice_counts = models.JSONField(_("Choice Counts"), default=dict, blank=True)
+    # Seconds between an answer and the previous answer (or start) of its attempt
+    total_answer_seconds = models.FloatField(_("Total Answer Seconds"), default=0)
+
+    class Meta:
+        verbose_name = _("Question Stats")
+        verbose_name_plural = _("Question Stats")
+
+    def __str__(self):
+        return f"{self.question} - {self.correct_count}/{self.attempts_count}"
+
+    @property
+    def correct_percent(self):
+        if not self.attempts_count:
+            return 0
+        return round(self.correct_count * 100 / self.attempts_count, 2)
+
+    @property
+    def average_answer_seconds(self):
+        if not self.answered_count:
+            return None
+        return round(self.total_answer_seconds / self.answered_count, 2)
+
+
+class VideoUpload(BaseModel):
+    """
+    Resumable chunked upload of a lesson part video. Chunks are appended to a
+    part file on disk until offset reaches size, see services.video_uploads
+    """
+
+    lesson_part = models.ForeignKey(
+        "course.LessonPart",
+        on_delete=models.CASCADE,
+        related_name="video_uploads",
+        verbose_name=_("Lesson Part"),
+    )
+    uploaded_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="video_uploads",
+        verbose_name=_("Uploaded By"),
+    )
+    filename = models.CharField(_("Filename"), max_length=255)
+    size = models.PositiveBigIntegerField(_("Size"))
+    offset = models.PositiveBigIntegerField(_("Offset"), default=0)
+    # Hex SHA-256 of the whole file, verified once the last chunk arrives
+    checksum = models.CharField(_("Checksum"), max_length=64, blank=True)
+    status = models.CharField(
+        _("Status"),
+        max_length=20,
+        choices=VideoUploadStatus.choices,
+        default=VideoUploadStatus.UPLOADING,
+    )
+
+    class Meta:
+        verbose_name = _("Video Upload")
+        verbose_name_plural = _("Video Uploads")
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
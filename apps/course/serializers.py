@@ -18,8 +18,6 @@ class SubjectSerializer(serializers.ModelSerializer):
 class CourseSerializer(serializers.ModelSerializer):
     """Global serializer for Course model that can be reused across different APIs"""
 
-    lessons_count = serializers.SerializerMethodField()
-
     class Meta:
         model = Course
         fields = (
@@ -39,6 +37,3 @@ class CourseSerializer(serializers.ModelSerializer):
             "is_can_pay_with_referral",
             "lessons_count",
         )
-
-    def get_lessons_count(self, obj):
-        return obj.lessons.filter(is_active=True).count()
@@ -0,0 +1,32 @@
+from django.core.cache import cache
+
+from apps.course.models import Lesson
+from apps.course.services.catalog import get_catalog_version
+
+# The first lessons of every course (by order) are available without payment
+FREE_LESSONS_COUNT = 3
+FREE_LESSONS_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_free_lessons_cache_key(course_id):
+    # Reordering or deactivating a lesson bumps the catalog version
+    return f"free_lessons:{get_catalog_version()}:{course_id}"
+
+
+def get_free_lesson_ids(course_id):
+    """Return the ids of the free trial lessons of a course"""
+    cache_key = get_free_lessons_cache_key(course_id)
+    lesson_ids = cache.get(cache_key)
+    if lesson_ids is None:
+        lesson_ids = list(
+            Lesson.objects.filter(course_id=course_id, is_active=True)
+            .order_by("order", "id")
+            .values_list("id", flat=True)[:FREE_LESSONS_COUNT]
+        )
+        cache.set(cache_key, lesson_ids, timeout=FREE_LESSONS_CACHE_TIMEOUT)
+    return frozenset(lesson_ids)
+
+
+def is_free_lesson(lesson):
+    """Check whether a lesson is one of its course's free trial lessons"""
+    return lesson.id in get_free_lesson_ids(lesson.course_id)
@@ -0,0 +1,116 @@
+import json
+from datetime import timedelta
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.course.services.answer_sheets import get_user_answers, save_user_answers
+
+# Drafts outlive the test duration so an expired attempt can still be flushed
+DRAFT_TTL_GRACE = 60 * 60
+MIN_DRAFT_TTL = 60
+
+# UserAnswer attributes that can be buffered as drafts
+DRAFT_FIELDS = (
+    "selected_choice_id",
+    "boolean_answer",
+    "text_answer",
+    "matching_answer",
+    "book_answer",
+    "answered_at",
+)
+
+redis_client = redis.StrictRedis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=settings.REDIS_DB,
+    decode_responses=True,
+)
+
+
+def drafts_enabled():
+    return settings.TEST_ANSWER_DRAFTS_ENABLED
+
+
+def get_drafts_key(user_test_id):
+    return f"answer_drafts:{user_test_id}"
+
+
+def get_drafts_ttl(user_test):
+    """Seconds until the attempt's duration plus a grace period has passed"""
+    duration = timedelta(minutes=user_test.test.test_duration or 0)
+    deadline = user_test.start_date + duration + timedelta(seconds=DRAFT_TTL_GRACE)
+    return max(int((deadline - timezone.now()).total_seconds()), MIN_DRAFT_TTL)
+
+
+def save_answer_drafts(user_test, user_answers, fields):
+    """
+    Buffer answer values in a Redis hash instead of writing UserAnswer rows.
+
+    Every (answer, field) pair is its own hash field, so partial updates of the
+    same answer merge without reading the hash first.
+    """
+    fields = [
+        "selected_choice_id" if field == "selected_choice" else field
+        for field in fields
+    ]
+    mapping = {}
+    for user_answer in user_answers:
+        for field in fields:
+            value = getattr(user_answer, field)
+            if field == "answered_at" and value:
+                value = value.isoformat()
+            mapping[f"{user_answer.id}:{field}"] = json.dumps(value)
+
+    key = get_drafts_key(user_test.id)
+    pipeline = redis_client.pipeline()
+    pipeline.hset(key, mapping=mapping)
+    pipeline.expire(key, get_drafts_ttl(user_test))
+    pipeline.execute()
+
+
+def get_answer_drafts(user_test_id):
+    """Return {answer_id: {field: value}} of the buffered answers of an attempt"""
+    drafts = {}
+    for hash_field, value in redis_client.hgetall(get_drafts_key(user_test_id)).items():
+        answer_id, field = hash_field.split(":", 1)
+        if field not in DRAFT_FIELDS:
+            continue
+        value = json.loads(value)
+        if field == "answered_at" and value:
+            value = parse_datetime(value)
+        drafts.setdefault(int(answer_id), {})[field] = value
+    return drafts
+
+
+def apply_answer_draft(user_answer, draft):
+    for field, value in draft.items():
+        setattr(user_answer, field, value)
+
+
+def flush_answer_drafts(user_test):
+    """
+    Write the buffered answers of an attempt to its answer sheet (or answer
+    rows) in one write and drop the hash once the transaction commits.
+    Returns the number of answers written.
+    """
+    if not drafts_enabled():
+        return 0
+
+    drafts = get_answer_drafts(user_test.id)
+    if not drafts:
+        return 0
+
+    user_answers = get_user_answers(user_test, drafts)
+    fields = set()
+    for user_answer in user_answers:
+        apply_answer_draft(user_answer, drafts[user_answer.id])
+        fields.update(drafts[user_answer.id])
+    save_user_answers(user_test, user_answers, fields)
+
+    key = get_drafts_key(user_test.id)
+    transaction.on_commit(lambda: redis_client.delete(key))
+    return len(user_answers)
@@ -0,0 +1,162 @@
+from django.core.cache import cache
+
+from apps.course.choices import TestType
+from apps.course.models import AnswerChoice, MatchingPair, Question, Test
+from apps.course.services.matching import is_matching_answer_correct
+from apps.course.services.test_content import get_test_content_version
+
+ANSWER_KEY_CACHE_TIMEOUT = 60 * 60 * 24
+# Bumped whenever the layout of compiled answer keys changes
+ANSWER_KEY_FORMAT = 3
+
+# Share of book questions that must be right for a book answer to count
+BOOK_TEST_PASS_RATIO = 0.7
+
+
+def get_answer_key_cache_key(test_id):
+    version = get_test_content_version(test_id)
+    return f"answer_key:{ANSWER_KEY_FORMAT}:{test_id}:{version}"
+
+
+def get_book_question_list(book_questions):
+    """
+    Return the questions of Question.book_questions as a flat list, or None.
+
+    Supports the current [{'questions_count': n, 'questions': [...]}] layout and
+    the older flat list of questions.
+    """
+    if not book_questions or not isinstance(book_questions, list):
+        return None
+
+    book_data = book_questions[0]
+    if isinstance(book_data, dict) and "questions" in book_data:
+        questions_list = book_data["questions"]
+    else:
+        questions_list = book_questions
+    if not isinstance(questions_list, list):
+        return None
+    return questions_list
+
+
+def get_book_expected_answers(book_questions):
+    """
+    Flatten Question.book_questions to the list of expected answers.
+
+    Items that are not objects keep their position with a None answer, which
+    no answer matches. Returns None if there is nothing to grade.
+    """
+    questions_list = get_book_question_list(book_questions)
+    if questions_list is None:
+        return None
+    return [
+        question.get("expected_answer") if isinstance(question, dict) else None
+        for question in questions_list
+    ]
+
+
+def compile_answer_key(test_id):
+    """
+    Build the answer key of every question of a test:
+
+    {"type": test type, "questions": {question_id: entry}} where entry is
+    - true_false: {"correct_answer": bool}
+    - regular_test: {"correct_choice_ids": set of choice ids}
+    - matching: {"pairs": [(pair_id, left_item, right_item)]} in pair order
+    - book_test: {"expected_answers": tuple or None}
+    """
+    test_type = Test.objects.filter(pk=test_id).values_list("type", flat=True).first()
+    questions = {}
+
+    if test_type == TestType.TRUE_FALSE:
+        for question_id, correct_answer in Question.objects.filter(
+            test_id=test_id
+        ).values_list("id", "correct_answer"):
+            questions[question_id] = {"correct_answer": correct_answer}
+
+    elif test_type == TestType.REGULAR_TEST:
+        for question_id in Question.objects.filter(test_id=test_id).values_list(
+            "id", flat=True
+        ):
+            questions[question_id] = {"correct_choice_ids": set()}
+        for choice_id, question_id in AnswerChoice.objects.filter(
+            question__test_id=test_id, is_correct=True
+        ).values_list("id", "question_id"):
+            questions[question_id]["correct_choice_ids"].add(choice_id)
+
+    elif test_type == TestType.MATCHING:
+        for question_id in Question.objects.filter(test_id=test_id).values_list(
+            "id", flat=True
+        ):
+            questions[question_id] = {"pairs": []}
+        for pair_id, question_id, left_item, right_item in (
+            MatchingPair.objects.filter(question__test_id=test_id)
+            .order_by("order", "id")
+            .values_list("id", "question_id", "left_item", "right_item")
+        ):
+            questions[question_id]["pairs"].append((pair_id, left_item, right_item))
+
+    elif test_type == TestType.BOOK_TEST:
+        # Answer keys are flattened when questions are saved
+        for question_id, book_answer_key in Question.objects.filter(
+            test_id=test_id
+        ).values_list("id", "book_answer_key"):
+            questions[question_id] = {
+                "expected_answers": tuple(book_answer_key) if book_answer_key else None
+            }
+
+    return {"type": test_type, "questions": questions}
+
+
+def get_answer_key(test_id):
+    """Return the compiled answer key of a test, compiling it on a miss"""
+    cache_key = get_answer_key_cache_key(test_id)
+    answer_key = cache.get(cache_key)
+    if answer_key is None:
+        answer_key = compile_answer_key(test_id)
+        cache.set(cache_key, answer_key, timeout=ANSWER_KEY_CACHE_TIMEOUT)
+    return answer_key
+
+
+def grade_answer(answer_key, user_answer):
+    """
+    Grade a UserAnswer against a compiled answer key without touching the
+    database. Returns the answer's current is_correct for unknown test types.
+    """
+    test_type = answer_key["type"]
+    entry = answer_key["questions"].get(user_answer.question_id)
+    if test_type not in TestType.values:
+        return user_answer.is_correct
+    if entry is None:
+        return False
+
+    if test_type == TestType.TRUE_FALSE:
+        return user_answer.boolean_answer == entry["correct_answer"]
+
+    if test_type == TestType.REGULAR_TEST:
+        return user_answer.selected_choice_id in entry["correct_choice_ids"]
+
+    if test_type == TestType.MATCHING:
+        # All pairs have to be matched correctly
+        return is_matching_answer_correct(entry, user_answer.matching_answer)
+
+    # Book test
+    expected_answers = entry["expected_answers"]
+    book_answer = user_answer.book_answer
+    if not book_answer or not expected_answers or not isinstance(book_answer, list):
+        return False
+    correct_count = count_book_matches(book_answer, expected_answers)
+    return correct_count / len(expected_answers) >= BOOK_TEST_PASS_RATIO
+
+
+def count_book_matches(book_answer, expected_answers):
+    """
+    Count the positions where a book answer sheet equals the answer key.
+
+    Positions without an expected answer never match; answers beyond the
+    shorter of the two arrays are ignored.
+    """
+    return sum(
+        answer == expected
+        for answer, expected in zip(book_answer, expected_answers)
+        if expected is not None
+    )
@@ -0,0 +1,195 @@
+"""
+Attempt-level answer sheets.
+
+New attempts keep their sampled questions and answers in UserTest.answer_sheet
+instead of one UserAnswer row per question:
+
+    {"question_ids": [question ids in question order],
+     "answers": {"<question_id>": {field: value}}}
+
+Answers are handed out as unsaved UserAnswer instances whose id is the
+question id, so serializers and grading work the same for sheets and for the
+UserAnswer rows of older attempts. Persist them with save_user_answers, never
+with UserAnswer.save().
+"""
+
+from django.utils.dateparse import parse_datetime
+
+from apps.course.models import UserAnswer, UserTest
+
+# UserAnswer attributes stored in an answer sheet
+SHEET_FIELDS = (
+    "selected_choice_id",
+    "boolean_answer",
+    "text_answer",
+    "matching_answer",
+    "book_answer",
+    "is_correct",
+    "answered_at",
+)
+
+
+def new_answer_sheet(question_ids):
+    return {"question_ids": list(question_ids), "answers": {}}
+
+
+def uses_answer_sheet(user_test):
+    return user_test.answer_sheet is not None
+
+
+def _to_field_name(field):
+    return "selected_choice_id" if field == "selected_choice" else field
+
+
+def _answer_from_sheet(user_test, question_id, values):
+    user_answer = UserAnswer(
+        id=question_id,
+        user_test=user_test,
+        question_id=question_id,
+        selected_choice_id=values.get("selected_choice_id"),
+        boolean_answer=values.get("boolean_answer"),
+        text_answer=values.get("text_answer"),
+        matching_answer=values.get("matching_answer"),
+        book_answer=values.get("book_answer"),
+        is_correct=values.get("is_correct", False),
+    )
+    # Guards against saving it over the UserAnswer row with this id
+    user_answer.from_answer_sheet = True
+    if values.get("answered_at"):
+        user_answer.answered_at = parse_datetime(values["answered_at"])
+    return user_answer
+
+
+def get_user_answers(user_test, answer_ids=None):
+    """
+    Return the answers of an attempt in question order, optionally only those
+    with the given answer ids
+    """
+    if not uses_answer_sheet(user_test):
+        user_answers = UserAnswer.objects.filter(user_test=user_test)
+        if answer_ids is not None:
+            user_answers = user_answers.filter(id__in=answer_ids)
+        user_answers = list(user_answers.order_by("question__order"))
+        for user_answer in user_answers:
+            user_answer.user_test = user_test
+        return user_answers
+
+    answers = user_test.answer_sheet["answers"]
+    question_ids = user_test.answer_sheet["question_ids"]
+    if answer_ids is not None:
+        answer_ids = set(answer_ids)
+        question_ids = [
+            question_id for question_id in question_ids if question_id in answer_ids
+        ]
+    return [
+        _answer_from_sheet(user_test, question_id, answers.get(str(question_id), {}))
+        for question_id in question_ids
+    ]
+
+
+def get_user_answer(user_test, answer_id):
+    """Return one answer of an attempt or None"""
+    user_answers = get_user_answers(user_test, [answer_id])
+    return user_answers[0] if user_answers else None
+
+
+def _write_answers(answer_sheet, user_answers, fields):
+    for user_answer in user_answers:
+        values = answer_sheet["answers"].setdefault(str(user_answer.question_id), {})
+        for field in fields:
+            value = getattr(user_answer, field)
+            if field == "answered_at" and value:
+                value = value.isoformat()
+            values[field] = value
+
+
+def save_user_answers(user_test, user_answers, fields):
+    """
+    Persist the given fields of answers of an attempt.
+
+    Answer sheets are rewritten under a row lock, so concurrent requests of the
+    same attempt don't overwrite each other's answers.
+    """
+    fields = sorted({_to_field_name(field) for field in fields})
+    if not user_answers:
+        return
+
+    if not uses_answer_sheet(user_test):
+        UserAnswer.objects.bulk_update(user_answers, fields, batch_size=500)
+        return
+
+    lock_answer_sheet(user_test)
+    _write_answers(user_test.answer_sheet, user_answers, fields)
+    UserTest.objects.filter(pk=user_test.pk).update(answer_sheet=user_test.answer_sheet)
+
+
+def lock_answer_sheet(user_test):
+    """Lock the attempt's row and reload its answer sheet for a rewrite"""
+    if uses_answer_sheet(user_test):
+        user_test.answer_sheet = (
+            UserTest.objects.select_for_update()
+            .values_list("answer_sheet", flat=True)
+            .get(pk=user_test.pk)
+        )
+
+
+def set_sheet_answers(user_test, user_answers, fields):
+    """Write answers into an attempt's sheet in memory, for bulk updates"""
+    fields = sorted({_to_field_name(field) for field in fields})
+    _write_answers(user_test.answer_sheet, user_answers, fields)
+
+
+def materialize_user_answers(user_tests):
+    """
+    Create or refresh UserAnswer rows of attempts kept in answer sheets, for
+    analytics that need one row per answer. Returns the number of rows written.
+    """
+    rows = []
+    for user_test in user_tests:
+        if not uses_answer_sheet(user_test):
+            continue
+        for user_answer in get_user_answers(user_test):
+            user_answer.id = None
+            user_answer.from_answer_sheet = False
+            rows.append(user_answer)
+
+    UserAnswer.objects.bulk_create(
+        rows,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["user_test", "question"],
+        update_fields=[
+            "selected_choice",
+            "boolean_answer",
+            "text_answer",
+            "matching_answer",
+            "book_answer",
+            "is_correct",
+            "answered_at",
+        ],
+    )
+    return len(rows)
+
+
+def materialize_submitted_answer_sheets(test_ids=None, chunk_size=200):
+    """
+    Materialize the answer sheets of submitted attempts, in primary key ranges
+    of chunk_size. Returns the number of rows written.
+    """
+    user_tests = UserTest.objects.filter(
+        is_submitted=True, answer_sheet__isnull=False
+    ).order_by("pk")
+    if test_ids:
+        user_tests = user_tests.filter(test_id__in=test_ids)
+
+    written = 0
+    last_pk = 0
+    while True:
+        chunk = list(
+            user_tests.filter(pk__gt=last_pk).only("id", "answer_sheet")[:chunk_size]
+        )
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+        written += materialize_user_answers(chunk)
+    return written
@@ -0,0 +1,133 @@
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.utils.translation import get_language
+
+from apps.course.models import Course, Lesson, Roadmap, Subject
+from apps.course.services.versioning import bump_version, get_version
+
+CATALOG_VERSION_KEY = "course_catalog_version"
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_catalog_version():
+    """Return the current catalog content version, initializing it if missing"""
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    """Invalidate every cached catalog tree by moving to a new content version"""
+    bump_version(CATALOG_VERSION_KEY)
+
+
+def get_catalog_cache_key(language=None):
+    language = language or get_language() or "en"
+    return f"course_catalog:{get_catalog_version()}:{language}"
+
+
+def build_catalog():
+    """
+    Build the Subject -> Course -> Lesson tree from the database.
+
+    File fields are stored as relative urls, views make them absolute per request.
+    """
+    from apps.course.api_endpoints.course.CourseList.serializers import (
+        CourseListSerializer,
+    )
+    from apps.course.api_endpoints.course.Roadmap.serializers import (
+        RoadmapSerializer,
+    )
+    from apps.course.api_endpoints.course.SubjectList.serializers import (
+        SubjectListSerializer,
+    )
+
+    subjects = Subject.objects.order_by("id").prefetch_related(
+        Prefetch(
+            "courses",
+            queryset=Course.objects.filter(is_active=True)
+            .select_related("subject")
+            .prefetch_related(
+                Prefetch(
+                    "lessons",
+                    queryset=Lesson.objects.filter(is_active=True).order_by(
+                        "order", "id"
+                    ),
+                )
+            )
+            .order_by("id"),
+        ),
+        Prefetch(
+            "roadmaps",
+            queryset=Roadmap.objects.filter(is_active=True)
+            .select_related("subject")
+            .order_by("id"),
+        ),
+    )
+
+    tree = {}
+    for subject in subjects:
+        roadmaps = list(subject.roadmaps.all())
+        courses = []
+        for course in subject.courses.all():
+            course_data = dict(CourseListSerializer(course).data)
+            course_data["lessons"] = [
+                {
+                    "id": lesson.id,
+                    "title": lesson.title,
+                    "slug": lesson.slug,
+                    "order": lesson.order,
+                }
+                for lesson in course.lessons.all()
+            ]
+            courses.append(course_data)
+
+        tree[subject.id] = {
+            "subject": dict(SubjectListSerializer(subject).data),
+            "is_active": subject.is_active,
+            "roadmap": (
+                dict(RoadmapSerializer(roadmaps[0]).data) if roadmaps else None
+            ),
+            "courses": courses,
+        }
+    return tree
+
+
+def get_catalog(language=None):
+    """Return the cached catalog tree, rebuilding it on a miss"""
+    cache_key = get_catalog_cache_key(language)
+    tree = cache.get(cache_key)
+    if tree is None:
+        tree = build_catalog()
+        cache.set(cache_key, tree, timeout=CATALOG_CACHE_TIMEOUT)
+    return tree
+
+
+def get_active_subjects():
+    return [node["subject"] for node in get_catalog().values() if node["is_active"]]
+
+
+def get_subject_courses(subject_id):
+    node = get_catalog().get(subject_id)
+    return node["courses"] if node else []
+
+
+def get_subject_roadmap(subject_id):
+    """Return the roadmap payload, or None if the subject or roadmap is missing"""
+    node = get_catalog().get(subject_id)
+    if not node or not node["is_active"]:
+        return None
+    return node["roadmap"]
+
+
+def get_course_node(course_id):
+    """Return the cached payload of an active course, or None"""
+    for node in get_catalog().values():
+        for course in node["courses"]:
+            if course["id"] == course_id:
+                return course
+    return None
+
+
+def absolute_url(request, url):
+    if url and request:
+        return request.build_absolute_uri(url)
+    return url
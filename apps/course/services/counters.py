@@ -0,0 +1,93 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.course.models import (
+    Course,
+    Lesson,
+    LessonPart,
+    UserCourse,
+    UserLesson,
+    UserLessonPart,
+    progress_percent_expression,
+)
+
+
+def _count(model, parent_field, **filters):
+    """Subquery counting rows of `model` that point to the outer row"""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{parent_field: OuterRef("pk")}, **filters)
+            .order_by()
+            .values(parent_field)
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+def _active_count(model, parent_field):
+    return _count(model, parent_field, is_active=True)
+
+
+def refresh_course_lessons_count(course_ids=None):
+    """Recount active lessons for the given courses (all courses if None)"""
+    queryset = Course.objects.all()
+    if course_ids is not None:
+        queryset = queryset.filter(id__in=[i for i in course_ids if i])
+    return queryset.update(lessons_count=_active_count(Lesson, "course"))
+
+
+def refresh_lesson_parts_count(lesson_ids=None):
+    """Recount active parts for the given lessons (all lessons if None)"""
+    queryset = Lesson.objects.all()
+    if lesson_ids is not None:
+        queryset = queryset.filter(id__in=[i for i in lesson_ids if i])
+    return queryset.update(parts_count=_active_count(LessonPart, "lesson"))
+
+
+def refresh_user_progress_counters():
+    """
+    Recount completed parts and lessons of every user lesson and course from
+    scratch. Progress is normally maintained incrementally on completion, this
+    is only meant to repair drifted counters.
+    """
+    lessons_updated = UserLesson.objects.update(
+        completed_parts_count=_count(UserLessonPart, "user_lesson", is_completed=True)
+    )
+    UserLesson.objects.update(
+        progress_percent=progress_percent_expression(
+            F("completed_parts_count"),
+            Subquery(
+                Lesson.objects.filter(pk=OuterRef("lesson_id")).values("parts_count")[
+                    :1
+                ]
+            ),
+        )
+    )
+    UserLesson.objects.filter(
+        is_completed=False, completed_parts_count__gte=F("lesson__parts_count")
+    ).update(is_completed=True, completion_date=timezone.now())
+
+    courses_updated = UserCourse.objects.update(
+        completed_lessons_count=_count(UserLesson, "user_course", is_completed=True)
+    )
+    UserCourse.objects.update(
+        progress_percent=progress_percent_expression(
+            F("completed_lessons_count"),
+            Subquery(
+                Course.objects.filter(pk=OuterRef("course_id")).values("lessons_count")[
+                    :1
+                ]
+            ),
+            empty=0.0,
+        )
+    )
+    UserCourse.objects.filter(
+        is_completed=False,
+        course__lessons_count__gt=0,
+        completed_lessons_count__gte=F("course__lessons_count"),
+    ).update(is_completed=True, finish_date=timezone.now())
+
+    return lessons_updated, courses_updated
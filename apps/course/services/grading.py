@@ -0,0 +1,135 @@
+from django.db import transaction
+from django.utils import timezone
+
+from apps.course.models import LessonPart, UserAnswer, UserLessonPart, UserTest
+from apps.course.services.answer_drafts import flush_answer_drafts
+from apps.course.services.answer_keys import get_answer_key, grade_answer
+from apps.course.services.answer_sheets import (
+    get_user_answers,
+    lock_answer_sheet,
+    set_sheet_answers,
+    uses_answer_sheet,
+)
+from apps.course.services.question_stats import record_question_stats
+from apps.course.services.test_results import store_result_snapshot
+
+
+def grade_user_test(user_test, answer_key=None):
+    """
+    Grade every answer of an attempt in memory and submit it.
+
+    Locks the attempt, reads the answers once, persists the results with a
+    single UPDATE and then writes changed is_correct flags with one
+    bulk_update (or together with the answer sheet) and the result snapshot,
+    so the query count does not depend on the number of questions. Returns
+    False, without writing the answers, if the attempt had already been
+    submitted.
+    """
+    if answer_key is None:
+        answer_key = get_answer_key(user_test.test_id)
+
+    # Concurrent submissions of the attempt wait here and then find it
+    # submitted, before any of its answers are written
+    is_submitted = (
+        UserTest.objects.select_for_update()
+        .values_list("is_submitted", flat=True)
+        .get(pk=user_test.pk)
+    )
+    if is_submitted:
+        return False
+
+    # Buffered answers have to be in the database before grading
+    flush_answer_drafts(user_test)
+
+    lock_answer_sheet(user_test)
+    user_answers = get_user_answers(user_test)
+    changed_answers = []
+    correct_answers = 0
+    for user_answer in user_answers:
+        is_correct = grade_answer(answer_key, user_answer)
+        if is_correct != user_answer.is_correct:
+            user_answer.is_correct = is_correct
+            changed_answers.append(user_answer)
+        if is_correct:
+            correct_answers += 1
+
+    submitted_values = {}
+    if uses_answer_sheet(user_test):
+        # Written together with the results below
+        set_sheet_answers(user_test, changed_answers, ["is_correct"])
+        submitted_values["answer_sheet"] = user_test.answer_sheet
+
+    user_test.is_submitted = True
+    user_test.is_in_progress = False
+    user_test.finish_date = timezone.now()
+    user_test.correct_answers = correct_answers
+    user_test.total_questions = len(user_answers)
+    user_test.calculate_score()
+
+    UserTest.objects.filter(pk=user_test.pk).update(
+        is_submitted=True,
+        is_in_progress=False,
+        finish_date=user_test.finish_date,
+        correct_answers=user_test.correct_answers,
+        total_questions=user_test.total_questions,
+        is_passed=user_test.is_passed,
+        **submitted_values,
+    )
+    if not uses_answer_sheet(user_test) and changed_answers:
+        UserAnswer.objects.bulk_update(changed_answers, ["is_correct"], batch_size=500)
+
+    # The results endpoint serves this snapshot instead of re-reading answers
+    store_result_snapshot(user_test)
+    record_question_stats(user_test, user_answers)
+    return True
+
+
+def get_partial_awards(lesson_part, correct_answers, total_questions):
+    """Coins and points of a first attempt, in proportion to its correct answers"""
+    percentage = correct_answers / total_questions if total_questions > 0 else 0
+    return (
+        int(lesson_part.award_coin * percentage),
+        int(lesson_part.award_point * percentage),
+    )
+
+
+def complete_test_lesson_part(user_test):
+    """
+    Complete the user's lesson part of a submitted test: partial awards by
+    score on the first attempt, no awards on later ones.
+    """
+    lesson_part = LessonPart.objects.filter(
+        test_id=user_test.test_id, is_active=True
+    ).first()
+    if not lesson_part:
+        return
+
+    user_lesson_part = UserLessonPart.objects.filter(
+        user_lesson__user_course__user_id=user_test.user_id, lesson_part=lesson_part
+    ).first()
+    if not user_lesson_part or user_lesson_part.is_completed:
+        # User is retrying - no additional awards
+        return
+
+    # Always mark as completed and give partial awards on first attempt
+    if user_test.attempt_number == 1:
+        # Mark as completed with partial awards based on performance
+        coins, points = get_partial_awards(
+            lesson_part, user_test.correct_answers, user_test.total_questions
+        )
+        user_lesson_part.mark_completed_with_partial_awards(coins=coins, points=points)
+    else:
+        # Subsequent attempts: mark completed but no awards
+        user_lesson_part.mark_completed(give_awards=False)
+
+
+def finish_user_test(user_test, answer_key=None):
+    """
+    Submit an attempt and complete its lesson part, as FinishTest does.
+    Returns False if the attempt had already been submitted.
+    """
+    with transaction.atomic():
+        if not user_test.submit_test(answer_key):
+            return False
+        complete_test_lesson_part(user_test)
+    return True
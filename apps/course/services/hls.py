@@ -0,0 +1,436 @@
+"""
+HLS packaging of lesson videos.
+
+Videos are encoded into the rendition ladder of settings.HLS_RENDITIONS in a
+single ffmpeg pass: the source is decoded once, split and scaled per rendition,
+and ffmpeg writes one media playlist per rendition plus a master playlist
+listing them, so players pick the bitrate that fits their bandwidth:
+
+    hls_videos/sha256_<hash>/abr/master.m3u8
+    hls_videos/sha256_<hash>/abr/<rendition>/playlist.m3u8, segment_000.ts, ...
+
+The output is named after the content hash of the video, so lesson parts
+sharing a video are served the same ladder and it is encoded once, by the
+conversion holding its lock (see lock_output). Videos without a hash,
+uploaded before hashing, use lesson_part_<id> instead. Work files of an
+encoding stay in hls_videos/lesson_part_<id>/.
+
+Videos longer than two settings.HLS_CHUNK_SECONDS are first cut into chunks at
+keyframes, the chunks are encoded in parallel and their playlists stitched.
+
+Lesson parts converted before the ladder existed keep their single rendition
+playlist.m3u8 in hls_videos/lesson_part_<id>/ until they are backfilled.
+"""
+
+import json
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+
+HLS_ROOT = "hls_videos"
+LADDER_DIR = "abr"
+MASTER_PLAYLIST = "master.m3u8"
+LEGACY_PLAYLIST = "playlist.m3u8"
+# Longest a conversion holds its output, chunked ones included
+ENCODE_LOCK_TIMEOUT = 6 * 60 * 60
+
+
+def get_hls_dir(lesson_part_id):
+    return Path(settings.MEDIA_ROOT) / HLS_ROOT / f"lesson_part_{lesson_part_id}"
+
+
+def get_output_name(lesson_part):
+    """Name of the directory the ladder of a lesson part video is served from"""
+    if lesson_part.content_hash:
+        return f"sha256_{lesson_part.content_hash}"
+    return f"lesson_part_{lesson_part.id}"
+
+
+def get_ladder_dir(output_name):
+    return Path(settings.MEDIA_ROOT) / HLS_ROOT / output_name / LADDER_DIR
+
+
+def get_staging_dir(lesson_part_id):
+    """Directory a ladder is encoded into before it replaces the served one"""
+    return get_hls_dir(lesson_part_id) / f"{LADDER_DIR}.tmp"
+
+
+def get_chunks_dir(lesson_part_id):
+    """Directory the source chunks of a split video are written to"""
+    return get_hls_dir(lesson_part_id) / "chunks.tmp"
+
+
+def get_master_playlist_url(output_name):
+    return (
+        f"{settings.MEDIA_URL}{HLS_ROOT}/{output_name}/{LADDER_DIR}/{MASTER_PLAYLIST}"
+    )
+
+
+def has_ladder(output_name):
+    return (get_ladder_dir(output_name) / MASTER_PLAYLIST).exists()
+
+
+def lock_output(output_name):
+    """
+    Reserve an output for one conversion, so lesson parts sharing a video
+    don't encode it at once and swap each other's ladder directory. Returns
+    False if another conversion holds it.
+    """
+    return cache.add(f"hls_encode:{output_name}", True, ENCODE_LOCK_TIMEOUT)
+
+
+def unlock_output(output_name):
+    cache.delete(f"hls_encode:{output_name}")
+
+
+def is_ladder_url(hls_video_url):
+    return bool(hls_video_url) and hls_video_url.endswith(
+        f"/{LADDER_DIR}/{MASTER_PLAYLIST}"
+    )
+
+
+def probe_video(video_path, timeout=60):
+    """
+    Return the height, duration in seconds and whether there is an audio stream
+    of a video file, as reported by ffprobe
+    """
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-show_entries",
+            "stream=codec_type,height:format=duration",
+            "-of",
+            "json",
+            str(video_path),
+        ],
+        capture_output=True,
+        timeout=timeout,
+        check=True,
+    )
+    data = json.loads(result.stdout or b"{}")
+    streams = data.get("streams", [])
+    heights = [
+        stream["height"]
+        for stream in streams
+        if stream.get("codec_type") == "video" and stream.get("height")
+    ]
+    return {
+        "height": max(heights, default=None),
+        "duration": float(data.get("format", {}).get("duration") or 0),
+        "has_audio": any(stream.get("codec_type") == "audio" for stream in streams),
+    }
+
+
+def select_renditions(renditions, source_height=None, has_audio=True):
+    """
+    Drop the renditions a source can't fill: video renditions taller than the
+    source, except the smallest one, and audio-only renditions of silent videos
+    """
+    video_renditions = [
+        rendition for rendition in renditions if rendition.get("height")
+    ]
+    selected = [
+        rendition
+        for rendition in video_renditions
+        if not source_height or rendition["height"] <= source_height
+    ]
+    if video_renditions and not selected:
+        selected = [min(video_renditions, key=lambda rendition: rendition["height"])]
+    if has_audio:
+        selected += [
+            rendition for rendition in renditions if not rendition.get("height")
+        ]
+    return selected
+
+
+def build_ladder_command(
+    video_path, output_dir, renditions, has_audio=True, chunk_index=None
+):
+    """
+    Build the ffmpeg command that encodes every rendition in one pass.
+
+    Renditions are dicts with a name, an audio_bitrate and, for video
+    renditions, a height and a video_bitrate. Keyframes are forced on segment
+    boundaries so that segments of all renditions line up for switching.
+    Chunks of a split video get their own playlist and segment names, to be
+    joined by stitch_chunk_playlists.
+    """
+    if chunk_index is None:
+        playlist_name, segment_name, master_name = "playlist", "segment", "master"
+    else:
+        playlist_name = segment_name = get_chunk_name(chunk_index)
+        master_name = f"{playlist_name}_master"
+    segment_seconds = settings.HLS_SEGMENT_SECONDS
+    output_dir = Path(output_dir)
+    video_renditions = [
+        rendition for rendition in renditions if rendition.get("height")
+    ]
+    audio_renditions = [
+        rendition for rendition in renditions if not rendition.get("height")
+    ]
+
+    command = ["ffmpeg", "-y", "-i", str(video_path)]
+    if video_renditions:
+        # Decode once, then scale a copy of the frames per rendition
+        count = len(video_renditions)
+        split_outputs = "".join(f"[v{index}]" for index in range(count))
+        filters = [f"[0:v]split={count}{split_outputs}"]
+        filters += [
+            f"[v{index}]scale=-2:{rendition['height']}[v{index}out]"
+            for index, rendition in enumerate(video_renditions)
+        ]
+        command += ["-filter_complex", ";".join(filters)]
+
+    stream_map = []
+    audio_index = 0
+    for index, rendition in enumerate(video_renditions):
+        command += [
+            "-map",
+            f"[v{index}out]",
+            f"-c:v:{index}",
+            "libx264",
+            f"-b:v:{index}",
+            rendition["video_bitrate"],
+        ]
+        if not has_audio:
+            stream_map.append(f"v:{index},name:{rendition['name']}")
+            continue
+        command += [
+            "-map",
+            "0:a:0",
+            f"-c:a:{audio_index}",
+            "aac",
+            f"-b:a:{audio_index}",
+            rendition["audio_bitrate"],
+        ]
+        stream_map.append(f"v:{index},a:{audio_index},name:{rendition['name']}")
+        audio_index += 1
+
+    if has_audio:
+        for rendition in audio_renditions:
+            command += [
+                "-map",
+                "0:a:0",
+                f"-c:a:{audio_index}",
+                "aac",
+                f"-b:a:{audio_index}",
+                rendition["audio_bitrate"],
+            ]
+            stream_map.append(f"a:{audio_index},name:{rendition['name']}")
+            audio_index += 1
+
+    if video_renditions:
+        command += [
+            "-force_key_frames",
+            f"expr:gte(t,n_forced*{segment_seconds})",
+            "-sc_threshold",
+            "0",
+        ]
+    command += [
+        "-f",
+        "hls",
+        "-hls_time",
+        str(segment_seconds),
+        "-hls_list_size",
+        "0",  # Include all segments in playlist
+        "-hls_playlist_type",
+        "vod",
+        "-hls_segment_filename",
+        str(output_dir / "%v" / f"{segment_name}_%03d.ts"),
+        "-master_pl_name",
+        f"{master_name}.m3u8",
+        "-var_stream_map",
+        " ".join(stream_map),
+        str(output_dir / "%v" / f"{playlist_name}.m3u8"),
+    ]
+    return command
+
+
+def get_chunk_name(chunk_index):
+    return f"chunk_{chunk_index:04d}"
+
+
+def split_video(video_path, work_dir, chunk_seconds, timeout=3600):
+    """
+    Cut a video into chunks of about chunk_seconds without re-encoding.
+
+    Stream copy can only cut at keyframes, so every chunk starts with one and
+    can be encoded on its own. Returns a list of (chunk path, duration).
+    """
+    work_dir = Path(work_dir)
+    chunk_list = work_dir / "chunks.csv"
+    returncode, error_msg = run_ffmpeg(
+        [
+            "ffmpeg",
+            "-y",
+            "-i",
+            str(video_path),
+            "-map",
+            "0:v:0",
+            "-map",
+            "0:a:0?",
+            "-c",
+            "copy",
+            "-f",
+            "segment",
+            "-segment_time",
+            str(chunk_seconds),
+            "-reset_timestamps",
+            "1",
+            "-segment_list",
+            str(chunk_list),
+            "-segment_list_type",
+            "csv",
+            str(work_dir / "chunk_%04d.mkv"),
+        ],
+        timeout=timeout,
+    )
+    if returncode != 0:
+        raise RuntimeError(f"Splitting {video_path} failed: {error_msg[-200:]}")
+
+    chunks = []
+    for line in chunk_list.read_text().splitlines():
+        # Lines are "<file name>,<start time>,<end time>"
+        name, start, end = line.rsplit(",", 2)
+        chunks.append((str(work_dir / name), float(end) - float(start)))
+    return chunks
+
+
+def _read_media_playlist(path):
+    """Return the target duration and the segment lines of a media playlist"""
+    target_duration = 0
+    segment_lines = []
+    for line in path.read_text().splitlines():
+        if line.startswith("#EXT-X-TARGETDURATION:"):
+            target_duration = int(line.partition(":")[2])
+        elif line.startswith("#EXTINF:") or (line and not line.startswith("#")):
+            segment_lines.append(line)
+    return target_duration, segment_lines
+
+
+def stitch_chunk_playlists(output_dir, chunk_count):
+    """
+    Join the playlists of separately encoded chunks into one media playlist
+    per rendition and a master playlist.
+
+    Every chunk starts its timestamps at zero, so chunks are separated by
+    discontinuity tags, at the same places in every rendition.
+    """
+    output_dir = Path(output_dir)
+    chunk_names = [get_chunk_name(index) for index in range(chunk_count)]
+
+    for rendition_dir in output_dir.iterdir():
+        if not rendition_dir.is_dir():
+            continue
+        target_duration = 0
+        body = []
+        for chunk_name in chunk_names:
+            chunk_playlist = rendition_dir / f"{chunk_name}.m3u8"
+            chunk_target_duration, segment_lines = _read_media_playlist(chunk_playlist)
+            target_duration = max(target_duration, chunk_target_duration)
+            if body:
+                body.append("#EXT-X-DISCONTINUITY")
+            body += segment_lines
+            chunk_playlist.unlink()
+
+        header = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{target_duration}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            "#EXT-X-PLAYLIST-TYPE:VOD",
+        ]
+        playlist = "\n".join(header + body + ["#EXT-X-ENDLIST", ""])
+        (rendition_dir / "playlist.m3u8").write_text(playlist)
+
+    # Renditions are the same for every chunk, the first one's master will do
+    first_master = output_dir / f"{chunk_names[0]}_master.m3u8"
+    master = first_master.read_text().replace(
+        f"/{chunk_names[0]}.m3u8", "/playlist.m3u8"
+    )
+    (output_dir / MASTER_PLAYLIST).write_text(master)
+    for chunk_name in chunk_names:
+        (output_dir / f"{chunk_name}_master.m3u8").unlink(missing_ok=True)
+
+
+def run_ffmpeg(command, on_progress=None, timeout=3600, stderr_tail=4096):
+    """
+    Run an ffmpeg command, calling on_progress(encoded_seconds) as it reports
+    progress on stdout.
+
+    stderr goes to a temporary file rather than memory, only its last
+    stderr_tail bytes are read back. Returns (returncode, stderr tail) and
+    raises subprocess.TimeoutExpired once the timeout has passed, a watchdog
+    kills ffmpeg then even if it stopped writing to stdout.
+    """
+    command = [command[0], "-progress", "pipe:1", "-nostats", *command[1:]]
+    timed_out = threading.Event()
+    with tempfile.TemporaryFile() as stderr_file:
+        with subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=stderr_file
+        ) as process:
+
+            def kill():
+                timed_out.set()
+                process.kill()
+
+            watchdog = threading.Timer(timeout, kill)
+            watchdog.daemon = True
+            watchdog.start()
+            try:
+                for line in process.stdout:
+                    # Reports are key=value lines, out_time_us is the
+                    # position reached in the output
+                    key, _, value = line.decode(errors="replace").partition("=")
+                    if key == "out_time_us" and on_progress:
+                        value = value.strip()
+                        if value.isdigit():
+                            on_progress(int(value) / 1_000_000)
+                returncode = process.wait()
+            except BaseException:
+                process.kill()
+                raise
+            finally:
+                watchdog.cancel()
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(command, timeout)
+
+        stderr_file.seek(0, 2)
+        stderr_file.seek(max(stderr_file.tell() - stderr_tail, 0))
+        return returncode, stderr_file.read().decode(errors="replace")
+
+
+def replace_ladder_dir(output_name, new_dir):
+    """
+    Move a finished ladder in place of the current one, so players keep
+    reading complete playlists while a video is re-encoded
+    """
+    ladder_dir = get_ladder_dir(output_name)
+    ladder_dir.parent.mkdir(parents=True, exist_ok=True)
+    old_dir = ladder_dir.with_name(f"{LADDER_DIR}.old")
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if ladder_dir.exists():
+        ladder_dir.rename(old_dir)
+    Path(new_dir).rename(ladder_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def remove_legacy_output(lesson_part_id):
+    """
+    Delete the single rendition playlist and segments written before the
+    ladder existed. Returns the number of files removed.
+    """
+    hls_dir = get_hls_dir(lesson_part_id)
+    legacy_files = list(hls_dir.glob("segment_*.ts"))
+    if (hls_dir / LEGACY_PLAYLIST).exists():
+        legacy_files.append(hls_dir / LEGACY_PLAYLIST)
+    for path in legacy_files:
+        path.unlink()
+    return len(legacy_files)
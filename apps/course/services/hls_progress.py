@@ -0,0 +1,135 @@
+import time
+
+from django.core.cache import cache
+from django.utils import timezone
+
+# Kept a while after the job ends, so the last state can still be read
+PROGRESS_TIMEOUT = 2 * 60 * 60
+# Minimum seconds between two cache writes of the same job
+PROGRESS_WRITE_INTERVAL = 2
+
+
+def get_hls_progress_cache_key(lesson_part_id):
+    return f"hls_progress:{lesson_part_id}"
+
+
+def get_chunk_progress_cache_key(lesson_part_id, chunk_index):
+    return f"hls_progress:{lesson_part_id}:chunk:{chunk_index}"
+
+
+def get_hls_progress(lesson_part_id):
+    """
+    Return the progress of the HLS conversion of a lesson part as
+    {"percent": float, "eta_seconds": int or None, "updated_at": str}, or None
+    if no conversion reported progress recently
+    """
+    progress = cache.get(get_hls_progress_cache_key(lesson_part_id))
+    if not progress or "chunk_durations" not in progress:
+        return progress
+    return _get_chunked_progress(lesson_part_id, progress)
+
+
+def _get_chunked_progress(lesson_part_id, job):
+    """Sum up the progress reported by the chunks of a split video"""
+    chunk_durations = job["chunk_durations"]
+    keys = [
+        get_chunk_progress_cache_key(lesson_part_id, index)
+        for index in range(len(chunk_durations))
+    ]
+    encoded = cache.get_many(keys)
+    encoded_seconds = sum(
+        min(encoded.get(key, 0), duration)
+        for key, duration in zip(keys, chunk_durations)
+    )
+    percent = min(encoded_seconds / (sum(chunk_durations) or 1), 1) * 100
+    eta_seconds = None
+    if percent > 0:
+        elapsed = time.time() - job["started_at"]
+        eta_seconds = round(elapsed * (100 - percent) / percent)
+    return {
+        "percent": round(percent, 1),
+        "eta_seconds": eta_seconds,
+        "updated_at": timezone.now().isoformat(),
+    }
+
+
+def set_hls_progress(lesson_part_id, percent, eta_seconds=None):
+    cache.set(
+        get_hls_progress_cache_key(lesson_part_id),
+        {
+            "percent": round(percent, 1),
+            "eta_seconds": eta_seconds,
+            "updated_at": timezone.now().isoformat(),
+        },
+        PROGRESS_TIMEOUT,
+    )
+
+
+def start_chunked_hls_progress(lesson_part_id, chunk_durations):
+    """Track a video split into chunks that report their progress separately"""
+    clear_hls_progress(lesson_part_id, len(chunk_durations))
+    cache.set(
+        get_hls_progress_cache_key(lesson_part_id),
+        {"chunk_durations": list(chunk_durations), "started_at": time.time()},
+        PROGRESS_TIMEOUT,
+    )
+
+
+def clear_hls_progress(lesson_part_id, chunk_count=None):
+    if chunk_count is None:
+        job = cache.get(get_hls_progress_cache_key(lesson_part_id)) or {}
+        chunk_count = len(job.get("chunk_durations", ()))
+    cache.delete_many(
+        [get_hls_progress_cache_key(lesson_part_id)]
+        + [
+            get_chunk_progress_cache_key(lesson_part_id, index)
+            for index in range(chunk_count)
+        ]
+    )
+
+
+class ProgressReporter:
+    """
+    Turn the encoded media time of an ffmpeg job into a percentage and an ETA
+    and cache them, at most every PROGRESS_WRITE_INTERVAL seconds. Chunks of a
+    split video only cache their encoded time and extend the expiry of the
+    job, see start_chunked_hls_progress.
+    """
+
+    def __init__(self, lesson_part_id, duration, chunk_index=None):
+        self.lesson_part_id = lesson_part_id
+        self.duration = duration
+        self.chunk_index = chunk_index
+        self.started_at = time.monotonic()
+        self.written_at = None
+
+    def update(self, encoded_seconds, force=False):
+        if not self.duration:
+            return
+        now = time.monotonic()
+        if (
+            not force
+            and self.written_at is not None
+            and now - self.written_at < PROGRESS_WRITE_INTERVAL
+        ):
+            return
+        self.written_at = now
+
+        if self.chunk_index is not None:
+            cache.set(
+                get_chunk_progress_cache_key(self.lesson_part_id, self.chunk_index),
+                encoded_seconds,
+                PROGRESS_TIMEOUT,
+            )
+            # Keep the job alive for as long as its chunks are encoding
+            cache.touch(
+                get_hls_progress_cache_key(self.lesson_part_id), PROGRESS_TIMEOUT
+            )
+            return
+
+        percent = min(max(encoded_seconds / self.duration, 0), 1) * 100
+        eta_seconds = None
+        if percent > 0:
+            elapsed = now - self.started_at
+            eta_seconds = round(elapsed * (100 - percent) / percent)
+        set_hls_progress(self.lesson_part_id, percent, eta_seconds)
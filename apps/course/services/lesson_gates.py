@@ -0,0 +1,81 @@
+from itertools import groupby
+
+from django.core.cache import cache
+
+from apps.course.models import Lesson
+from apps.course.services.catalog import get_catalog_version
+
+LESSON_GATES_CACHE_TIMEOUT = 60 * 60
+
+# Group members can reach lessons this many positions after the last passed one
+UNLOCK_WINDOW = 2
+
+
+def get_lesson_gates_cache_key(group_member_id):
+    # Pass balls and lesson order are catalog content, so follow its version
+    return f"lesson_gates:{get_catalog_version()}:{group_member_id}"
+
+
+def compute_lesson_statuses(lessons, grades):
+    """
+    Compute the open/lock/loock status of every lesson in one pass.
+
+    lessons: iterable of (id, order, theoretical_pass_ball, practical_pass_ball)
+    grades: dict of lesson_id -> (theoretical_ball, practical_ball)
+    """
+    statuses = {}
+    max_completed = None
+
+    lessons = sorted(lessons, key=lambda lesson: lesson[1])
+    for order, same_order in groupby(lessons, key=lambda lesson: lesson[1]):
+        same_order = list(same_order)
+
+        # Only lessons with a strictly lower order count as prerequisites
+        for lesson_id, *_ in same_order:
+            if order == 1:
+                statuses[lesson_id] = "open"
+            elif max_completed is None:
+                statuses[lesson_id] = "lock" if order <= 3 else "loock"
+            elif order <= max_completed + UNLOCK_WINDOW:
+                statuses[lesson_id] = "lock"
+            else:
+                statuses[lesson_id] = "loock"
+
+        for lesson_id, _, theoretical_pass_ball, practical_pass_ball in same_order:
+            grade = grades.get(lesson_id)
+            if (
+                grade
+                and grade[0] >= theoretical_pass_ball
+                and grade[1] >= practical_pass_ball
+            ):
+                max_completed = order
+
+    return statuses
+
+
+def get_lesson_statuses(group_member, course_id):
+    """Return {lesson_id: status} for a group member, cached until a grade changes"""
+    cache_key = get_lesson_gates_cache_key(group_member.id)
+    statuses = cache.get(cache_key)
+    if statuses is not None:
+        return statuses
+
+    lessons = Lesson.objects.filter(course_id=course_id, is_active=True).values_list(
+        "id", "order", "theoretical_pass_ball", "practical_pass_ball"
+    )
+    grades = {
+        lesson_id: (theoretical_ball, practical_ball)
+        for lesson_id, theoretical_ball, practical_ball in (
+            group_member.group_member_grades.filter(
+                lesson__course_id=course_id
+            ).values_list("lesson_id", "theoretical_ball", "practical_ball")
+        )
+    }
+
+    statuses = compute_lesson_statuses(lessons, grades)
+    cache.set(cache_key, statuses, timeout=LESSON_GATES_CACHE_TIMEOUT)
+    return statuses
+
+
+def invalidate_lesson_statuses(group_member_id):
+    cache.delete(get_lesson_gates_cache_key(group_member_id))
@@ -0,0 +1,92 @@
+from apps.course.models import LessonPart, UserLessonPart, UserTest
+
+
+class LessonProgressSnapshot:
+    """
+    A user's progress through the parts of one lesson, loaded up front so lock
+    state and test attempts of every part are resolved in memory.
+    """
+
+    def __init__(self, user, lesson):
+        self.user = user
+        self.lesson = lesson
+
+        # (id, order, test_id) of every active part, ordered by order
+        self.parts = list(
+            LessonPart.objects.filter(lesson=lesson, is_active=True)
+            .order_by("order", "id")
+            .values_list("id", "order", "test_id")
+        )
+        test_ids = {test_id for _, _, test_id in self.parts if test_id}
+
+        self.completed_part_ids = set()
+        self.submitted_test_ids = set()
+        self.latest_user_test_ids = {}
+
+        if not user or not user.is_authenticated:
+            return
+
+        self.completed_part_ids = set(
+            UserLessonPart.objects.filter(
+                user_lesson__user_course__user=user,
+                user_lesson__lesson=lesson,
+                is_completed=True,
+            ).values_list("lesson_part_id", flat=True)
+        )
+
+        if test_ids:
+            user_tests = (
+                UserTest.objects.filter(user=user, test_id__in=test_ids)
+                .order_by("start_date", "id")
+                .values_list("id", "test_id", "is_submitted")
+            )
+            for user_test_id, test_id, is_submitted in user_tests:
+                # Later attempts overwrite earlier ones
+                self.latest_user_test_ids[test_id] = user_test_id
+                if is_submitted:
+                    self.submitted_test_ids.add(test_id)
+
+    def get_user_test_id(self, lesson_part):
+        """Return the id of the user's most recent attempt of the part's test"""
+        if not lesson_part.test_id:
+            return None
+        return self.latest_user_test_ids.get(lesson_part.test_id)
+
+    def get_previous_part(self, lesson_part):
+        previous_part = None
+        for part in self.parts:
+            if part[1] >= lesson_part.order:
+                break
+            previous_part = part
+        return previous_part
+
+    def is_locked(self, lesson_part):
+        """
+        Determine if a lesson part is locked for the user.
+        Logic:
+        - First lesson part (order=1) is always unlocked
+        - If current part is a test and user has attempted it, it's unlocked (can retry)
+        - Other lesson parts are locked until the previous lesson part is completed
+        - If previous part has a test and user attempted it (even if failed), unlock next part
+        """
+        if lesson_part.order == 1:
+            return False
+
+        if not self.user or not self.user.is_authenticated:
+            return True
+
+        if lesson_part.test_id in self.submitted_test_ids:
+            return False
+
+        previous_part = self.get_previous_part(lesson_part)
+        if not previous_part:
+            return False
+
+        previous_part_id, _, previous_test_id = previous_part
+        if previous_part_id in self.completed_part_ids:
+            return False
+
+        if previous_test_id and previous_test_id in self.submitted_test_ids:
+            return False
+
+        return True
@@ -0,0 +1,139 @@
+"""
+Matching answers are stored as {left_pair_id: right_pair_id}, with the keys as
+strings since they are JSON object keys. A question is answered correctly when
+every pair is matched to itself.
+"""
+
+import random
+
+from django.utils.crypto import salted_hmac
+
+
+def shuffle_right_items(right_items, seed):
+    """
+    Shuffle matching right items in place. The permutation depends only on the
+    seed and the number of items, so positions shown to a user can be mapped
+    back to pairs later.
+    """
+    random.Random(seed).shuffle(right_items)
+    return right_items
+
+
+def get_shuffle_seed(user_answer):
+    """
+    Seed of the right item shuffle shown for an answer: an HMAC of the attempt
+    and question ids under SECRET_KEY, so every attempt gets its own order and
+    clients, who know both ids, can't replay the shuffle.
+    """
+    return salted_hmac(
+        "apps.course.matching.shuffle",
+        f"{user_answer.user_test_id}:{user_answer.question_id}",
+    ).hexdigest()
+
+
+def get_matching_entry(answer_key, question_id):
+    """Answer key entry of a matching question, empty for unknown questions"""
+    return answer_key["questions"].get(question_id) or {"pairs": []}
+
+
+def get_pair_ids(entry):
+    """Pair ids of a compiled matching answer key entry, in pair order"""
+    return [pair_id for pair_id, _, _ in entry["pairs"]]
+
+
+def _from_item_texts(entry, matching_answer):
+    """Convert a legacy {left_item: right_item} dict, None if an item is unknown"""
+    left_pairs = {}
+    right_ids = {}
+    for pair_id, left_item, right_item in entry["pairs"]:
+        left_pairs[left_item] = (pair_id, right_item)
+        right_ids.setdefault(right_item, pair_id)
+
+    pair_ids = {}
+    for left_item, right_item in matching_answer.items():
+        if left_item not in left_pairs or right_item not in right_ids:
+            return None
+        left_id, own_right_item = left_pairs[left_item]
+        # Pairs sharing a right item text are interchangeable
+        right_id = left_id if right_item == own_right_item else right_ids[right_item]
+        pair_ids[str(left_id)] = right_id
+    return pair_ids
+
+
+def _from_positions(entry, positions, seed):
+    """
+    Convert a position array: the right item positions shown by TestQuestions,
+    one per left item in left item order (null for unmatched items)
+    """
+    pair_ids = get_pair_ids(entry)
+    if len(positions) > len(pair_ids):
+        return None
+    right_ids = shuffle_right_items(list(pair_ids), seed)
+
+    matched = {}
+    for left_id, position in zip(pair_ids, positions):
+        if position is None:
+            continue
+        if not isinstance(position, int) or not 1 <= position <= len(right_ids):
+            return None
+        matched[str(left_id)] = right_ids[position - 1]
+    return matched
+
+
+def _is_stored_form(matching_answer):
+    return all(
+        isinstance(left_id, str) and left_id.isdigit() and isinstance(right_id, int)
+        for left_id, right_id in matching_answer.items()
+    )
+
+
+def normalize_matching_answer(entry, matching_answer, seed=None):
+    """
+    Convert a submitted matching answer to the stored form. Accepts a position
+    array (seeded like the TestQuestions shuffle), the legacy dict of item texts
+    or the stored form. Returns None if it refers to items of another question.
+    """
+    if matching_answer is None:
+        return None
+    if isinstance(matching_answer, list):
+        return _from_positions(entry, matching_answer, seed)
+    if not isinstance(matching_answer, dict):
+        return None
+    if _is_stored_form(matching_answer):
+        known_ids = {str(pair_id) for pair_id in get_pair_ids(entry)}
+        if set(matching_answer) <= known_ids and all(
+            str(right_id) in known_ids for right_id in matching_answer.values()
+        ):
+            return matching_answer
+        return None
+    return _from_item_texts(entry, matching_answer)
+
+
+def is_matching_answer_correct(entry, matching_answer):
+    """Check that every pair of the question is matched to itself"""
+    pair_ids = get_pair_ids(entry)
+    if not matching_answer or not pair_ids:
+        return False
+    if not _is_stored_form(matching_answer):
+        # Answers buffered before the id-based format was introduced
+        matching_answer = _from_item_texts(entry, matching_answer)
+        if matching_answer is None:
+            return False
+    return len(matching_answer) == len(pair_ids) and all(
+        matching_answer.get(str(pair_id)) == pair_id for pair_id in pair_ids
+    )
+
+
+def expand_matching_answer(entry, matching_answer):
+    """Return a stored matching answer as {left_item: right_item} texts"""
+    if not matching_answer or not _is_stored_form(matching_answer):
+        return matching_answer
+    items = {
+        str(pair_id): (left_item, right_item)
+        for pair_id, left_item, right_item in entry["pairs"]
+    }
+    return {
+        items[left_id][0]: items[str(right_id)][1]
+        for left_id, right_id in matching_answer.items()
+        if left_id in items and str(right_id) in items
+    }
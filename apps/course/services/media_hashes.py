@@ -0,0 +1,148 @@
+"""
+Content-hash deduplication of uploaded media.
+
+Editors often upload the same lecture video, picture or handout to several
+rows. Every new upload is fingerprinted with a streaming SHA-256 stored in
+content_hash, and when another row already holds a file with the same hash
+the upload is pointed at that file instead of storing a second copy. Lesson
+parts sharing a video also share its HLS output, see hls.get_output_name.
+"""
+
+import hashlib
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Count
+
+from apps.course.models import LessonPart
+from apps.course.services import hls
+
+BLOCK_SIZE = 1024 * 1024
+
+
+def hash_file(file):
+    """Return the SHA-256 of a Django file, read block by block"""
+    sha256 = hashlib.sha256()
+    for block in file.chunks(BLOCK_SIZE):
+        sha256.update(block)
+    if file.seekable():
+        file.seek(0)
+    return sha256.hexdigest()
+
+
+def find_duplicate_file(model, field_name, content_hash):
+    """Return the name of a stored file with the given content hash, or None"""
+    names = (
+        model.objects.filter(content_hash=content_hash)
+        .exclude(**{field_name: ""})
+        .exclude(**{f"{field_name}__isnull": True})
+        .order_by("pk")
+        .values_list(field_name, flat=True)
+    )
+    storage = model._meta.get_field(field_name).storage
+    for name in names:
+        if storage.exists(name):
+            return name
+    return None
+
+
+def deduplicate_file_field(instance, field_name):
+    """
+    Fingerprint a newly assigned file of instance before it is saved, and
+    reuse the stored file of an identical upload instead of storing it again.
+
+    Files already in storage are left alone, their hash is filled in by the
+    deduplicate_media command.
+    """
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        instance.content_hash = ""
+        return
+    if field_file._committed:
+        return
+
+    instance.content_hash = hash_file(field_file)
+    name = find_duplicate_file(type(instance), field_name, instance.content_hash)
+    if name:
+        setattr(instance, field_name, name)
+
+
+def fill_missing_hashes(model, field_name):
+    """Hash the stored files of rows saved before hashing. Returns the count"""
+    rows = (
+        model.objects.filter(content_hash="")
+        .exclude(**{field_name: ""})
+        .exclude(**{f"{field_name}__isnull": True})
+    )
+    storage = model._meta.get_field(field_name).storage
+    filled = 0
+    for pk, name in rows.values_list("pk", field_name).iterator():
+        if not storage.exists(name):
+            continue
+        with storage.open(name) as file:
+            content_hash = hash_file(file)
+        # Queryset updates skip the signals, nothing is converted again
+        model.objects.filter(pk=pk).update(content_hash=content_hash)
+        filled += 1
+    return filled
+
+
+def merge_duplicate_files(model, field_name):
+    """
+    Point rows with the same content hash at one stored file and delete the
+    other copies. Returns the number of files deleted.
+    """
+    storage = model._meta.get_field(field_name).storage
+    duplicate_hashes = (
+        model.objects.exclude(content_hash="")
+        .values("content_hash")
+        .annotate(names=Count(field_name, distinct=True))
+        .filter(names__gt=1)
+        .values_list("content_hash", flat=True)
+    )
+    deleted = 0
+    for content_hash in duplicate_hashes:
+        kept_name = find_duplicate_file(model, field_name, content_hash)
+        if not kept_name:
+            continue
+        rows = model.objects.filter(content_hash=content_hash).exclude(
+            **{field_name: kept_name}
+        )
+        names = set(rows.values_list(field_name, flat=True))
+        rows.update(**{field_name: kept_name})
+        for name in names:
+            if not model.objects.filter(**{field_name: name}).exists():
+                storage.delete(name)
+                deleted += 1
+    return deleted
+
+
+def remove_unused_hls_outputs():
+    """
+    Delete the HLS outputs of videos no lesson part holds or plays any more.
+    Returns the number of outputs removed.
+    """
+    used_names = {
+        f"sha256_{content_hash}"
+        for content_hash in LessonPart.objects.exclude(content_hash="")
+        .values_list("content_hash", flat=True)
+        .distinct()
+    }
+    played_urls = set(
+        LessonPart.objects.exclude(hls_video_url__isnull=True)
+        .exclude(hls_video_url="")
+        .values_list("hls_video_url", flat=True)
+    )
+    used_names |= {
+        url.split(f"/{hls.HLS_ROOT}/", 1)[1].split("/", 1)[0]
+        for url in played_urls
+        if f"/{hls.HLS_ROOT}/" in url
+    }
+
+    removed = 0
+    for output_dir in (Path(settings.MEDIA_ROOT) / hls.HLS_ROOT).glob("sha256_*"):
+        if output_dir.name not in used_names:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            removed += 1
+    return removed
@@ -0,0 +1,111 @@
+import copy
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.utils.translation import get_language
+
+from apps.course.models import AnswerChoice, MatchingPair, Question
+from apps.course.services.catalog import absolute_url
+from apps.course.services.matching import shuffle_right_items
+from apps.course.services.test_content import get_test_content_version
+
+QUESTION_PAYLOAD_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_question_payload_cache_key(test_id, version, language, question_id):
+    return f"question_payload:{test_id}:{version}:{language}:{question_id}"
+
+
+def build_question_payloads(test_type, question_ids):
+    """
+    Serialize questions without any user state.
+
+    File fields are stored as relative urls and matching right items in their
+    stored order, both are finished per request by personalize_question_payload.
+    """
+    from apps.course.api_endpoints.course.TestDetail.serializers import (
+        QuestionSerializer,
+    )
+
+    questions = Question.objects.filter(id__in=question_ids)
+    if test_type == "matching":
+        questions = questions.prefetch_related(
+            Prefetch(
+                "matching_pairs", queryset=MatchingPair.objects.order_by("order", "id")
+            )
+        )
+    elif test_type == "regular_test":
+        questions = questions.prefetch_related(
+            Prefetch("choices", queryset=AnswerChoice.objects.order_by("order"))
+        )
+
+    payloads = {}
+    for question in questions:
+        payload = dict(
+            QuestionSerializer(question, context={"test_type": test_type}).data
+        )
+        if "matching_right_items" in payload:
+            payload["matching_right_items"] = [
+                {"right_item": pair.right_item}
+                for pair in question.matching_pairs.all()
+            ]
+        payloads[question.id] = payload
+    return payloads
+
+
+def get_question_payloads(test_id, test_type, question_ids, language=None):
+    """Return {question_id: payload} from the cache, serializing only the misses"""
+    version = get_test_content_version(test_id)
+    language = language or get_language() or "en"
+    cache_keys = {
+        question_id: get_question_payload_cache_key(
+            test_id, version, language, question_id
+        )
+        for question_id in question_ids
+    }
+
+    cached = cache.get_many(cache_keys.values())
+    payloads = {
+        question_id: cached[cache_key]
+        for question_id, cache_key in cache_keys.items()
+        if cache_key in cached
+    }
+
+    missing_ids = [
+        question_id for question_id in question_ids if question_id not in payloads
+    ]
+    if missing_ids:
+        built = build_question_payloads(test_type, missing_ids)
+        cache.set_many(
+            {
+                cache_keys[question_id]: payload
+                for question_id, payload in built.items()
+            },
+            timeout=QUESTION_PAYLOAD_CACHE_TIMEOUT,
+        )
+        payloads.update(built)
+    return payloads
+
+
+def personalize_question_payload(payload, request=None, seed=None):
+    """
+    Add the per-request layer to a shared question payload: absolute file urls
+    and matching right items shuffled with new 1-based positions. A fixed seed
+    (see matching.get_shuffle_seed) keeps the shuffle stable across requests.
+    """
+    payload = copy.deepcopy(payload)
+
+    if payload.get("question_image"):
+        payload["question_image"] = absolute_url(request, payload["question_image"])
+    for choice in payload.get("choices", []):
+        if choice.get("choice_image"):
+            choice["choice_image"] = absolute_url(request, choice["choice_image"])
+
+    if "matching_right_items" in payload:
+        # Shuffle the right items so user can't guess by order
+        right_items = shuffle_right_items(payload["matching_right_items"], seed)
+        payload["matching_right_items"] = [
+            {"position": position, "right_item": item["right_item"]}
+            for position, item in enumerate(right_items, 1)
+        ]
+    return payload
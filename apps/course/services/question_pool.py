@@ -0,0 +1,72 @@
+import random
+
+from django.core.cache import cache
+
+from apps.course.models import Question
+from apps.course.services.test_content import get_test_content_version
+
+QUESTION_POOL_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_question_pool_cache_key(test_id):
+    return f"question_pool:{test_id}:{get_test_content_version(test_id)}"
+
+
+def get_question_pool(test_id):
+    """Return [(question_id, order), ...] of the active questions of a test"""
+    cache_key = get_question_pool_cache_key(test_id)
+    pool = cache.get(cache_key)
+    if pool is None:
+        pool = list(
+            Question.objects.filter(test_id=test_id, is_active=True)
+            .order_by("order", "id")
+            .values_list("id", "order")
+        )
+        cache.set(cache_key, pool, timeout=QUESTION_POOL_CACHE_TIMEOUT)
+    return pool
+
+
+def _sample(question_ids, count):
+    # If we have fewer questions than requested, use all available
+    if len(question_ids) <= count:
+        return list(question_ids)
+    return random.sample(question_ids, count)
+
+
+def _in_pool_order(pool, question_ids):
+    positions = {question_id: index for index, (question_id, _) in enumerate(pool)}
+    return sorted(question_ids, key=positions.__getitem__)
+
+
+def sample_question_ids(test):
+    """
+    Pick the question ids of a new attempt without loading question rows,
+    returned in question order.
+
+    Tests with question_strata draw `count` questions from each order range,
+    other tests draw questions_count questions from the whole pool.
+    """
+    pool = get_question_pool(test.id)
+
+    if not test.question_strata:
+        question_ids = _sample(
+            [question_id for question_id, _ in pool], test.questions_count
+        )
+        return _in_pool_order(pool, question_ids)
+
+    question_ids = []
+    chosen_ids = set()
+    for stratum in test.question_strata:
+        from_order = stratum.get("from_order")
+        to_order = stratum.get("to_order")
+        stratum_ids = [
+            question_id
+            for question_id, order in pool
+            if (from_order is None or order >= from_order)
+            and (to_order is None or order <= to_order)
+            and question_id not in chosen_ids
+        ]
+        sampled_ids = _sample(stratum_ids, stratum.get("count", 0))
+        question_ids.extend(sampled_ids)
+        chosen_ids.update(sampled_ids)
+    return _in_pool_order(pool, question_ids)
@@ -0,0 +1,285 @@
+from django.db import NotSupportedError, models, transaction
+from django.db.models import Case, F, Func, Value, When
+from django.utils import timezone
+
+from apps.course.models import Question, QuestionStats, UserAnswer, UserTest
+from apps.course.services.answer_sheets import get_user_answers, uses_answer_sheet
+
+STATS_FIELDS = (
+    "attempts_count",
+    "answered_count",
+    "correct_count",
+    "total_answer_seconds",
+    "choice_counts",
+)
+# Tests whose stats are rebuilt under one lock by reconcile_question_stats
+RECONCILE_TESTS_PER_BATCH = 20
+
+
+def _empty_totals():
+    return {
+        "attempts_count": 0,
+        "answered_count": 0,
+        "correct_count": 0,
+        "total_answer_seconds": 0.0,
+        "choice_counts": {},
+    }
+
+
+def accumulate_answer_stats(totals, start_date, user_answers):
+    """
+    Add the answers of one submitted attempt to totals ({question_id: totals}).
+
+    The time to answer a question is measured from the previous answer of the
+    attempt, or from its start for the first one.
+    """
+    previous_answered_at = start_date
+    answered = sorted(
+        (answer for answer in user_answers if answer.answered_at),
+        key=lambda answer: answer.answered_at,
+    )
+    answer_seconds = {}
+    for user_answer in answered:
+        seconds = (user_answer.answered_at - previous_answered_at).total_seconds()
+        answer_seconds[user_answer.id] = max(seconds, 0)
+        previous_answered_at = user_answer.answered_at
+
+    for user_answer in user_answers:
+        question_totals = totals.setdefault(user_answer.question_id, _empty_totals())
+        question_totals["attempts_count"] += 1
+        if user_answer.is_correct:
+            question_totals["correct_count"] += 1
+        if user_answer.id in answer_seconds:
+            question_totals["answered_count"] += 1
+            question_totals["total_answer_seconds"] += answer_seconds[user_answer.id]
+        if user_answer.selected_choice_id:
+            # JSON object keys are strings
+            choice_id = str(user_answer.selected_choice_id)
+            choice_counts = question_totals["choice_counts"]
+            choice_counts[choice_id] = choice_counts.get(choice_id, 0) + 1
+    return totals
+
+
+class IncrementJSONCount(Func):
+    """A JSON object of counts with the count of one key increased in SQL"""
+
+    def __init__(self, expression, key, amount):
+        super().__init__(expression, output_field=models.JSONField())
+        self.key = str(key)
+        self.amount = amount
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError(
+            f"IncrementJSONCount is not supported on {connection.vendor}"
+        )
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return (
+            f"jsonb_set(COALESCE({sql}, '{{}}'::jsonb), ARRAY[%s::text], "
+            f"to_jsonb(COALESCE(({sql} ->> %s::text)::integer, 0) + %s))",
+            (*params, self.key, *params, self.key, self.amount),
+        )
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        path = f'$."{self.key}"'
+        return (
+            f"json_set(COALESCE({sql}, '{{}}'), %s, "
+            f"COALESCE(json_extract({sql}, %s), 0) + %s)",
+            (*params, path, *params, path, self.amount),
+        )
+
+
+def record_question_stats(user_test, user_answers):
+    """
+    Add a submitted attempt to the stats of its questions once the submission
+    commits.
+
+    The stats rows are shared by every attempt of a test, so they are updated
+    in a short transaction of their own after the submission instead of being
+    held locked until the request that grades it ends.
+    """
+    totals = accumulate_answer_stats({}, user_test.start_date, user_answers)
+    if not totals:
+        return
+    user_test_id = user_test.pk
+    transaction.on_commit(
+        lambda: add_question_totals(user_test_id, totals), robust=True
+    )
+
+
+def add_question_totals(user_test_id, totals):
+    """
+    Add the totals of one attempt to its questions' stats rows.
+
+    Creates missing rows and adds the attempt to them with F() increments in
+    one UPDATE, so attempts submitted at once don't wait on each other to read
+    the shared rows and the cost is independent of history. Does nothing when
+    the attempt is already counted, e.g. by reconcile_question_stats.
+    """
+    with transaction.atomic():
+        QuestionStats.objects.bulk_create(
+            [QuestionStats(question_id=question_id) for question_id in totals],
+            ignore_conflicts=True,
+        )
+
+        def increment(field):
+            return Case(
+                *[
+                    When(
+                        question_id=question_id,
+                        then=F(field) + Value(question_totals[field]),
+                    )
+                    for question_id, question_totals in totals.items()
+                    if question_totals[field]
+                ],
+                default=F(field),
+                output_field=QuestionStats._meta.get_field(field),
+            )
+
+        choice_counts = []
+        for question_id, question_totals in totals.items():
+            if not question_totals["choice_counts"]:
+                continue
+            counts = F("choice_counts")
+            for choice_id, count in question_totals["choice_counts"].items():
+                counts = IncrementJSONCount(counts, choice_id, count)
+            choice_counts.append(When(question_id=question_id, then=counts))
+
+        # Stats rows are locked before the attempt, in the same order as
+        # _reconcile_tests, which flags the attempts it counted
+        QuestionStats.objects.filter(question_id__in=totals).update(
+            attempts_count=increment("attempts_count"),
+            answered_count=increment("answered_count"),
+            correct_count=increment("correct_count"),
+            total_answer_seconds=increment("total_answer_seconds"),
+            choice_counts=Case(
+                *choice_counts,
+                default=F("choice_counts"),
+                output_field=models.JSONField(),
+            ),
+            updated_at=timezone.now(),
+        )
+        recorded = UserTest.objects.filter(
+            pk=user_test_id, stats_recorded=False
+        ).update(stats_recorded=True)
+        if not recorded:
+            transaction.set_rollback(True)
+
+
+def _accumulate_attempts(totals, attempts, chunk_size):
+    """
+    Add the answers of attempts to totals, reading the attempts in primary
+    key ranges of chunk_size so no single query scans the answer table.
+    Returns the ids of the attempts not yet flagged as recorded.
+    """
+    attempts = attempts.order_by("pk")
+    unrecorded_ids = []
+    last_pk = 0
+    while True:
+        chunk = {
+            user_test.pk: user_test
+            for user_test in attempts.filter(pk__gt=last_pk).only(
+                "pk", "start_date", "answer_sheet", "stats_recorded"
+            )[:chunk_size]
+        }
+        if not chunk:
+            break
+        last_pk = max(chunk)
+        unrecorded_ids += [
+            pk for pk, user_test in chunk.items() if not user_test.stats_recorded
+        ]
+
+        answers_by_attempt = {
+            user_test.pk: get_user_answers(user_test)
+            for user_test in chunk.values()
+            if uses_answer_sheet(user_test)
+        }
+        row_attempt_ids = [pk for pk in chunk if pk not in answers_by_attempt]
+        for user_answer in (
+            UserAnswer.objects.filter(user_test_id__in=row_attempt_ids)
+            .order_by()
+            .only(
+                "id",
+                "user_test_id",
+                "question_id",
+                "selected_choice_id",
+                "is_correct",
+                "answered_at",
+            )
+        ):
+            answers_by_attempt.setdefault(user_answer.user_test_id, []).append(
+                user_answer
+            )
+        for user_test_id, user_answers in answers_by_attempt.items():
+            accumulate_answer_stats(
+                totals, chunk[user_test_id].start_date, user_answers
+            )
+    return unrecorded_ids
+
+
+def _reconcile_tests(test_ids, chunk_size):
+    """Rebuild the stats of the questions of some tests under a row lock"""
+    question_ids = list(
+        Question.objects.filter(test_id__in=test_ids).values_list("id", flat=True)
+    )
+    if not question_ids:
+        return 0
+
+    with transaction.atomic():
+        QuestionStats.objects.bulk_create(
+            [QuestionStats(question_id=question_id) for question_id in question_ids],
+            ignore_conflicts=True,
+        )
+        # Submissions committed before the lock are read below and flagged as
+        # recorded, so their pending increments are dropped once it's released
+        question_stats = list(
+            QuestionStats.objects.select_for_update()
+            .filter(question_id__in=question_ids)
+            .order_by("question_id")
+        )
+        totals = {}
+        unrecorded_ids = _accumulate_attempts(
+            totals,
+            UserTest.objects.filter(test_id__in=test_ids, is_submitted=True),
+            chunk_size,
+        )
+
+        now = timezone.now()
+        for stats in question_stats:
+            question_totals = totals.get(stats.question_id) or _empty_totals()
+            for field in STATS_FIELDS:
+                setattr(stats, field, question_totals[field])
+            stats.updated_at = now
+        QuestionStats.objects.bulk_update(
+            question_stats, [*STATS_FIELDS, "updated_at"], batch_size=500
+        )
+        for index in range(0, len(unrecorded_ids), chunk_size):
+            UserTest.objects.filter(
+                pk__in=unrecorded_ids[index : index + chunk_size]
+            ).update(stats_recorded=True)
+    return len(question_stats)
+
+
+def reconcile_question_stats(chunk_size=500, test_ids=None):
+    """
+    Recompute QuestionStats rows from the submitted attempts, of every test or
+    only of the given ones.
+
+    Tests are rebuilt a few at a time, each batch in its own transaction that
+    locks the stats rows of its questions before reading the attempts and
+    flags the attempts it counted, so submissions made while the job runs are
+    neither lost nor counted twice.
+    Meant for the nightly task; returns the number of stats rows written.
+    """
+    if test_ids is None:
+        test_ids = Question.objects.values_list("test_id", flat=True)
+    test_ids = sorted(set(test_ids))
+
+    written = 0
+    for index in range(0, len(test_ids), RECONCILE_TESTS_PER_BATCH):
+        written += _reconcile_tests(
+            test_ids[index : index + RECONCILE_TESTS_PER_BATCH], chunk_size
+        )
+    return written
@@ -0,0 +1,239 @@
+import logging
+
+from django.db.models import Count, Q
+
+from apps.course.models import (
+    LessonPart,
+    Question,
+    UserAnswer,
+    UserLessonPart,
+    UserTest,
+)
+from apps.course.services.answer_keys import compile_answer_key, grade_answer
+from apps.course.services.answer_sheets import (
+    get_user_answers,
+    set_sheet_answers,
+    uses_answer_sheet,
+)
+from apps.course.services.grading import get_partial_awards
+from apps.course.services.question_stats import reconcile_question_stats
+from apps.course.services.test_results import store_result_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def _regrade_answers(test_id, question_ids, chunk_size):
+    """
+    Grade the submitted answers to the given questions of a test against its
+    current answer key. Returns (answers_updated, affected user test ids).
+    """
+    answer_key = compile_answer_key(test_id)
+    # Answer rows copied from an answer sheet are regraded with the sheet
+    user_answers = UserAnswer.objects.filter(
+        question_id__in=question_ids,
+        user_test__is_submitted=True,
+        user_test__answer_sheet__isnull=True,
+    ).order_by("pk")
+
+    answers_updated = 0
+    user_test_ids = set()
+    last_pk = 0
+    while True:
+        chunk = list(user_answers.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+
+        changed_answers = []
+        for user_answer in chunk:
+            is_correct = grade_answer(answer_key, user_answer)
+            if is_correct != user_answer.is_correct:
+                user_answer.is_correct = is_correct
+                changed_answers.append(user_answer)
+                user_test_ids.add(user_answer.user_test_id)
+        UserAnswer.objects.bulk_update(changed_answers, ["is_correct"])
+        answers_updated += len(changed_answers)
+
+    updated, sheet_user_test_ids = _regrade_answer_sheets(
+        answer_key, test_id, question_ids, chunk_size
+    )
+    return answers_updated + updated, user_test_ids | sheet_user_test_ids
+
+
+def _regrade_answer_sheets(answer_key, test_id, question_ids, chunk_size):
+    """Same as _regrade_answers for attempts kept in answer sheets"""
+    user_tests = (
+        UserTest.objects.filter(
+            test_id=test_id, is_submitted=True, answer_sheet__isnull=False
+        )
+        .only("id", "answer_sheet")
+        .order_by("pk")
+    )
+
+    answers_updated = 0
+    user_test_ids = set()
+    last_pk = 0
+    while True:
+        chunk = list(user_tests.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+
+        changed_user_tests = []
+        for user_test in chunk:
+            changed_answers = []
+            for user_answer in get_user_answers(user_test, question_ids):
+                is_correct = grade_answer(answer_key, user_answer)
+                if is_correct != user_answer.is_correct:
+                    user_answer.is_correct = is_correct
+                    changed_answers.append(user_answer)
+            if changed_answers:
+                set_sheet_answers(user_test, changed_answers, ["is_correct"])
+                changed_user_tests.append(user_test)
+                answers_updated += len(changed_answers)
+        UserTest.objects.bulk_update(changed_user_tests, ["answer_sheet"])
+        user_test_ids.update(user_test.id for user_test in changed_user_tests)
+    return answers_updated, user_test_ids
+
+
+def _rescore_user_tests(user_test_ids, chunk_size):
+    """
+    Recount the correct answers of attempts and update the changed ones.
+    Returns one change record per updated attempt.
+    """
+    user_test_ids = sorted(user_test_ids)
+    changes = []
+    for index in range(0, len(user_test_ids), chunk_size):
+        user_tests = list(
+            UserTest.objects.filter(id__in=user_test_ids[index : index + chunk_size])
+            .select_related("test")
+            .annotate(
+                answers_count=Count("user_answers"),
+                correct_count=Count(
+                    "user_answers", filter=Q(user_answers__is_correct=True)
+                ),
+            )
+        )
+
+        changed_user_tests = []
+        for user_test in user_tests:
+            old_score = (user_test.correct_answers, user_test.is_passed)
+            old_total_questions = user_test.total_questions
+            if uses_answer_sheet(user_test):
+                user_answers = get_user_answers(user_test)
+                user_test.correct_count = sum(
+                    user_answer.is_correct for user_answer in user_answers
+                )
+                user_test.answers_count = len(user_answers)
+            user_test.correct_answers = user_test.correct_count
+            user_test.total_questions = user_test.answers_count
+            user_test.calculate_score()
+            if (user_test.correct_answers, user_test.is_passed) == old_score:
+                continue
+            changed_user_tests.append(user_test)
+            changes.append(
+                {
+                    "user_test_id": user_test.id,
+                    "user_id": user_test.user_id,
+                    "test_id": user_test.test_id,
+                    "correct_answers": [old_score[0], user_test.correct_answers],
+                    "is_passed": [old_score[1], user_test.is_passed],
+                    "attempt_number": user_test.attempt_number,
+                    "total_questions": [
+                        old_total_questions,
+                        user_test.total_questions,
+                    ],
+                }
+            )
+
+        UserTest.objects.bulk_update(
+            changed_user_tests, ["correct_answers", "total_questions", "is_passed"]
+        )
+        for user_test in changed_user_tests:
+            store_result_snapshot(user_test)
+    _add_award_changes(changes)
+    return changes
+
+
+def _add_award_changes(changes):
+    """
+    Add to the change records of first attempts that paid partial awards for
+    their lesson part the awards their new score would have paid. Awards
+    already paid are left for an admin to adjust.
+    """
+    first_attempts = [change for change in changes if change["attempt_number"] == 1]
+    lesson_parts = {}
+    for lesson_part in LessonPart.objects.filter(
+        test_id__in={change["test_id"] for change in first_attempts}, is_active=True
+    ):
+        # Same lesson part as complete_test_lesson_part picks
+        lesson_parts.setdefault(lesson_part.test_id, lesson_part)
+    awarded = set(
+        UserLessonPart.objects.filter(
+            lesson_part__in=lesson_parts.values(),
+            user_lesson__user_course__user_id__in={
+                change["user_id"] for change in first_attempts
+            },
+            awards_given=True,
+        ).values_list("lesson_part_id", "user_lesson__user_course__user_id")
+    )
+
+    for change in first_attempts:
+        lesson_part = lesson_parts.get(change["test_id"])
+        if not lesson_part or (lesson_part.id, change["user_id"]) not in awarded:
+            continue
+        old_awards, new_awards = (
+            get_partial_awards(lesson_part, correct_answers, total_questions)
+            for correct_answers, total_questions in zip(
+                change["correct_answers"], change["total_questions"]
+            )
+        )
+        if old_awards != new_awards:
+            change["lesson_part_awards"] = {
+                "lesson_part_id": lesson_part.id,
+                "coins": [old_awards[0], new_awards[0]],
+                "points": [old_awards[1], new_awards[1]],
+            }
+
+
+def regrade_questions(question_ids, chunk_size=500):
+    """
+    Regrade the submitted answers to questions after answer key corrections and
+    rescore only the attempts whose answers changed.
+
+    Returns a report: {"answers_updated": int, "user_tests": [change records]}
+    where every record holds the old and new correct_answers and is_passed,
+    and for first attempts whose lesson part awards depend on the score, the
+    old and new awards under lesson_part_awards. The question stats of the
+    regraded tests are rebuilt.
+    """
+    questions_by_test = {}
+    for question_id, test_id in Question.objects.filter(
+        id__in=question_ids
+    ).values_list("id", "test_id"):
+        questions_by_test.setdefault(test_id, []).append(question_id)
+
+    answers_updated = 0
+    user_test_ids = set()
+    regraded_test_ids = []
+    for test_id, test_question_ids in questions_by_test.items():
+        updated, affected_ids = _regrade_answers(test_id, test_question_ids, chunk_size)
+        answers_updated += updated
+        user_test_ids |= affected_ids
+        if updated:
+            regraded_test_ids.append(test_id)
+
+    changes = _rescore_user_tests(user_test_ids, chunk_size)
+    # Correct counts of the question stats follow the regraded answers
+    reconcile_question_stats(chunk_size, test_ids=regraded_test_ids)
+    for change in changes:
+        logger.info(f"Regraded UserTest {change['user_test_id']}: {change}")
+    return {"answers_updated": answers_updated, "user_tests": changes}
+
+
+def regrade_test(test_id, chunk_size=500):
+    """Regrade the submitted attempts of a test against its current answer key"""
+    question_ids = list(
+        Question.objects.filter(test_id=test_id).values_list("id", flat=True)
+    )
+    return regrade_questions(question_ids, chunk_size)
@@ -0,0 +1,15 @@
+from apps.course.services.versioning import bump_version, get_version
+
+
+def get_test_content_version_key(test_id):
+    return f"test_content_version:{test_id}"
+
+
+def get_test_content_version(test_id):
+    """Version of a test's questions, answers and settings"""
+    return get_version(get_test_content_version_key(test_id))
+
+
+def bump_test_content_version(test_id):
+    """Invalidate every cache derived from a test's content"""
+    bump_version(get_test_content_version_key(test_id))
@@ -0,0 +1,63 @@
+import logging
+from datetime import timedelta
+
+from django.utils import timezone
+
+from apps.course.models import UserTest
+from apps.course.services.answer_keys import get_answer_key
+from apps.course.services.grading import finish_user_test
+
+logger = logging.getLogger(__name__)
+
+
+def get_expires_at(test, start_date=None):
+    """Return when an attempt of a test started at start_date runs out of time"""
+    if not test.test_duration:
+        return None
+    return (start_date or timezone.now()) + timedelta(minutes=test.test_duration)
+
+
+def get_expired_user_tests(now=None):
+    # Served by the partial usertest_expiry_idx index
+    return UserTest.objects.filter(
+        is_in_progress=True, expires_at__lte=now or timezone.now()
+    )
+
+
+def submit_expired_user_tests(chunk_size=100):
+    """
+    Grade and submit overdue attempts chunk by chunk, with the same code as
+    FinishTest. Each attempt is finished in its own transaction, so one failure
+    doesn't roll back the rest. Returns the number of submitted attempts.
+    """
+    now = timezone.now()
+    answer_keys = {}
+    failed_ids = set()
+    submitted_count = 0
+
+    while True:
+        user_tests = list(
+            get_expired_user_tests(now)
+            .exclude(id__in=failed_ids)
+            .select_related("test")
+            .order_by("expires_at")[:chunk_size]
+        )
+        if not user_tests:
+            break
+
+        for user_test in user_tests:
+            if user_test.test_id not in answer_keys:
+                answer_keys[user_test.test_id] = get_answer_key(user_test.test_id)
+            try:
+                submitted = finish_user_test(user_test, answer_keys[user_test.test_id])
+            except Exception:
+                logger.exception(f"Failed to submit expired UserTest {user_test.id}")
+                failed_ids.add(user_test.id)
+                continue
+            if submitted:
+                submitted_count += 1
+            else:
+                # Submitted concurrently but not yet out of the working set
+                failed_ids.add(user_test.id)
+
+    return submitted_count
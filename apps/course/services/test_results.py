@@ -0,0 +1,94 @@
+import copy
+
+from django.db.models import Prefetch
+
+from apps.course.models import (
+    AnswerChoice,
+    LessonPart,
+    MatchingPair,
+    Question,
+    UserTest,
+)
+from apps.course.services.answer_sheets import get_user_answers
+from apps.course.services.catalog import absolute_url
+
+
+def get_result_serializer_context(user_test):
+    """
+    Load everything the results serializer needs in a fixed number of queries.
+    Only the questions the attempt was given are included.
+    """
+    user_answers = {
+        user_answer.question_id: user_answer
+        for user_answer in get_user_answers(user_test)
+    }
+    questions = (
+        Question.objects.filter(
+            test_id=user_test.test_id, id__in=user_answers, is_active=True
+        )
+        .prefetch_related(
+            Prefetch("choices", queryset=AnswerChoice.objects.order_by("order")),
+            Prefetch("matching_pairs", queryset=MatchingPair.objects.order_by("order")),
+        )
+        .order_by("order")
+    )
+    lesson_part = (
+        LessonPart.objects.filter(test_id=user_test.test_id, is_active=True)
+        .only("award_coin", "award_point")
+        .first()
+    )
+    return {
+        "questions": list(questions),
+        "user_answers": user_answers,
+        "lesson_part": lesson_part,
+    }
+
+
+def build_result_snapshot(user_test):
+    """
+    Serialize the results of an attempt as plain JSON data. File urls are kept
+    relative, see absolutize_result_urls.
+    """
+    from apps.course.api_endpoints.course.UserTestResults.serializers import (
+        UserTestResultsSerializer,
+    )
+
+    return UserTestResultsSerializer(
+        user_test, context=get_result_serializer_context(user_test)
+    ).data
+
+
+def absolutize_result_urls(data, request):
+    """Return result data with the image urls made absolute for a request"""
+    data = copy.deepcopy(data)
+    for question in data.get("questions", []):
+        if question.get("question_image"):
+            question["question_image"] = absolute_url(
+                request, question["question_image"]
+            )
+        for choice in question.get("choices") or []:
+            if choice.get("choice_image"):
+                choice["choice_image"] = absolute_url(request, choice["choice_image"])
+    return data
+
+
+def store_result_snapshot(user_test):
+    """Build and save the result snapshot of a submitted attempt"""
+    user_test.result_snapshot = build_result_snapshot(user_test)
+    UserTest.objects.filter(pk=user_test.pk).update(
+        result_snapshot=user_test.result_snapshot
+    )
+    return user_test.result_snapshot
+
+
+def rebuild_result_snapshots(missing_only=True, chunk_size=500):
+    """Build snapshots of historical submitted attempts, returns the count"""
+    user_tests = UserTest.objects.filter(is_submitted=True).select_related("test")
+    if missing_only:
+        user_tests = user_tests.filter(result_snapshot__isnull=True)
+
+    rebuilt = 0
+    for user_test in user_tests.iterator(chunk_size=chunk_size):
+        store_result_snapshot(user_test)
+        rebuilt += 1
+    return rebuilt
@@ -0,0 +1,21 @@
+import time
+
+from django.core.cache import cache
+
+
+def get_version(version_key):
+    """Return the current content version stored under a key, initializing it if missing"""
+    version = cache.get(version_key)
+    if version is None:
+        # Seed with a timestamp so a lost version key never resurrects old entries
+        cache.add(version_key, int(time.time()), timeout=None)
+        version = cache.get(version_key)
+    return version
+
+
+def bump_version(version_key):
+    """Move to a new content version, orphaning every entry keyed by the old one"""
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, int(time.time()), timeout=None)
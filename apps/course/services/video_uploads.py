@@ -0,0 +1,140 @@
+"""
+Resumable chunked uploads of lesson part videos.
+
+A client creates an upload with the size and, optionally, the SHA-256 of the
+file, then sends the file in any number of PATCH requests carrying
+"Content-Range: bytes <first>-<last>/<size>". Chunks are streamed to a part
+file on disk, never held in memory, and an interrupted upload resumes from the
+stored offset. Once the last byte has arrived the upload is verifying: a Celery
+task checks the checksum and moves the part file into LessonPart.video, which
+triggers the HLS conversion, unless an identical video is already stored.
+"""
+
+import hashlib
+import re
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.http import UnreadablePostError
+from django.utils import timezone
+
+from apps.course.choices import VideoUploadStatus
+from apps.course.models import LessonPart, VideoUpload
+from apps.course.services.media_hashes import find_duplicate_file
+
+UPLOADS_DIR = "video_uploads"
+BLOCK_SIZE = 1024 * 1024
+CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class PartFile(File):
+    """
+    An assembled part file. File system storages move it into place instead
+    of copying it, like a temporary uploaded file.
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def get_part_path(upload):
+    return Path(settings.MEDIA_ROOT) / UPLOADS_DIR / f"{upload.id}.part"
+
+
+def parse_content_range(header):
+    """Return (first byte, last byte, total size) of a Content-Range or None"""
+    match = CONTENT_RANGE_RE.match(header or "")
+    if not match:
+        return None
+    first, last, total = map(int, match.groups())
+    if first > last or last >= total:
+        return None
+    return first, last, total
+
+
+def append_chunk(upload, stream, length):
+    """
+    Stream length bytes from stream to the part file at the upload's offset.
+
+    Bytes past the offset, left by an interrupted request, are overwritten.
+    If the client disconnects, the bytes received so far are kept so the
+    upload can resume from there. Returns the number of bytes written.
+    """
+    path = get_part_path(upload)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch(exist_ok=True)
+
+    written = 0
+    with open(path, "r+b") as part_file:
+        part_file.truncate(upload.offset)
+        part_file.seek(upload.offset)
+        while written < length:
+            try:
+                block = stream.read(min(BLOCK_SIZE, length - written))
+            except (OSError, UnreadablePostError):
+                break
+            if not block:
+                break
+            part_file.write(block)
+            written += len(block)
+
+    upload.offset += written
+    return written
+
+
+def get_file_checksum(path):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as part_file:
+        while block := part_file.read(BLOCK_SIZE):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def complete_upload(upload):
+    """
+    Verify the checksum of a fully received upload and attach the file to its
+    lesson part. Returns False, and marks the upload failed, on a mismatch.
+    """
+    path = get_part_path(upload)
+    content_hash = get_file_checksum(path)
+    if upload.checksum and content_hash != upload.checksum.lower():
+        path.unlink(missing_ok=True)
+        upload.status = VideoUploadStatus.FAILED
+        upload.save(update_fields=["status", "updated_at"])
+        return False
+
+    lesson_part = upload.lesson_part
+    lesson_part.content_hash = content_hash
+    duplicate_name = find_duplicate_file(LessonPart, "video", content_hash)
+    if duplicate_name:
+        # The same video is already stored, and possibly encoded
+        lesson_part.video = duplicate_name
+    else:
+        with open(path, "rb") as part_file:
+            lesson_part.video.save(upload.filename, PartFile(part_file), save=False)
+    # The video change triggers the HLS conversion
+    lesson_part.save(update_fields=["video", "content_hash"])
+    path.unlink(missing_ok=True)
+
+    upload.status = VideoUploadStatus.COMPLETED
+    upload.save(update_fields=["status", "updated_at"])
+    return True
+
+
+def remove_stale_uploads(days=7):
+    """
+    Delete uploads that were not completed within days, with their part
+    files. Returns the number of uploads removed.
+    """
+    stale_uploads = VideoUpload.objects.filter(
+        updated_at__lt=timezone.now() - timedelta(days=days)
+    ).exclude(status=VideoUploadStatus.COMPLETED)
+
+    removed = 0
+    for upload in stale_uploads.iterator():
+        get_part_path(upload).unlink(missing_ok=True)
+        upload.delete()
+        removed += 1
+    return removed
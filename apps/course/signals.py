@@ -1,7 +1,36 @@
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from .models import LessonPart
+from .models import (
+    AnswerChoice,
+    Course,
+    File,
+    Gallery,
+    Lesson,
+    LessonPart,
+    MatchingPair,
+    Question,
+    Roadmap,
+    Subject,
+    Test,
+)
+from .services.catalog import bump_catalog_version
+from .services.counters import refresh_course_lessons_count, refresh_lesson_parts_count
+from .services.media_hashes import deduplicate_file_field
+from .services.test_content import bump_test_content_version
+
+
+@receiver(pre_save, sender=Gallery)
+@receiver(pre_save, sender=File)
+@receiver(pre_save, sender=LessonPart)
+def deduplicate_uploaded_file(sender, instance, **kwargs):
+    """
+    Store identical uploads once. Connected before check_video_change, so a
+    lesson part video replaced by an identical one is not converted again.
+    """
+    field_name = {Gallery: "image", File: "file", LessonPart: "video"}[sender]
+    deduplicate_file_field(instance, field_name)
 
 
 @receiver(post_save, sender=LessonPart)
@@ -25,14 +54,112 @@ def check_video_change(sender, instance, **kwargs):
     """
     Pre-save signal to check if video field has changed.
     Sets a flag on the instance to be used in post_save signal.
+    Also remembers the previous lesson so its parts counter can be refreshed.
     """
+    instance._previous_lesson_id = None
     if instance.pk:
         try:
             old_instance = LessonPart.objects.get(pk=instance.pk)
             # Set a flag if video has changed
             instance._video_changed = old_instance.video != instance.video
+            instance._previous_lesson_id = old_instance.lesson_id
         except LessonPart.DoesNotExist:
             instance._video_changed = False
     else:
         # New instance
         instance._video_changed = bool(instance.video)
+
+
+# Saves that only touch HLS bookkeeping do not change catalog content
+CATALOG_IGNORED_UPDATE_FIELDS = {"hls_processing_status", "hls_video_url"}
+
+
+@receiver(post_save, sender=Subject)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Lesson)
+@receiver(post_save, sender=LessonPart)
+@receiver(post_save, sender=Roadmap)
+@receiver(post_delete, sender=Subject)
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Lesson)
+@receiver(post_delete, sender=LessonPart)
+@receiver(post_delete, sender=Roadmap)
+def invalidate_catalog_cache(sender, instance, **kwargs):
+    """
+    Bump the catalog content version when subjects, courses, lessons,
+    lesson parts or roadmaps change, so cached trees are rebuilt.
+    """
+    update_fields = kwargs.get("update_fields")
+    if update_fields and set(update_fields) <= CATALOG_IGNORED_UPDATE_FIELDS:
+        return
+
+    transaction.on_commit(bump_catalog_version)
+
+
+def _touches_counter(update_fields, fields):
+    """Return False for partial saves that cannot change a counter"""
+    return not update_fields or bool(set(update_fields) & fields)
+
+
+@receiver(pre_save, sender=Lesson)
+def remember_lesson_course(sender, instance, update_fields=None, **kwargs):
+    """Remember the previous course so both courses' counters stay correct"""
+    instance._previous_course_id = None
+    if instance.pk and _touches_counter(update_fields, {"course"}):
+        instance._previous_course_id = (
+            Lesson.objects.filter(pk=instance.pk)
+            .values_list("course_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def update_course_lessons_count(sender, instance, **kwargs):
+    """Keep Course.lessons_count equal to the number of active lessons"""
+    if not _touches_counter(kwargs.get("update_fields"), {"is_active", "course"}):
+        return
+
+    refresh_course_lessons_count(
+        {instance.course_id, getattr(instance, "_previous_course_id", None)}
+    )
+
+
+@receiver(post_save, sender=LessonPart)
+@receiver(post_delete, sender=LessonPart)
+def update_lesson_parts_count(sender, instance, **kwargs):
+    """Keep Lesson.parts_count equal to the number of active lesson parts"""
+    if not _touches_counter(kwargs.get("update_fields"), {"is_active", "lesson"}):
+        return
+
+    refresh_lesson_parts_count(
+        {instance.lesson_id, getattr(instance, "_previous_lesson_id", None)}
+    )
+
+
+@receiver(post_save, sender=Test)
+@receiver(post_save, sender=Question)
+@receiver(post_save, sender=AnswerChoice)
+@receiver(post_save, sender=MatchingPair)
+@receiver(post_delete, sender=Test)
+@receiver(post_delete, sender=Question)
+@receiver(post_delete, sender=AnswerChoice)
+@receiver(post_delete, sender=MatchingPair)
+def invalidate_test_content(sender, instance, **kwargs):
+    """
+    Bump the content version of a test when it or its questions or answers
+    change, so answer keys and question pools are rebuilt
+    """
+    if sender is Test:
+        test_id = instance.pk
+    elif sender is Question:
+        test_id = instance.test_id
+    else:
+        test_id = (
+            Question.objects.filter(pk=instance.question_id)
+            .values_list("test_id", flat=True)
+            .first()
+        )
+
+    if test_id:
+        transaction.on_commit(lambda: bump_test_content_version(test_id))
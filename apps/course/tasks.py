@@ -1,13 +1,15 @@
 import logging
+import shutil
 import subprocess
-from pathlib import Path
 
-from celery import shared_task
+from celery import chord, group, shared_task
+from celery.exceptions import Retry
 from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 
-from .models import LessonPart, UserCourse
+from .choices import VideoUploadStatus
+from .models import LessonPart, UserCourse, VideoUpload
 
 logger = logging.getLogger(__name__)
 
@@ -32,17 +34,119 @@ def check_expired_courses():
         return f"Updated {updated_count} expired courses"
 
 
+@shared_task
+def flush_expired_answer_drafts():
+    """
+    Write answer drafts of attempts whose test duration has passed to the
+    database, so buffered answers survive even if the test is never finished
+    """
+    from .services.answer_drafts import drafts_enabled, flush_answer_drafts
+    from .services.test_expiry import get_expired_user_tests
+
+    if not drafts_enabled():
+        return "Answer drafts are disabled"
+
+    flushed_count = 0
+    for user_test in get_expired_user_tests().iterator():
+        with transaction.atomic():
+            flushed_count += flush_answer_drafts(user_test)
+
+    return f"Flushed {flushed_count} buffered answers"
+
+
+@shared_task
+def submit_expired_tests():
+    """
+    Grade and submit in-progress attempts whose test duration has passed,
+    so abandoned attempts don't stay in progress forever
+    """
+    from .services.test_expiry import submit_expired_user_tests
+
+    submitted_count = submit_expired_user_tests()
+    return f"Submitted {submitted_count} expired tests"
+
+
+@shared_task
+def reconcile_question_stats():
+    """
+    Nightly job that recomputes question statistics from submitted attempts,
+    correcting any drift of the incremental updates
+    """
+    from .services import question_stats
+
+    written = question_stats.reconcile_question_stats()
+    return f"Reconciled stats of {written} questions"
+
+
+@shared_task
+def regrade_questions(question_ids):
+    """
+    Regrade submitted answers to questions whose answer key was corrected and
+    rescore the affected attempts
+    """
+    from .services import regrading
+
+    report = regrading.regrade_questions(question_ids)
+    award_changes = sum(
+        "lesson_part_awards" in change for change in report["user_tests"]
+    )
+    logger.info(
+        f"Regraded {report['answers_updated']} answers, "
+        f"{len(report['user_tests'])} user tests changed, "
+        f"{award_changes} would have earned different lesson part awards"
+    )
+    return report
+
+
+@shared_task
+def remove_stale_video_uploads():
+    """Delete chunked video uploads abandoned before they were completed"""
+    from .services.video_uploads import remove_stale_uploads
+
+    removed = remove_stale_uploads()
+    return f"Removed {removed} stale video uploads"
+
+
+@shared_task
+def complete_video_upload(upload_id):
+    """
+    Verify the checksum of a fully received chunked upload and attach the file
+    to its lesson part
+    """
+    from .services.video_uploads import complete_upload
+
+    upload = VideoUpload.objects.filter(
+        id=upload_id, status=VideoUploadStatus.VERIFYING
+    ).first()
+    if not upload:
+        return f"VideoUpload {upload_id} is not waiting for verification"
+
+    if not complete_upload(upload):
+        logger.error(f"VideoUpload {upload_id} does not match its checksum")
+        return f"Failed: VideoUpload {upload_id} does not match its checksum"
+    return f"Success: VideoUpload {upload_id} completed"
+
+
 @shared_task(bind=True, max_retries=3)
-def convert_video_to_hls(self, lesson_part_id):
+def convert_video_to_hls(self, lesson_part_id, backfill=False):
     """
-    Convert uploaded video to HLS format
+    Convert uploaded video to an adaptive bitrate HLS ladder
 
     Args:
         lesson_part_id: ID of the LessonPart to process
+        backfill: Re-encode a video that already plays. Its current output
+            keeps being served until the new one is ready, and a failure
+            leaves it untouched.
 
     Returns:
         str: Success message with HLS URL
     """
+    from .services import hls
+    from .services.hls_progress import ProgressReporter, clear_hls_progress
+
+    # Chunk tasks report progress and clean up once the video is split
+    chunked = False
+    locked_output = None
     try:
         lesson_part = LessonPart.objects.get(id=lesson_part_id)
 
@@ -52,82 +156,84 @@ def convert_video_to_hls(self, lesson_part_id):
             lesson_part.save(update_fields=["hls_processing_status"])
             return f"Failed: No video file for LessonPart {lesson_part_id}"
 
+        # Lesson parts sharing the video wait for the one encoding it
+        output_name = hls.get_output_name(lesson_part)
+        if not hls.lock_output(output_name):
+            raise self.retry(countdown=60, max_retries=None)
+        locked_output = output_name
+
+        # An identical video of another lesson part was already encoded
+        if lesson_part.content_hash and hls.has_ladder(output_name):
+            lesson_part.hls_video_url = hls.get_master_playlist_url(output_name)
+            lesson_part.hls_processing_status = "completed"
+            lesson_part.save(update_fields=["hls_video_url", "hls_processing_status"])
+            logger.info(
+                f"Reusing HLS output {output_name} for LessonPart {lesson_part_id}"
+            )
+            return f"Success: Reused HLS output for LessonPart {lesson_part_id}"
+
         # Update status to processing
-        lesson_part.hls_processing_status = "processing"
-        lesson_part.save(update_fields=["hls_processing_status"])
+        if not backfill:
+            lesson_part.hls_processing_status = "processing"
+            lesson_part.save(update_fields=["hls_processing_status"])
 
         # Get the video file path
         video_path = lesson_part.video.path
 
-        # Create HLS output directory
-        video_filename = Path(video_path).stem
-        hls_dir = (
-            Path(settings.MEDIA_ROOT) / "hls_videos" / f"lesson_part_{lesson_part_id}"
+        # Encode into a fresh directory, it replaces the served one when done
+        output_dir = hls.get_staging_dir(lesson_part_id)
+        shutil.rmtree(output_dir, ignore_errors=True)
+        output_dir.mkdir(parents=True)
+
+        source = hls.probe_video(video_path)
+        renditions = hls.select_renditions(
+            settings.HLS_RENDITIONS, source["height"], source["has_audio"]
+        )
+
+        chunk_seconds = settings.HLS_CHUNK_SECONDS
+        if chunk_seconds and source["duration"] > 2 * chunk_seconds:
+            # Long videos are encoded chunk by chunk across the workers
+            _start_chunked_hls_conversion(
+                lesson_part_id,
+                output_name,
+                video_path,
+                renditions,
+                source["has_audio"],
+                backfill,
+            )
+            chunked = True
+            return f"Queued chunked HLS conversion for LessonPart {lesson_part_id}"
+
+        ffmpeg_cmd = hls.build_ladder_command(
+            video_path, output_dir, renditions, has_audio=source["has_audio"]
         )
-        hls_dir.mkdir(parents=True, exist_ok=True)
-
-        # Output file paths
-        playlist_path = hls_dir / "playlist.m3u8"
-        segment_pattern = str(hls_dir / "segment_%03d.ts")
-
-        # FFmpeg command to convert video to HLS
-        # Using adaptive bitrate with multiple quality levels
-        ffmpeg_cmd = [
-            "ffmpeg",
-            "-i",
-            video_path,
-            "-c:v",
-            "libx264",  # Video codec
-            "-c:a",
-            "aac",  # Audio codec
-            "-strict",
-            "-2",
-            "-hls_time",
-            "10",  # Segment duration in seconds
-            "-hls_list_size",
-            "0",  # Include all segments in playlist
-            "-hls_segment_filename",
-            segment_pattern,
-            "-f",
-            "hls",
-            str(playlist_path),
-        ]
 
         logger.info(f"Starting HLS conversion for LessonPart {lesson_part_id}")
         logger.info(f"FFmpeg command: {' '.join(ffmpeg_cmd)}")
 
-        # Run FFmpeg
-        result = subprocess.run(
+        # Run FFmpeg, reporting its progress against the source duration
+        progress = ProgressReporter(lesson_part_id, source["duration"])
+        progress.update(0, force=True)
+        returncode, error_msg = hls.run_ffmpeg(
             ffmpeg_cmd,
-            capture_output=True,
+            on_progress=progress.update,
             timeout=3600,  # 1 hour timeout
         )
 
-        if result.returncode != 0:
-            error_msg = result.stderr.decode("utf-8")
+        if returncode != 0:
             logger.error(f"FFmpeg error for LessonPart {lesson_part_id}: {error_msg}")
-            lesson_part.hls_processing_status = "failed"
-            lesson_part.save(update_fields=["hls_processing_status"])
-            return f"Failed: FFmpeg error - {error_msg[:200]}"
-
-        # Generate the HLS URL (relative to MEDIA_URL)
-        relative_playlist_path = (
-            f"hls_videos/lesson_part_{lesson_part_id}/playlist.m3u8"
-        )
-        hls_url = f"{settings.MEDIA_URL}{relative_playlist_path}"
-
-        # Update lesson part with HLS URL
-        lesson_part.hls_video_url = hls_url
-        lesson_part.hls_processing_status = "completed"
-        lesson_part.save(update_fields=["hls_video_url", "hls_processing_status"])
-
-        logger.info(
-            f"Successfully converted video to HLS for LessonPart {lesson_part_id}"
-        )
-        logger.info(f"HLS URL: {hls_url}")
+            shutil.rmtree(output_dir, ignore_errors=True)
+            if not backfill:
+                lesson_part.hls_processing_status = "failed"
+                lesson_part.save(update_fields=["hls_processing_status"])
+            return f"Failed: FFmpeg error - {error_msg[-200:]}"
 
+        _publish_hls_ladder(lesson_part, output_name, output_dir)
         return f"Success: HLS conversion completed for LessonPart {lesson_part_id}"
 
+    except Retry:
+        raise
+
     except LessonPart.DoesNotExist:
         logger.error(f"LessonPart {lesson_part_id} does not exist")
         return f"Failed: LessonPart {lesson_part_id} not found"
@@ -135,9 +241,10 @@ def convert_video_to_hls(self, lesson_part_id):
     except subprocess.TimeoutExpired:
         logger.error(f"FFmpeg timeout for LessonPart {lesson_part_id}")
         try:
-            lesson_part = LessonPart.objects.get(id=lesson_part_id)
-            lesson_part.hls_processing_status = "failed"
-            lesson_part.save(update_fields=["hls_processing_status"])
+            if not backfill:
+                lesson_part = LessonPart.objects.get(id=lesson_part_id)
+                lesson_part.hls_processing_status = "failed"
+                lesson_part.save(update_fields=["hls_processing_status"])
         except Exception:
             pass
         # Retry the task
@@ -148,9 +255,10 @@ def convert_video_to_hls(self, lesson_part_id):
             f"Unexpected error converting video for LessonPart {lesson_part_id}"
         )
         try:
-            lesson_part = LessonPart.objects.get(id=lesson_part_id)
-            lesson_part.hls_processing_status = "failed"
-            lesson_part.save(update_fields=["hls_processing_status"])
+            if not backfill:
+                lesson_part = LessonPart.objects.get(id=lesson_part_id)
+                lesson_part.hls_processing_status = "failed"
+                lesson_part.save(update_fields=["hls_processing_status"])
         except Exception:
             pass
 
@@ -159,3 +267,144 @@ def convert_video_to_hls(self, lesson_part_id):
             raise self.retry(exc=e, countdown=60 * (self.request.retries + 1))
 
         return f"Failed: {str(e)}"
+
+    finally:
+        if not chunked:
+            clear_hls_progress(lesson_part_id)
+            if locked_output:
+                hls.unlock_output(locked_output)
+
+
+def _publish_hls_ladder(lesson_part, output_name, output_dir):
+    """Serve a finished ladder from the lesson part"""
+    from .services import hls
+
+    hls.replace_ladder_dir(output_name, output_dir)
+    hls_url = hls.get_master_playlist_url(output_name)
+
+    # Update lesson part with HLS URL
+    lesson_part.hls_video_url = hls_url
+    lesson_part.hls_processing_status = "completed"
+    lesson_part.save(update_fields=["hls_video_url", "hls_processing_status"])
+
+    logger.info(f"Successfully converted video to HLS for LessonPart {lesson_part.id}")
+    logger.info(f"HLS URL: {hls_url}")
+
+
+def _start_chunked_hls_conversion(
+    lesson_part_id, output_name, video_path, renditions, has_audio, backfill
+):
+    """
+    Split a video at keyframes and encode the chunks as a Celery group, the
+    chord callback stitches their playlists together
+    """
+    from .services import hls
+    from .services.hls_progress import start_chunked_hls_progress
+
+    chunks_dir = hls.get_chunks_dir(lesson_part_id)
+    shutil.rmtree(chunks_dir, ignore_errors=True)
+    chunks_dir.mkdir(parents=True)
+    chunks = hls.split_video(video_path, chunks_dir, settings.HLS_CHUNK_SECONDS)
+    logger.info(f"Split LessonPart {lesson_part_id} video into {len(chunks)} chunks")
+
+    start_chunked_hls_progress(lesson_part_id, [duration for _, duration in chunks])
+    output_dir = str(hls.get_staging_dir(lesson_part_id))
+    encodes = group(
+        encode_hls_chunk.s(
+            lesson_part_id,
+            chunk_index,
+            chunk_path,
+            output_dir,
+            renditions,
+            has_audio,
+            duration,
+        )
+        for chunk_index, (chunk_path, duration) in enumerate(chunks)
+    )
+    callback = stitch_hls_chunks.s(lesson_part_id, output_name, len(chunks)).on_error(
+        fail_chunked_hls_conversion.s(lesson_part_id, output_name, backfill)
+    )
+    chord(encodes)(callback)
+
+
+@shared_task(bind=True, max_retries=3)
+def encode_hls_chunk(
+    self,
+    lesson_part_id,
+    chunk_index,
+    chunk_path,
+    output_dir,
+    renditions,
+    has_audio,
+    duration,
+):
+    """
+    Encode one chunk of a split video into the rendition ladder. A failed
+    chunk is retried on its own, the chunks already encoded are kept.
+    """
+    from .services import hls
+    from .services.hls_progress import ProgressReporter
+
+    ffmpeg_cmd = hls.build_ladder_command(
+        chunk_path, output_dir, renditions, has_audio=has_audio, chunk_index=chunk_index
+    )
+    progress = ProgressReporter(lesson_part_id, duration, chunk_index=chunk_index)
+    try:
+        returncode, error_msg = hls.run_ffmpeg(
+            ffmpeg_cmd, on_progress=progress.update, timeout=3600
+        )
+    except subprocess.TimeoutExpired as e:
+        logger.error(f"FFmpeg timeout for LessonPart {lesson_part_id} {chunk_path}")
+        raise self.retry(exc=e, countdown=300)
+
+    if returncode != 0:
+        logger.error(
+            f"FFmpeg error for LessonPart {lesson_part_id} {chunk_path}: {error_msg}"
+        )
+        raise self.retry(
+            exc=RuntimeError(f"FFmpeg error - {error_msg[-200:]}"),
+            countdown=60 * (self.request.retries + 1),
+        )
+
+    progress.update(duration, force=True)
+    return chunk_index
+
+
+@shared_task
+def stitch_hls_chunks(chunk_indexes, lesson_part_id, output_name, chunk_count):
+    """Join the encoded chunks of a video into one ladder and serve it"""
+    from .services import hls
+    from .services.hls_progress import clear_hls_progress
+
+    output_dir = hls.get_staging_dir(lesson_part_id)
+    hls.stitch_chunk_playlists(output_dir, chunk_count)
+    shutil.rmtree(hls.get_chunks_dir(lesson_part_id), ignore_errors=True)
+
+    lesson_part = LessonPart.objects.get(id=lesson_part_id)
+    _publish_hls_ladder(lesson_part, output_name, output_dir)
+    clear_hls_progress(lesson_part_id, chunk_count)
+    hls.unlock_output(output_name)
+
+    return f"Success: HLS conversion completed for LessonPart {lesson_part_id}"
+
+
+@shared_task
+def fail_chunked_hls_conversion(
+    request, exc, traceback, lesson_part_id, output_name, backfill
+):
+    """Clean up after a chunk of a video failed all of its retries"""
+    from .services import hls
+    from .services.hls_progress import clear_hls_progress
+
+    logger.error(
+        f"Chunked HLS conversion failed for LessonPart {lesson_part_id}: {exc}"
+    )
+    shutil.rmtree(hls.get_staging_dir(lesson_part_id), ignore_errors=True)
+    shutil.rmtree(hls.get_chunks_dir(lesson_part_id), ignore_errors=True)
+    clear_hls_progress(lesson_part_id)
+    hls.unlock_output(output_name)
+
+    lesson_part = LessonPart.objects.filter(id=lesson_part_id).first()
+    if lesson_part and not backfill:
+        lesson_part.hls_processing_status = "failed"
+        lesson_part.save(update_fields=["hls_processing_status"])
@@ -24,6 +24,21 @@ urlpatterns = [
         course.LessonPartDetailAPIView.as_view(),
         name="lesson-part-detail",
     ),
+    path(
+        "lessons/parts/<int:id>/hls-progress/",
+        course.LessonPartHlsProgressAPIView.as_view(),
+        name="lesson-part-hls-progress",
+    ),
+    path(
+        "lessons/parts/<int:id>/video-uploads/",
+        course.VideoUploadCreateAPIView.as_view(),
+        name="video-upload-create",
+    ),
+    path(
+        "video-uploads/<int:id>/",
+        course.VideoUploadChunkAPIView.as_view(),
+        name="video-upload-chunk",
+    ),
     path(
         "tests/<int:id>/",
         course.TestDetailAPIView.as_view(),
@@ -39,6 +54,16 @@ urlpatterns = [
         course.TestQuestionsAPIView.as_view(),
         name="test-questions",
     ),
+    path(
+        "tests/<int:test_id>/question-stats/",
+        course.QuestionStatsListAPIView.as_view(),
+        name="question-stats",
+    ),
+    path(
+        "tests/<int:test_id>/answers/",
+        course.SubmitAnswersAPIView.as_view(),
+        name="submit-answers",
+    ),
     path(
         "tests/<int:test_id>/answers/<int:answer_id>/",
         course.SubmitAnswerAPIView.as_view(),
@@ -11,6 +11,7 @@ from apps.payment.models import (
     TransactionStatus,
     UserPromoCode,
 )
+from apps.users.models import BalanceEntry
 
 
 class PaymentCallbackView(APIView):
@@ -90,7 +91,11 @@ class PaymentCallbackView(APIView):
 
             if coin_reservation:
                 # Actually deduct coins from user
-                transaction.user.subtract_coins(transaction.coins_used)
+                transaction.user.subtract_coins(
+                    transaction.coins_used,
+                    reason=BalanceEntry.Reason.PURCHASE,
+                    object_id=transaction.id,
+                )
                 # Mark reservation as used
                 coin_reservation.is_active = False
                 coin_reservation.save()
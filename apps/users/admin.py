@@ -1,8 +1,9 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.hashers import identify_hasher, make_password
 
 from apps.users.forms import GroupMemberInline
 from apps.users.models import (
+    BalanceEntry,
     Group,
     GroupMember,
     GroupMemberGrade,
@@ -44,7 +45,57 @@ class UserAdmin(admin.ModelAdmin):
 
             obj.password = hashed_password
 
-        super().save_model(request, obj, form, change)
+        # Record balance edits in the ledger instead of overwriting the balance
+        coins = obj.coin - form.initial.get("coin", 0)
+        points = obj.point - form.initial.get("point", 0)
+        obj.coin -= coins
+        obj.point -= points
+
+        if change:
+            # The stored balance may have moved since the form was loaded
+            obj.save(
+                update_fields=[
+                    field.name
+                    for field in obj._meta.concrete_fields
+                    if not field.primary_key and field.name not in ("coin", "point")
+                ]
+            )
+        else:
+            super().save_model(request, obj, form, change)
+
+        if (coins or points) and not obj.change_balance(
+            coins=coins, points=points, reason=BalanceEntry.Reason.ADJUSTMENT
+        ):
+            self.message_user(
+                request,
+                "The balance was not changed, it would have gone negative.",
+                messages.ERROR,
+            )
+
+
+@admin.register(BalanceEntry)
+class BalanceEntryAdmin(admin.ModelAdmin):
+    list_display = (
+        "user",
+        "coin_delta",
+        "point_delta",
+        "reason",
+        "object_id",
+        "created_at",
+    )
+    search_fields = ("user__phone", "user__full_name", "user__username")
+    list_filter = ("reason", "created_at")
+    ordering = ("-created_at",)
+
+    # Ledger entries are append-only, manual changes go through the user form
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(UserDevice)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.users.services import reconcile_balances
+
+
+class Command(BaseCommand):
+    help = "Recompute user coin and point balances from the balance ledger"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", type=int, nargs="*", dest="user_ids", help="Only these users"
+        )
+
+    def handle(self, *args, **options):
+        updated = reconcile_balances(options["user_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Reconciled balances of {updated} users"))
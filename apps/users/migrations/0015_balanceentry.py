@@ -0,0 +1,105 @@
+# Generated by Django 5.2.3 on 2026-10-17 10:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def create_opening_balances(apps, schema_editor):
+    """Seed the ledger so existing balances reconcile to themselves"""
+    User = apps.get_model("users", "User")
+    BalanceEntry = apps.get_model("users", "BalanceEntry")
+
+    balances = (
+        User.objects.filter(Q(coin__gt=0) | Q(point__gt=0))
+        .values_list("id", "coin", "point")
+        .iterator(chunk_size=2000)
+    )
+    entries = [
+        BalanceEntry(
+            user_id=user_id,
+            coin_delta=coin,
+            point_delta=point,
+            reason="adjustment",
+        )
+        for user_id, coin, point in balances
+    ]
+    BalanceEntry.objects.bulk_create(entries, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0014_kmteacher_teacher_type"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BalanceEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created at"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated at"),
+                ),
+                (
+                    "coin_delta",
+                    models.IntegerField(default=0, verbose_name="Coin delta"),
+                ),
+                (
+                    "point_delta",
+                    models.IntegerField(default=0, verbose_name="Point delta"),
+                ),
+                (
+                    "reason",
+                    models.CharField(
+                        choices=[
+                            ("lesson_part", "Lesson part"),
+                            ("test", "Test"),
+                            ("purchase", "Purchase"),
+                            ("reservation", "Reservation"),
+                            ("adjustment", "Adjustment"),
+                        ],
+                        max_length=20,
+                        verbose_name="Reason",
+                    ),
+                ),
+                (
+                    "object_id",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="Id of the lesson part, transaction or reservation behind the change",
+                        null=True,
+                        verbose_name="Object id",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance_entries",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="User",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Balance entry",
+                "verbose_name_plural": "Balance entries",
+                "ordering": ("-created_at",),
+            },
+        ),
+        migrations.RunPython(create_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.3 on 2026-10-17 11:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0015_balanceentry"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="balanceentry",
+            name="object_id",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Id of the lesson part or transaction behind the change",
+                null=True,
+                verbose_name="Object id",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="balanceentry",
+            name="reason",
+            field=models.CharField(
+                choices=[
+                    ("lesson_part", "Lesson part"),
+                    ("test", "Test"),
+                    ("purchase", "Purchase"),
+                    ("adjustment", "Adjustment"),
+                ],
+                max_length=20,
+                verbose_name="Reason",
+            ),
+        ),
+    ]
@@ -2,7 +2,8 @@ import random
 import time
 
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.utils.translation import gettext_lazy as _
 from phonenumber_field.modelfields import PhoneNumberField
 from django.core.exceptions import ValidationError
@@ -133,32 +134,60 @@ class User(AbstractUser, BaseModel):
 
         return username
 
-    def add_coins(self, amount):
+    def change_balance(self, coins=0, points=0, reason=None, object_id=None):
+        """
+        Atomically apply coin/point deltas and record them in the balance ledger.
+        Returns False without changing anything if a balance would go negative.
+        """
+        if not coins and not points:
+            return True
+
+        users = User.objects.filter(pk=self.pk)
+        if coins < 0:
+            users = users.filter(coin__gte=-coins)
+        if points < 0:
+            users = users.filter(point__gte=-points)
+
+        with transaction.atomic():
+            if not users.update(coin=F("coin") + coins, point=F("point") + points):
+                return False
+            BalanceEntry.objects.create(
+                user=self,
+                coin_delta=coins,
+                point_delta=points,
+                reason=reason or BalanceEntry.Reason.ADJUSTMENT,
+                object_id=object_id,
+            )
+
+        # Keep the loaded instance roughly in sync, the database row is authoritative
+        self.coin += coins
+        self.point += points
+        return True
+
+    def add_coins(self, amount, reason=None, object_id=None):
         """Add coins to user's balance"""
         if amount > 0:
-            self.coin += amount
-            self.save(update_fields=['coin'])
+            self.change_balance(coins=amount, reason=reason, object_id=object_id)
 
-    def subtract_coins(self, amount):
+    def subtract_coins(self, amount, reason=None, object_id=None):
         """Subtract coins from user's balance"""
-        if amount > 0 and self.coin >= amount:
-            self.coin -= amount
-            self.save(update_fields=['coin'])
-            return True
+        if amount > 0:
+            return self.change_balance(
+                coins=-amount, reason=reason, object_id=object_id
+            )
         return False
 
-    def add_points(self, amount):
+    def add_points(self, amount, reason=None, object_id=None):
         """Add points to user's balance"""
         if amount > 0:
-            self.point += amount
-            self.save(update_fields=['point'])
+            self.change_balance(points=amount, reason=reason, object_id=object_id)
 
-    def subtract_points(self, amount):
+    def subtract_points(self, amount, reason=None, object_id=None):
         """Subtract points from user's balance"""
-        if amount > 0 and self.point >= amount:
-            self.point -= amount
-            self.save(update_fields=['point'])
-            return True
+        if amount > 0:
+            return self.change_balance(
+                points=-amount, reason=reason, object_id=object_id
+            )
         return False
 
     @property
@@ -187,6 +216,42 @@ class User(AbstractUser, BaseModel):
         verbose_name_plural = _("Users")
 
 
+class BalanceEntry(BaseModel):
+    """Append-only ledger of coin and point balance changes"""
+
+    class Reason(models.TextChoices):
+        LESSON_PART = "lesson_part", _("Lesson part")
+        TEST = "test", _("Test")
+        PURCHASE = "purchase", _("Purchase")
+        ADJUSTMENT = "adjustment", _("Adjustment")
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="balance_entries",
+        verbose_name=_("User"),
+    )
+    coin_delta = models.IntegerField(_("Coin delta"), default=0)
+    point_delta = models.IntegerField(_("Point delta"), default=0)
+    reason = models.CharField(_("Reason"), max_length=20, choices=Reason.choices)
+    object_id = models.PositiveIntegerField(
+        _("Object id"),
+        null=True,
+        blank=True,
+        help_text=_(
+            "Id of the lesson part or transaction behind the change"
+        ),
+    )
+
+    def __str__(self):
+        return f"{self.user}: {self.coin_delta:+} coins, {self.point_delta:+} points ({self.reason})"
+
+    class Meta:
+        verbose_name = _("Balance entry")
+        verbose_name_plural = _("Balance entries")
+        ordering = ("-created_at",)
+
+
 class UserDevice(BaseModel):
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, verbose_name=_("User"), related_name="devices"
@@ -76,3 +76,31 @@ class MessageProvider:
         await sync_to_async(cache.set)(
             generate_cache_key(self.type, phone, self.session), code, timeout=120
         )
+
+
+def reconcile_balances(user_ids=None):
+    """
+    Reset coin and point balances to the sum of the user's ledger entries in a
+    single aggregate UPDATE. Returns the number of users updated.
+    """
+    from django.db.models import OuterRef, Subquery, Sum
+    from django.db.models.functions import Coalesce
+
+    from apps.users.models import BalanceEntry, User
+
+    def ledger_sum(field):
+        return Coalesce(
+            Subquery(
+                BalanceEntry.objects.filter(user=OuterRef("pk"))
+                .order_by()
+                .values("user")
+                .annotate(total=Sum(field))
+                .values("total")
+            ),
+            0,
+        )
+
+    users = User.objects.all()
+    if user_ids is not None:
+        users = users.filter(id__in=user_ids)
+    return users.update(coin=ledger_sum("coin_delta"), point=ledger_sum("point_delta"))
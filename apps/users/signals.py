@@ -3,7 +3,8 @@ from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 from apps.course.models import UserCourse
-from apps.users.models import Group, GroupMember, TeacherGlobalLimit
+from apps.course.services.lesson_gates import invalidate_lesson_statuses
+from apps.users.models import Group, GroupMember, GroupMemberGrade, TeacherGlobalLimit
 
 
 @receiver(post_save, sender=Group)
@@ -127,3 +128,12 @@ def delete_user_course(sender, instance, **kwargs):
             teacher_limit.save(update_fields=['used', 'remaining'])
     except TeacherGlobalLimit.DoesNotExist:
         pass  # Handle case where limit doesn't exist
+
+
+@receiver(post_save, sender=GroupMemberGrade)
+@receiver(post_delete, sender=GroupMemberGrade)
+def invalidate_group_member_lesson_statuses(sender, instance, **kwargs):
+    """
+    Drop the cached lesson statuses of a group member when one of their grades changes
+    """
+    invalidate_lesson_statuses(instance.group_member_id)
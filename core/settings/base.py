@@ -294,6 +294,21 @@ REDIS_HOST = env.str("REDIS_HOST", "localhost")
 REDIS_PORT = env.int("REDIS_PORT", 6379)
 REDIS_DB = env.int("REDIS_DB", 0)
 
+# Buffer in-progress test answers in Redis and write them to the database on finish
+TEST_ANSWER_DRAFTS_ENABLED = env.bool("TEST_ANSWER_DRAFTS_ENABLED", False)
+
+# HLS rendition ladder of lesson videos, see apps.course.services.hls.
+# Renditions without a height are audio-only
+HLS_RENDITIONS = [
+    {"name": "240p", "height": 240, "video_bitrate": "400k", "audio_bitrate": "64k"},
+    {"name": "360p", "height": 360, "video_bitrate": "800k", "audio_bitrate": "96k"},
+    {"name": "720p", "height": 720, "video_bitrate": "2800k", "audio_bitrate": "128k"},
+    {"name": "audio", "audio_bitrate": "64k"},
+]
+HLS_SEGMENT_SECONDS = 6
+# Videos longer than two chunks are split and the chunks encoded in parallel
+HLS_CHUNK_SECONDS = 300
+
 # CELERY CONFIGURATION
 CELERY_BROKER_URL = env.str("CELERY_BROKER_URL", "redis://localhost:6379")
 CELERY_RESULT_BACKEND = env.str("CELERY_BROKER_URL", "redis://localhost:6379")
@@ -312,6 +327,22 @@ CELERY_BEAT_SCHEDULE = {
         "task": "apps.users.tasks.check_expired_groups",
         "schedule": crontab(hour=0, minute=0), 
     },
+    "flush_expired_answer_drafts": {
+        "task": "apps.course.tasks.flush_expired_answer_drafts",
+        "schedule": crontab(minute="*/5"),
+    },
+    "submit_expired_tests": {
+        "task": "apps.course.tasks.submit_expired_tests",
+        "schedule": crontab(minute="*"),
+    },
+    "reconcile_question_stats": {
+        "task": "apps.course.tasks.reconcile_question_stats",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "remove_stale_video_uploads": {
+        "task": "apps.course.tasks.remove_stale_video_uploads",
+        "schedule": crontab(hour=4, minute=0),
+    },
 }
 
 # RECAPTCHA
@@ -393,10 +424,13 @@ CKEDITOR_CONFIGS = {
     },
 }
 
-# 1000 GB in bytes
-GB = 1024 * 1024 * 1024
-DATA_UPLOAD_MAX_MEMORY_SIZE = 1000 * GB  # 1,073,741,824,000 bytes
-FILE_UPLOAD_MAX_MEMORY_SIZE = 1000 * GB  # same here
+MB = 1024 * 1024
+# Request bodies other than files are read into memory, keep them bounded
+DATA_UPLOAD_MAX_MEMORY_SIZE = 100 * MB
+# Larger files are streamed to temporary files instead of memory. Lesson
+# videos can also be uploaded in resumable chunks, see
+# apps.course.services.video_uploads
+FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * MB
 
 
 # Jazzmin admin branding